@@ -1,7 +1,10 @@
 import 'dart:convert';
+import 'dart:typed_data';
 import 'package:flutter/foundation.dart';
 import 'package:flutter/services.dart';
+import 'package:crypto/crypto.dart';
 import 'package:specsnparts/data/db/app_db.dart';
+import 'package:specsnparts/data/seed/spec_bundle.dart';
 import 'package:specsnparts/domain/fitment/fitment_key.dart';
 import 'package:flutter_riverpod/flutter_riverpod.dart';
 import 'package:shared_preferences/shared_preferences.dart';
@@ -24,7 +27,9 @@ class SeedRunner {
     // Version 12: Modern Era (GR/GV, BRZ, VA, Ascent, FA Series)
     // Version 17: Spec Cleanup (IDs, Units, Categories, Validation)
     // Version 18: Dynamic Tag Expansion (Years from Title)
-    const int kCurrentSeedVersion = 20;
+    // Version 21: Fitment specs seeded from columnar bundles
+    // Version 22: Stable SHA-1 fitment spec ids (match the prebuilt DB)
+    const int kCurrentSeedVersion = 22;
     final int lastSeedVersion = prefs.getInt('seed_version') ?? 0;
 
     // Check old flag for legacy migration
@@ -38,19 +43,24 @@ class SeedRunner {
       debugPrint(
         'Starting seed process (v$effectiveVersion -> v$kCurrentSeedVersion)...',
       );
-      await _seedVehicles();
-      await _seedSpecs();
-      await _seedParts();
-
-      await prefs.setInt('seed_version', kCurrentSeedVersion);
-      await prefs.setBool('is_seeded', true);
-      debugPrint('Seeding complete.');
+      final vehiclesOk = await _seedVehicles();
+      final specsOk = await _seedSpecs();
+      final partsOk = await _seedParts();
+
+      // A failed file keeps the old version so the next launch retries
+      if (vehiclesOk && specsOk && partsOk) {
+        await prefs.setInt('seed_version', kCurrentSeedVersion);
+        await prefs.setBool('is_seeded', true);
+        debugPrint('Seeding complete.');
+      } else {
+        debugPrint('Seeding incomplete; will retry on next launch.');
+      }
     } else {
       debugPrint('Seed already up to date (v$effectiveVersion).');
     }
   }
 
-  Future<void> _seedVehicles() async {
+  Future<bool> _seedVehicles() async {
     try {
       final String response = await rootBundle.loadString(
         'assets/seed/vehicles.json',
@@ -61,45 +71,81 @@ class SeedRunner {
       );
       await db.vehiclesDao.insertMultiple(vehicles);
       debugPrint('Seeded ${vehicles.length} vehicles.');
+      return true;
     } catch (e) {
       debugPrint('Error loading vehicles.json: $e');
+      return false;
     }
   }
 
-  Future<void> _seedSpecs() async {
+  Future<bool> _seedSpecs() async {
     try {
       final String manifestRaw = await rootBundle.loadString(
         'assets/seed/specs/index.json',
       );
       final manifest = jsonDecode(manifestRaw) as Map<String, dynamic>;
       final files = (manifest['files'] as List).cast<String>();
+      // Compact columnar bundles, keyed by the JSON file they replace
+      final bundles =
+          (manifest['bundles'] as Map<String, dynamic>?)
+              ?.cast<String, String>() ??
+          const <String, String>{};
 
       if (files.isEmpty) {
         debugPrint('Warning: index.json listed 0 files.');
-        return;
+        return true;
       }
 
+      final parsed = <String, List<Spec>>{};
+      var failed = false;
       for (final file in files) {
         try {
-          final String response = await rootBundle.loadString(
-            'assets/seed/specs/$file',
-          );
-          final List<Spec> specs = await compute<String, List<Spec>>(
-            parseSpecs,
-            response,
-          );
-          await db.specsDao.insertMultiple(specs);
-          debugPrint('Seeded ${specs.length} specs from $file.');
+          final bundle = bundles[file];
+          if (bundle != null) {
+            final ByteData data = await rootBundle.load(
+              'assets/seed/specs/$bundle',
+            );
+            parsed[bundle] = await compute<Uint8List, List<Spec>>(
+              parseSpecBundle,
+              data.buffer.asUint8List(data.offsetInBytes, data.lengthInBytes),
+            );
+          } else {
+            final String response = await rootBundle.loadString(
+              'assets/seed/specs/$file',
+            );
+            parsed[file] = await compute<String, List<Spec>>(
+              parseSpecs,
+              response,
+            );
+          }
         } catch (e) {
-          debugPrint('Error seeding $file: $e');
+          debugPrint('Error loading $file: $e');
+          failed = true;
         }
       }
+      if (failed) {
+        // Keep the specs already stored rather than seed a partial set
+        return false;
+      }
+
+      // Every spec is re-inserted below; clearing first drops rows stored
+      // under an older id scheme. One transaction, so a failed insert
+      // rolls the delete back too.
+      await db.transaction(() async {
+        await db.delete(db.specs).go();
+        for (final entry in parsed.entries) {
+          await db.specsDao.insertMultiple(entry.value);
+          debugPrint('Seeded ${entry.value.length} specs from ${entry.key}.');
+        }
+      });
+      return true;
     } catch (e) {
       debugPrint('Error loading specs from split files: $e');
+      return false;
     }
   }
 
-  Future<void> _seedParts() async {
+  Future<bool> _seedParts() async {
     try {
       final String response = await rootBundle.loadString(
         'assets/seed/parts.json',
@@ -111,8 +157,10 @@ class SeedRunner {
 
       await db.partsDao.insertMultiple(parts);
       debugPrint('Seeded ${parts.length} parts.');
+      return true;
     } catch (e) {
       debugPrint('Error loading parts.json: $e');
+      return false;
     }
   }
 }
@@ -164,23 +212,39 @@ List<Spec> parseSpecs(String response) {
   }).toList();
 }
 
+/// Parses a columnar spec bundle (see [SpecBundle]) without building the
+/// intermediate JSON tree.
+List<Spec> parseSpecBundle(Uint8List bytes) {
+  final List<Spec> specs = [];
+  SpecBundle.decode(bytes).forEachRow((row) => _addFitmentRow(specs, row));
+  return specs;
+}
+
+/// Stable id of a spec derived from a fitment row: [prefix] plus the first
+/// 16 hex digits of the SHA-1 of [key]. tool/seed/build_fitment_sqlite.py
+/// derives the same ids for the prebuilt database.
+String fitmentSpecId(String prefix, String key) =>
+    '${prefix}_${sha1.convert(utf8.encode(key)).toString().substring(0, 16)}';
+
 List<Spec> _parseFitmentRows(List<dynamic> data) {
   final List<Spec> specs = [];
 
   for (final json in data) {
-    final map = json as Map<String, dynamic>;
-
-    if (map.containsKey('function_key')) {
-      // Tall format (Bulbs, etc.)
-      specs.add(_parseTallRow(map));
-    } else {
-      // Wide format (Fluids, Maintenance, etc.)
-      specs.addAll(_parseWideRow(map));
-    }
+    _addFitmentRow(specs, json as Map<String, dynamic>);
   }
   return specs;
 }
 
+void _addFitmentRow(List<Spec> specs, Map<String, dynamic> map) {
+  if (map.containsKey('function_key')) {
+    // Tall format (Bulbs, etc.)
+    specs.add(_parseTallRow(map));
+  } else {
+    // Wide format (Fluids, Maintenance, etc.)
+    specs.addAll(_parseWideRow(map));
+  }
+}
+
 Spec _parseTallRow(Map<String, dynamic> map) {
   // Construct a unique ID
   final String compositeKey = [
@@ -194,7 +258,7 @@ Spec _parseTallRow(Map<String, dynamic> map) {
     map['location_hint'],
   ].join('|');
 
-  final id = 'fit_${compositeKey.hashCode}';
+  final id = fitmentSpecId('fit', compositeKey);
 
   String body = 'n/a';
   String category = 'Fitment';
@@ -269,7 +333,7 @@ List<Spec> _parseWideRow(Map<String, dynamic> map) {
     final value = entry.value.toString();
 
     final uniqueString = '$year|$make|$model|$trim|$bodyAttr|$market|$key';
-    final id = 'wide_${uniqueString.hashCode}';
+    final id = fitmentSpecId('wide', uniqueString);
 
     String category = 'Specs';
     String title = key.replaceAll('_', ' ').toUpperCase();
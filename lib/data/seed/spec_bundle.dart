@@ -0,0 +1,143 @@
+import 'dart:convert';
+import 'dart:typed_data';
+
+/// Columnar, string-interned spec rows written next to the fitment JSON by
+/// `tool/seed/sync_fitment_csv_to_specs_json.py` (see `BundleWriter` there
+/// for the byte layout).
+///
+/// Every distinct string is stored once; each column is an array of tagged
+/// cells pointing into that table, so decoding allocates no per-row maps.
+class SpecBundle {
+  static const List<int> magic = [0x53, 0x4E, 0x50, 0x42]; // "SNPB"
+  static const int version = 1;
+
+  static const int _cellAbsent = 0;
+  static const int _cellString = 1;
+  static const int _cellInt = 2;
+  static const int _cellBool = 3;
+
+  final List<String> strings;
+  final List<String> columns;
+  final int rowCount;
+  final List<Uint32List> _cells;
+
+  SpecBundle._(this.strings, this.columns, this.rowCount, this._cells);
+
+  factory SpecBundle.decode(Uint8List bytes) {
+    final reader = _BundleReader(bytes);
+    for (final expected in magic) {
+      if (reader.byte() != expected) {
+        throw const FormatException('Not a spec bundle');
+      }
+    }
+    final bundleVersion = reader.byte() | (reader.byte() << 8);
+    if (bundleVersion != version) {
+      throw FormatException('Unsupported spec bundle version $bundleVersion');
+    }
+
+    final strings = List<String>.generate(
+      reader.varint(),
+      (_) => reader.string(),
+      growable: false,
+    );
+    final columns = List<String>.generate(
+      reader.varint(),
+      (_) => strings[reader.varint()],
+      growable: false,
+    );
+    final rowCount = reader.varint();
+
+    final cells = <Uint32List>[];
+    for (var c = 0; c < columns.length; c++) {
+      final length = reader.varint();
+      final end = reader.offset + length;
+      final column = Uint32List(rowCount);
+      for (var r = 0; r < rowCount; r++) {
+        column[r] = reader.varint();
+      }
+      if (reader.offset != end) {
+        throw FormatException('Corrupt spec bundle column ${columns[c]}');
+      }
+      cells.add(column);
+    }
+    return SpecBundle._(strings, columns, rowCount, cells);
+  }
+
+  Object? _value(int cell) {
+    final payload = cell >> 2;
+    switch (cell & 3) {
+      case _cellString:
+        return strings[payload];
+      case _cellInt:
+        return (payload >> 1) ^ -(payload & 1);
+      case _cellBool:
+        return payload != 0;
+      default:
+        return null;
+    }
+  }
+
+  /// Calls [visit] once per row, in file order.
+  ///
+  /// The map is reused between rows; [visit] must copy it to keep it.
+  void forEachRow(void Function(Map<String, dynamic> row) visit) {
+    final row = <String, dynamic>{};
+    for (var r = 0; r < rowCount; r++) {
+      row.clear();
+      for (var c = 0; c < columns.length; c++) {
+        final cell = _cells[c][r];
+        if (cell != _cellAbsent) {
+          row[columns[c]] = _value(cell);
+        }
+      }
+      visit(row);
+    }
+  }
+
+  /// All rows as independent maps, equal to the matching JSON file.
+  List<Map<String, dynamic>> toRows() {
+    final rows = <Map<String, dynamic>>[];
+    forEachRow((row) => rows.add(Map<String, dynamic>.of(row)));
+    return rows;
+  }
+}
+
+class _BundleReader {
+  final Uint8List _bytes;
+  int offset = 0;
+
+  _BundleReader(this._bytes);
+
+  int byte() {
+    if (offset >= _bytes.length) {
+      throw const FormatException('Truncated spec bundle');
+    }
+    return _bytes[offset++];
+  }
+
+  int varint() {
+    var result = 0;
+    var shift = 0;
+    while (true) {
+      final b = byte();
+      result |= (b & 0x7F) << shift;
+      if (b < 0x80) return result;
+      shift += 7;
+      if (shift > 35) {
+        throw const FormatException('Spec bundle varint too long');
+      }
+    }
+  }
+
+  String string() {
+    final length = varint();
+    if (offset + length > _bytes.length) {
+      throw const FormatException('Truncated spec bundle');
+    }
+    final value = utf8.decode(
+      Uint8List.sublistView(_bytes, offset, offset + length),
+    );
+    offset += length;
+    return value;
+  }
+}
@@ -0,0 +1,67 @@
+import 'package:specsnparts/domain/fitment/fitment_key.dart';
+
+/// One shard of a spec file, as listed under "shards" in
+/// `assets/seed/specs/index.json` by the fitment sync's `--shard` mode.
+class SpecShard {
+  final String file;
+  final String model;
+  final int? firstYear;
+  final int? lastYear;
+  final int rows;
+  final int bytes;
+
+  const SpecShard({
+    required this.file,
+    required this.model,
+    this.firstYear,
+    this.lastYear,
+    required this.rows,
+    required this.bytes,
+  });
+
+  factory SpecShard.fromJson(Map<String, dynamic> map) {
+    final years = (map['years'] as List? ?? const []).cast<int>();
+    return SpecShard(
+      file: map['file'] as String,
+      model: map['model'] as String,
+      firstYear: years.isEmpty ? null : years.first,
+      lastYear: years.isEmpty ? null : years.last,
+      rows: map['rows'] as int,
+      bytes: map['bytes'] as int,
+    );
+  }
+
+  bool covers(String model, int? year) {
+    if (FitmentKey.norm(model) != FitmentKey.norm(this.model)) return false;
+    if (year == null || firstYear == null) return true;
+    return year >= firstYear! && year <= lastYear!;
+  }
+}
+
+/// Lookup from a spec file and vehicle to the shards holding its rows.
+class SpecShardIndex {
+  final Map<String, List<SpecShard>> _byFile;
+
+  SpecShardIndex._(this._byFile);
+
+  factory SpecShardIndex.fromManifest(Map<String, dynamic> manifest) {
+    final byFile = <String, List<SpecShard>>{};
+    final shards = manifest['shards'] as Map<String, dynamic>? ?? const {};
+    for (final entry in shards.entries) {
+      final spec = entry.value as Map<String, dynamic>;
+      byFile[entry.key] = (spec['shards'] as List)
+          .map((s) => SpecShard.fromJson(s as Map<String, dynamic>))
+          .toList(growable: false);
+    }
+    return SpecShardIndex._(byFile);
+  }
+
+  bool isSharded(String file) => _byFile.containsKey(file);
+
+  /// Shards of [file] (e.g. `fluids.json`) with rows for [model] in [year].
+  List<SpecShard> shardsFor(String file, String model, {int? year}) {
+    return (_byFile[file] ?? const <SpecShard>[])
+        .where((s) => s.covers(model, year))
+        .toList(growable: false);
+  }
+}
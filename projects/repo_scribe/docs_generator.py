@@ -1,13 +1,42 @@
 import json
 import os
+import argparse
+import hashlib
 
 INVENTORY_PATH = 'projects/repo_scribe/artifacts/inventory.json'
+DUPLICATES_PATH = 'projects/repo_scribe/artifacts/duplicates.json'
 ARTIFACTS_DIR = 'projects/repo_scribe/artifacts'
+DIGESTS_PATH = '.cache/repo_scribe/docs_digests.json'
+
+IMPORTANT_AREAS = {
+    "App Core": ["lib/main.dart", "lib/app.dart"],
+    "Routing": ["lib/router/"],
+    "Features": ["lib/features/"],
+    "Data & Database": ["lib/data/", "lib/domain/"],
+    "Seed Data": ["assets/seed/"],
+    "CI & Workflows": [".github/workflows/"],
+    "Tooling & Scripts": ["tool/", "scripts/"],
+    "Tests": ["test/"],
+    "Documentation": ["docs/", "projects/repo_scribe/"]
+}
 
 def load_inventory():
     with open(INVENTORY_PATH, 'r') as f:
         return json.load(f)
 
+def load_duplicates():
+    if not os.path.exists(DUPLICATES_PATH):
+        return {'wasted_bytes': 0, 'folders': [], 'files': []}
+    with open(DUPLICATES_PATH, 'r') as f:
+        return json.load(f)
+
+def format_bytes(n):
+    for unit in ['B', 'KB', 'MB']:
+        if n < 1024:
+            return f"{n:.0f} {unit}" if unit == 'B' else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GB"
+
 def write_md(filename, content):
     with open(os.path.join(ARTIFACTS_DIR, filename), 'w') as f:
         f.write(content)
@@ -90,19 +119,7 @@ def generate_file_index(inventory):
     # We want to group by High-Level Directory/Area, not just role, to be "Human Friendly"
     # and we want to filter out noise (like individual asset files or cache files).
 
-    important_areas = {
-        "App Core": ["lib/main.dart", "lib/app.dart"],
-        "Routing": ["lib/router/"],
-        "Features": ["lib/features/"],
-        "Data & Database": ["lib/data/", "lib/domain/"],
-        "Seed Data": ["assets/seed/"],
-        "CI & Workflows": [".github/workflows/"],
-        "Tooling & Scripts": ["tool/", "scripts/"],
-        "Tests": ["test/"],
-        "Documentation": ["docs/", "projects/repo_scribe/"]
-    }
-
-    for area, prefixes in important_areas.items():
+    for area, prefixes in IMPORTANT_AREAS.items():
         content += f"## {area}\n\n"
 
         # Find items that match these prefixes
@@ -247,14 +264,132 @@ This document explains the purpose of generated and ignored folders in the works
 """
     write_md('GENERATED_AND_IGNORED_FOLDERS.md', content)
 
+def generate_duplicates_and_sizes(inventory, duplicates):
+    content = """# Duplicates & Folder Sizes ⚖️
+
+Byte-identical files found by `inventory_generator.py` (see `duplicates.json`), and the folders taking the most space.
+**Verification Required**: A copy may be intentional (e.g. a mirrored doc); check references before deleting.
+
+"""
+    content += f"**Reclaimable**: {format_bytes(duplicates['wasted_bytes'])} across {len(duplicates['files'])} duplicate groups.\n\n"
+
+    if duplicates['folders']:
+        content += "## Folders Sharing Copies\n\n"
+        content += "| Folder | Copy | Shared Files | Shared Size | Identical |\n"
+        content += "| :--- | :--- | :--- | :--- | :--- |\n"
+        for d in duplicates['folders']:
+            a, b = d['paths']
+            files = f"{d['shared_files']} of {d['files'][0]} / {d['files'][1]}"
+            content += f"| `{a}/` | `{b}/` | {files} | {format_bytes(d['shared_bytes'])} | {'Yes' if d['identical'] else 'No'} |\n"
+        content += "\n"
+
+    if duplicates['files']:
+        content += "## Duplicate Files\n\n"
+        content += "| Size | Copies | Paths |\n"
+        content += "| :--- | :--- | :--- |\n"
+        for g in duplicates['files'][:50]:
+            paths = "<br>".join(f"`{p}`" for p in g['paths'])
+            content += f"| {format_bytes(g['size'])} | {len(g['paths'])} | {paths} |\n"
+        if len(duplicates['files']) > 50:
+            content += f"\n_{len(duplicates['files']) - 50} smaller groups omitted; see `duplicates.json`._\n"
+        content += "\n"
+
+    folders = [i for i in inventory if i['kind'] == 'dir' and i.get('bytes')]
+    content += "## Largest Folders\n\n"
+    content += "| Folder | Files | Size | Status |\n"
+    content += "| :--- | :--- | :--- | :--- |\n"
+    for item in sorted(folders, key=lambda x: (-x['bytes'], x['path']))[:25]:
+        content += f"| `{item['path']}/` | {item['files']} | {format_bytes(item['bytes'])} | {item['status']} |\n"
+
+    write_md('DUPLICATES_AND_SIZES.md', content)
+
+def artifact_slices(inventory, duplicates):
+    """
+    The part of the inventory each artifact is generated from. An artifact is
+    only regenerated when its slice (or this script) changed since the last run.
+    """
+    area_prefixes = tuple(p for prefixes in IMPORTANT_AREAS.values() for p in prefixes)
+    return {
+        'ONBOARDING_CHEATSHEET.md': [],
+        'ENTRYPOINTS_AND_CALLS.md': [],
+        'FILE_INDEX.md': [i for i in inventory if i['path'].startswith(area_prefixes)],
+        'UNUSED_FILE_CANDIDATES.md': [
+            i for i in inventory
+            if i['path'].startswith(('scripts/', 'lib/previews/')) and i['status'] == 'tracked'
+        ],
+        'FULL_REPO_INVENTORY.md': inventory,
+        'GENERATED_AND_IGNORED_FOLDERS.md': [
+            i for i in inventory if i['role'] == 'generated' or i['status'] == 'ignored'
+        ],
+        'DUPLICATES_AND_SIZES.md': [
+            duplicates,
+            [[i['path'], i['files'], i['bytes'], i['status']] for i in inventory if i['kind'] == 'dir' and i.get('bytes')],
+        ],
+    }
+
+GENERATORS = {
+    'ONBOARDING_CHEATSHEET.md': lambda inventory, duplicates: generate_onboarding_cheatsheet(),
+    'ENTRYPOINTS_AND_CALLS.md': lambda inventory, duplicates: generate_entrypoints_and_calls(),
+    'FILE_INDEX.md': lambda inventory, duplicates: generate_file_index(inventory),
+    'UNUSED_FILE_CANDIDATES.md': lambda inventory, duplicates: generate_unused_candidates(inventory),
+    'FULL_REPO_INVENTORY.md': lambda inventory, duplicates: generate_full_inventory(inventory),
+    'GENERATED_AND_IGNORED_FOLDERS.md': lambda inventory, duplicates: generate_generated_and_ignored(inventory),
+    'DUPLICATES_AND_SIZES.md': generate_duplicates_and_sizes,
+}
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+def load_digests():
+    try:
+        with open(DIGESTS_PATH, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_digests(digests):
+    os.makedirs(os.path.dirname(DIGESTS_PATH), exist_ok=True)
+    with open(DIGESTS_PATH, 'w') as f:
+        json.dump(digests, f, indent=2)
+
 def main():
+    parser = argparse.ArgumentParser(description="Generate the repo_scribe markdown artifacts")
+    parser.add_argument('--force', action='store_true', help="Regenerate every artifact")
+    args = parser.parse_args()
+
+    with open(__file__, 'rb') as f:
+        script_digest = sha256(f.read())
+    inputs = b''
+    for path in (INVENTORY_PATH, DUPLICATES_PATH):
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                inputs += f.read()
+    inventory_digest = sha256(inputs)
+
+    digests = {} if args.force else load_digests()
+    artifacts = digests.get('artifacts', {})
+    present = all(os.path.exists(os.path.join(ARTIFACTS_DIR, name)) for name in GENERATORS)
+    if (present and digests.get('script') == script_digest
+            and digests.get('inventory') == inventory_digest):
+        print("Inventory unchanged; artifacts are up to date.")
+        return
+
     inventory = load_inventory()
-    generate_onboarding_cheatsheet()
-    generate_entrypoints_and_calls()
-    generate_file_index(inventory)
-    generate_unused_candidates(inventory)
-    generate_full_inventory(inventory)
-    generate_generated_and_ignored(inventory)
+    duplicates = load_duplicates()
+    if digests.get('script') != script_digest:
+        artifacts = {}
+
+    regenerated = []
+    for name, items in artifact_slices(inventory, duplicates).items():
+        digest = sha256(json.dumps(items, sort_keys=True).encode('utf-8'))
+        if artifacts.get(name) == digest and os.path.exists(os.path.join(ARTIFACTS_DIR, name)):
+            continue
+        GENERATORS[name](inventory, duplicates)
+        artifacts[name] = digest
+        regenerated.append(name)
+
+    save_digests({'script': script_digest, 'inventory': inventory_digest, 'artifacts': artifacts})
+    print(f"Regenerated {len(regenerated)} of {len(GENERATORS)} artifacts: {', '.join(regenerated) or 'none'}")
 
 if __name__ == '__main__':
     main()
@@ -1,10 +1,24 @@
 import os
+import io
 import csv
 import json
 import subprocess
 import fnmatch
+import argparse
+import hashlib
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 
 ARTIFACTS_DIR = 'projects/repo_scribe/artifacts'
+CACHE_DIR = '.cache/repo_scribe'
+CACHE_PATH = f'{CACHE_DIR}/inventory_cache.json'
+CACHE_VERSION = 2
+
+# Fingerprinting: files sharing a size are compared on their first block,
+# and only files still colliding after that are hashed in full
+PARTIAL_BLOCK = 64 * 1024
+HASH_CHUNK = 1024 * 1024
 
 # Specific ignored folders we MUST capture per requirements
 IGNORED_ROOTS = ['build', '.dart_tool', '.idea', 'android/.gradle', 'ios/Pods']
@@ -18,53 +32,185 @@ def get_tracked_files():
         print("Warning: git ls-files failed. Assuming no tracked files.")
         return set()
 
-def get_all_workspace_items(root_dir='.'):
+def aggregate_tree(path):
+    """Returns file count, total bytes and newest file mtime under a directory."""
+    files = 0
+    total = 0
+    newest = 0.0
+    stack = [path]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                    continue
+                try:
+                    st = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                files += 1
+                total += st.st_size
+                newest = max(newest, st.st_mtime)
+    return {
+        'files': files,
+        'bytes': total,
+        'newest_mtime': datetime.fromtimestamp(newest, timezone.utc).isoformat(timespec='seconds') if files else '',
+    }
+
+def get_all_workspace_items(root_dir='.', tracked=(), expand_ignored=False):
     """
-    Returns a list of all files and directories in the workspace,
-    including ignored ones.
+    Walks the workspace with os.scandir, including ignored folders.
+    Returns (paths, dirs, aggregates, stats): every path sorted, the set of
+    those that are directories, for each IGNORED_ROOTS folder collapsed into
+    a single record (unless expand_ignored, or it holds tracked files) its
+    files / bytes / newest_mtime totals, and each path's [mtime_ns, size].
     """
+    collapse = set()
+    if not expand_ignored:
+        collapse = {r for r in IGNORED_ROOTS if not any(t.startswith(r + '/') for t in tracked)}
+
     all_items = []
+    dirs = set()
+    aggregates = {}
+    stats = {}
+    stack = ['']
+    while stack:
+        dirpath = stack.pop()
+        try:
+            entries = os.scandir(os.path.join(root_dir, dirpath) if dirpath else root_dir)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                full_path = f"{dirpath}/{entry.name}" if dirpath else entry.name
+                # Skip .git directory, and our own cache and artifacts, which
+                # change on every run and would feed back into the totals
+                if entry.name == '.git' or full_path in (CACHE_DIR, ARTIFACTS_DIR):
+                    continue
+                all_items.append(full_path)
+                try:
+                    st = entry.stat(follow_symlinks=False)
+                    stats[full_path] = [st.st_mtime_ns, st.st_size]
+                except OSError:
+                    stats[full_path] = None
+                # Symlinked directories are listed but not followed, like os.walk
+                if not entry.is_dir():
+                    continue
+                dirs.add(full_path)
+                if full_path in collapse:
+                    aggregates[full_path] = aggregate_tree(entry.path)
+                elif not entry.is_symlink():
+                    stack.append(full_path)
 
-    # Walk the tree
-    for dirpath, dirnames, filenames in os.walk(root_dir):
-        # normalize path separator
-        dirpath = dirpath.replace('\\', '/')
-        if dirpath.startswith('./'):
-            dirpath = dirpath[2:]
-        elif dirpath == '.':
-            dirpath = ''
-
-        # Skip .git directory
-        if '.git' in dirnames:
-            dirnames.remove('.git')
-
-        # Add directories
-        for d in dirnames:
-            full_path = os.path.join(dirpath, d) if dirpath else d
-            all_items.append(full_path.replace('\\', '/'))
-
-        # Add files
-        for f in filenames:
-            full_path = os.path.join(dirpath, f) if dirpath else f
-            all_items.append(full_path.replace('\\', '/'))
-
-    # Explicitly check for required ignored folders if they weren't found by walk
-    # (e.g. if they are missing, we can't inventory them as "present", but
-    # if they are present, walk should have found them unless we filtered them)
-    # The walk above does not filter ignored files.
-
-    return sorted(all_items)
-
-def is_ignored(path):
-    """Checks if a path is ignored by git."""
-    try:
-        subprocess.check_output(['git', 'check-ignore', '-q', path])
-        return True
-    except subprocess.CalledProcessError:
-        return False
+    return sorted(all_items), dirs, aggregates, stats
+
+class IgnoreChecker:
+    """
+    Answers ignore-status queries through one long-lived
+    `git check-ignore --stdin -z --non-matching -v` process instead of
+    spawning git per path.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._started = False
+        self.proc = None
+
+    def _start(self):
+        # Started on first use, so a fully cached run spawns nothing
+        self._started = True
+        env = dict(os.environ, GIT_FLUSH='1')
+        try:
+            self.proc = subprocess.Popen(
+                ['git', 'check-ignore', '--stdin', '-z', '--non-matching', '-v'],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, env=env)
+        except OSError:
+            print("Warning: git check-ignore unavailable. Assuming nothing is ignored.")
+
+    def _read_field(self):
+        end = self._buffer.find(b'\0')
+        while end < 0:
+            chunk = os.read(self.proc.stdout.fileno(), 65536)
+            if not chunk:
+                raise EOFError('git check-ignore exited early')
+            self._buffer += chunk
+            end = self._buffer.find(b'\0')
+        field = bytes(self._buffer[:end])
+        del self._buffer[:end + 1]
+        return field.decode('utf-8', 'surrogateescape')
+
+    def is_ignored(self, path):
+        if not self._started:
+            self._start()
+        if self.proc is None:
+            return False
+        try:
+            self.proc.stdin.write(path.encode('utf-8', 'surrogateescape') + b'\0')
+            self.proc.stdin.flush()
+            # Each record is <source> NUL <linenum> NUL <pattern> NUL <pathname> NUL;
+            # source is empty when nothing matched
+            source, _, pattern, _ = (self._read_field() for _ in range(4))
+        except (OSError, EOFError):
+            # Not a git checkout (or git died): same answer as a failed check
+            self.close()
+            return False
+        return bool(source) and not pattern.startswith('!')
+
+    def close(self):
+        if self.proc is None:
+            return
+        try:
+            self.proc.stdin.close()
+        except OSError:
+            pass
+        self.proc.wait()
+        self.proc = None
 
-def classify_item(path, is_tracked, is_ignored_status):
-    kind = 'dir' if os.path.isdir(path) else 'file'
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def resolve_ignored(paths, tracked, dirs, known=None):
+    """
+    Returns the set of untracked paths git ignores. Paths must be sorted so
+    directories (the `dirs` set) come before their contents: once a
+    directory is ignored, everything under it is ignored without asking git.
+    Paths in `known` (path -> bool, from the cache) are not asked either.
+    """
+    known = known or {}
+    ignored = set()
+    ignored_dirs = set()
+    with IgnoreChecker() as checker:
+        for path in paths:
+            if path in tracked:
+                continue
+            parent = path.rpartition('/')[0]
+            while parent and parent not in ignored_dirs:
+                parent = parent.rpartition('/')[0]
+            if parent:
+                is_ignored = True
+            elif path in known:
+                is_ignored = known[path]
+            else:
+                is_ignored = checker.is_ignored(path)
+            if is_ignored:
+                ignored.add(path)
+                if path in dirs:
+                    ignored_dirs.add(path)
+    return ignored
+
+def classify_item(path, is_tracked, is_ignored_status, is_dir=None):
+    if is_dir is None:
+        is_dir = os.path.isdir(path)
+    kind = 'dir' if is_dir else 'file'
+    # 'build' itself belongs to build/, not just the files under it
+    prefix_path = path + '/' if is_dir else path
 
     if is_tracked:
         status = 'tracked'
@@ -75,7 +221,7 @@ def classify_item(path, is_tracked, is_ignored_status):
 
     # Determine Type
     ext = os.path.splitext(path)[1].lower()
-    if any(path.startswith(x) for x in ['build/', '.dart_tool/']) or '.g.dart' in path:
+    if any(prefix_path.startswith(x) for x in ['build/', '.dart_tool/']) or '.g.dart' in path:
         item_type = 'generated'
     elif ext == '.dart':
         item_type = 'dart'
@@ -116,7 +262,7 @@ def classify_item(path, is_tracked, is_ignored_status):
         role = 'CI'
     elif 'docs/' in path or '.md' in path:
         role = 'docs'
-    elif any(path.startswith(x) for x in ['build/', '.dart_tool/']):
+    elif any(prefix_path.startswith(x) for x in ['build/', '.dart_tool/']):
         role = 'generated'
     else:
         role = 'config'
@@ -164,45 +310,297 @@ def classify_item(path, is_tracked, is_ignored_status):
         'notes': notes
     }
 
+def hash_file(path, limit=None):
+    """blake2b of the whole file, or of its first `limit` bytes; None if unreadable."""
+    digest = hashlib.blake2b(digest_size=20)
+    try:
+        with open(path, 'rb') as f:
+            if limit:
+                digest.update(f.read(limit))
+            else:
+                for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+                    digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+def find_duplicates(sizes, known=None, jobs=None):
+    """
+    Groups byte-identical files. `sizes` maps path -> size; `known` maps
+    path -> cached {'partial', 'full'} fingerprints still valid for it.
+    Hashing runs in a thread pool (hashlib releases the GIL), in three
+    passes: size buckets, a partial hash of the first block, then a full
+    hash only for files whose size and partial hash both collide.
+    Returns (groups, fingerprints): groups of 2+ paths as dicts with size,
+    hash and paths, and every fingerprint computed or reused, for the cache.
+    """
+    known = known or {}
+    fingerprints = {}
+
+    def colliding(keyed):
+        buckets = defaultdict(list)
+        for path, key in keyed.items():
+            if key is not None:
+                buckets[key].append(path)
+        return [paths for paths in buckets.values() if len(paths) > 1]
+
+    def fingerprint(paths, kind, limit, pool):
+        todo = []
+        for path in paths:
+            value = known.get(path, {}).get(kind)
+            if value:
+                fingerprints.setdefault(path, {})[kind] = value
+            else:
+                todo.append(path)
+        for path, value in zip(todo, pool.map(lambda p: hash_file(p, limit), todo)):
+            if value:
+                fingerprints.setdefault(path, {})[kind] = value
+        return {path: fingerprints.get(path, {}).get(kind) for path in paths}
+
+    # Empty files are all alike; they are not worth reporting
+    candidates = [p for group in colliding({p: n for p, n in sizes.items() if n > 0}) for p in group]
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        partial = fingerprint(candidates, 'partial', PARTIAL_BLOCK, pool)
+        by_partial = colliding({p: (sizes[p], h) for p, h in partial.items() if h})
+        small = [p for group in by_partial for p in group if sizes[p] <= PARTIAL_BLOCK]
+        large = [p for group in by_partial for p in group if sizes[p] > PARTIAL_BLOCK]
+        # The first block of a small file is the whole file
+        full = {p: partial[p] for p in small}
+        full.update(fingerprint(large, 'full', None, pool))
+
+    groups = [
+        {'size': sizes[paths[0]], 'hash': full[paths[0]], 'paths': sorted(paths)}
+        for paths in colliding({p: (sizes[p], h) for p, h in full.items()})
+    ]
+    groups.sort(key=lambda g: (-g['size'] * (len(g['paths']) - 1), g['paths'][0]))
+    return groups, fingerprints
+
+def duplicate_dirs(groups, totals, min_shared=2):
+    """
+    Folder pairs holding byte-identical copies of the same files at the same
+    relative paths (at least `min_shared` of them). A pair is `identical`
+    when those copies are all either folder holds. Only the outermost pair
+    of each nested match is kept.
+    """
+    shared = defaultdict(lambda: [0, 0])
+    for group in groups:
+        paths = group['paths']
+        for i, a in enumerate(paths):
+            for b in paths[i + 1:]:
+                pa, pb = a.split('/'), b.split('/')
+                # Walk up while the relative paths still agree
+                k = 1
+                while k < len(pa) and k < len(pb) and pa[-k] == pb[-k]:
+                    pair = shared['/'.join(pa[:-k]), '/'.join(pb[:-k])]
+                    pair[0] += 1
+                    pair[1] += group['size']
+                    k += 1
+
+    pairs = {
+        (a, b): counts for (a, b), counts in shared.items()
+        if a and b and counts[0] >= min_shared
+        and not a.startswith(b + '/') and not b.startswith(a + '/')
+    }
+    folders = []
+    for (a, b), (files, size) in pairs.items():
+        if (a.rpartition('/')[0], b.rpartition('/')[0]) in pairs:
+            continue
+        sides = [totals.get(a, {}).get('files'), totals.get(b, {}).get('files')]
+        folders.append({
+            'paths': [a, b],
+            'shared_files': files,
+            'shared_bytes': size,
+            'files': sides,
+            'identical': sides == [files, files],
+        })
+    folders.sort(key=lambda d: (-d['shared_bytes'], d['paths']))
+    return folders
+
+def directory_totals(paths, dirs, stats, aggregates):
+    """Recursive file count and byte total for every directory ('' is the workspace)."""
+    totals = {d: {'files': 0, 'bytes': 0} for d in dirs}
+    totals[''] = {'files': 0, 'bytes': 0}
+    for path in paths:
+        if path in aggregates:
+            files, size = aggregates[path]['files'], aggregates[path]['bytes']
+            parent = path
+        elif path in dirs or not stats.get(path):
+            continue
+        else:
+            files, size = 1, stats[path][1]
+            parent = path.rpartition('/')[0]
+        while True:
+            total = totals.setdefault(parent, {'files': 0, 'bytes': 0})
+            total['files'] += files
+            total['bytes'] += size
+            if not parent:
+                break
+            parent = parent.rpartition('/')[0]
+    return totals
+
+def git_state_paths():
+    """Paths of the git index and .git/info/exclude, or (None, None) outside a checkout."""
+    try:
+        output = subprocess.check_output(
+            ['git', 'rev-parse', '--git-path', 'index', '--git-path', 'info/exclude'],
+            universal_newlines=True)
+        index_path, exclude_path = output.strip().splitlines()
+    except (subprocess.CalledProcessError, OSError, ValueError):
+        return None, None
+    return index_path, exclude_path
+
+def file_signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+def load_cache(path=CACHE_PATH):
+    try:
+        with open(path, 'r') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if cache.get('version') == CACHE_VERSION else {}
+
+def save_cache(cache, path=CACHE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(cache, f)
+    os.replace(tmp_path, path)
+
+def write_if_changed(path, content):
+    """Writes `content` unless the file already holds it; returns True if written."""
+    try:
+        with open(path, 'r', newline='') as f:
+            if f.read() == content:
+                return False
+    except OSError:
+        pass
+    with open(path, 'w', newline='') as f:
+        f.write(content)
+    return True
+
 def main():
-    print("Gathering tracked files...")
-    tracked = get_tracked_files()
+    parser = argparse.ArgumentParser(description="Generate the repo inventory")
+    parser.add_argument('--expand-ignored', action='store_true',
+                        help="List every file under build/, .dart_tool/, ios/Pods, ... instead of one aggregated record per folder")
+    parser.add_argument('--no-cache', action='store_true', help=f"Ignore {CACHE_PATH} and reclassify everything")
+    parser.add_argument('--jobs', type=int, help="Threads used to fingerprint files (default: Python's thread pool default)")
+    args = parser.parse_args()
+
+    cache = {} if args.no_cache else load_cache()
+    if cache.get('expand_ignored') != args.expand_ignored:
+        cache = {}
+    cached_items = cache.get('items', {})
+
+    # The tracked set only changes with the git index
+    index_path, exclude_path = git_state_paths()
+    index_sig = file_signature(index_path) if index_path else None
+    if index_sig and cache.get('index') == index_sig:
+        tracked = set(cache['tracked'])
+    else:
+        print("Gathering tracked files...")
+        tracked = get_tracked_files()
 
     print("Crawling workspace...")
-    all_paths = get_all_workspace_items()
+    all_paths, dirs, aggregates, stats = get_all_workspace_items(tracked=tracked, expand_ignored=args.expand_ignored)
+
+    # Cached ignore answers hold while no ignore rules file changed
+    excludes = None
+    if exclude_path:
+        excludes = [[exclude_path, file_signature(exclude_path)]]
+        excludes += [[p, stats.get(p)] for p in all_paths if p.rpartition('/')[2] == '.gitignore']
+    known = {}
+    if excludes and cache.get('excludes') == excludes:
+        known = {p: e['sig'][3] for p, e in cached_items.items() if not e['sig'][2]}
+
+    print("Resolving ignore status...")
+    # Only non-tracked paths are checked; directories aren't in 'tracked'
+    ignored = resolve_ignored(all_paths, tracked, dirs, known)
 
     inventory = []
+    items = {}
+    reclassified = 0
 
     print(f"Processing {len(all_paths)} items...")
     for path in all_paths:
         is_tracked_file = path in tracked
-        # Only check ignore status for non-tracked files to save time,
-        # unless it's a directory (directories aren't in 'tracked' usually)
-        if is_tracked_file:
-            ignored_status = False
+        sig = [stats.get(path), path in dirs, is_tracked_file, path in ignored, aggregates.get(path)]
+        cached = cached_items.get(path)
+        if cached and cached['sig'] == sig:
+            item = cached['item']
         else:
-            ignored_status = is_ignored(path)
-
-        item = classify_item(path, is_tracked_file, ignored_status)
+            reclassified += 1
+            item = classify_item(path, is_tracked_file, path in ignored, path in dirs)
+            if path in aggregates:
+                totals = aggregates[path]
+                item.update(totals)
+                item['notes'] = f"Aggregated: {totals['files']} files, {totals['bytes']} bytes (--expand-ignored lists them)"
+        items[path] = {'sig': sig, 'item': item}
         inventory.append(item)
+    print(f"Reclassified {reclassified} new or changed items ({len(all_paths) - reclassified} cached).")
+
+    # Per-directory byte totals; collapsed roots already carry their own
+    totals = directory_totals(all_paths, dirs, stats, aggregates)
+    for item in inventory:
+        if item['path'] in dirs:
+            item['files'] = totals[item['path']]['files']
+            item['bytes'] = totals[item['path']]['bytes']
+
+    print("Fingerprinting files...")
+    sizes = {p: stats[p][1] for p in all_paths if p not in dirs and stats.get(p)}
+    known = {
+        p: cached_items[p]['fingerprint'] for p in sizes
+        if p in cached_items and 'fingerprint' in cached_items[p] and cached_items[p]['sig'] == items[p]['sig']
+    }
+    groups, fingerprints = find_duplicates(sizes, known, args.jobs)
+    for path, fingerprint in fingerprints.items():
+        items[path]['fingerprint'] = fingerprint
+    dup_dirs = duplicate_dirs(groups, totals)
+    wasted = sum(g['size'] * (len(g['paths']) - 1) for g in groups)
+    print(f"Found {len(groups)} duplicate file groups ({wasted} reclaimable bytes) and {len(dup_dirs)} folders sharing copies "
+          f"in {totals['']['bytes']} bytes.")
+
+    save_cache({
+        'version': CACHE_VERSION,
+        'expand_ignored': args.expand_ignored,
+        'index': index_sig,
+        'tracked': sorted(tracked),
+        'excludes': excludes,
+        'items': items,
+    })
 
     # Ensure artifacts directory exists
     os.makedirs(ARTIFACTS_DIR, exist_ok=True)
 
-    # Save to JSON
+    # Save to JSON; unchanged artifacts keep their mtime for docs_generator
     json_path = os.path.join(ARTIFACTS_DIR, 'inventory.json')
-    with open(json_path, 'w') as f:
-        json.dump(inventory, f, indent=2)
-    print(f"Inventory JSON written to {json_path}")
+    if write_if_changed(json_path, json.dumps(inventory, indent=2)):
+        print(f"Inventory JSON written to {json_path}")
+    else:
+        print(f"Inventory JSON unchanged: {json_path}")
+
+    duplicates = {'wasted_bytes': wasted, 'folders': dup_dirs, 'files': groups}
+    duplicates_path = os.path.join(ARTIFACTS_DIR, 'duplicates.json')
+    if write_if_changed(duplicates_path, json.dumps(duplicates, indent=2)):
+        print(f"Duplicates report written to {duplicates_path}")
+    else:
+        print(f"Duplicates report unchanged: {duplicates_path}")
 
     # Save to CSV
     csv_path = os.path.join(ARTIFACTS_DIR, 'inventory.csv')
-    with open(csv_path, 'w', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=['path', 'status', 'kind', 'type', 'role', 'purpose', 'confidence', 'notes'])
-        writer.writeheader()
-        for item in inventory:
-            writer.writerow(item)
-    print(f"Inventory CSV written to {csv_path}")
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=['path', 'status', 'kind', 'type', 'role', 'purpose', 'confidence', 'notes', 'files', 'bytes', 'newest_mtime'])
+    writer.writeheader()
+    for item in inventory:
+        writer.writerow(item)
+    if write_if_changed(csv_path, buffer.getvalue()):
+        print(f"Inventory CSV written to {csv_path}")
+    else:
+        print(f"Inventory CSV unchanged: {csv_path}")
 
 if __name__ == '__main__':
     main()
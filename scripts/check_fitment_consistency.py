@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Fitment Consistency Checker
+Several facts are emitted independently by more than one generator: oil
+viscosity lives in engines.csv, fluids.csv and the oil.json seeds, timing
+drive in engines.csv and maintenance.csv, and so on. This indexes the four
+fitment CSVs by YMMT key once, streams vehicles.json through them and runs
+the declarative RULES below over each vehicle's joined rows.
+
+Contradictions are listed grouped by engine code and written to
+.cache/validation/consistency_report.json. Known contradictions are recorded
+in fitment_consistency_baseline.json; the run fails only on new ones, so it
+can gate every sync while the existing data is being corrected.
+
+Usage: python3 scripts/check_fitment_consistency.py [--all] [--save-baseline] [--profile]
+"""
+
+import argparse
+import json
+import re
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import instrumentation
+from fitment_join import FitmentIndex
+
+REPO_ROOT = Path(__file__).parent.parent
+SEED_DIR = REPO_ROOT / "assets" / "seed"
+FITMENT_DIR = SEED_DIR / "specs" / "fitment"
+OIL_JSON = SEED_DIR / "specs" / "oil.json"
+VEHICLES_JSON = SEED_DIR / "vehicles.json"
+REPORT_PATH = REPO_ROOT / ".cache" / "validation" / "consistency_report.json"
+BASELINE_PATH = Path(__file__).parent / "fitment_consistency_baseline.json"
+
+CATEGORIES = {
+    "engines": "engines.csv",
+    "fluids": "fluids.csv",
+    "maintenance": "maintenance.csv",
+    "torque": "torque_specs.csv",
+}
+# Vehicles listed per engine code when printing
+MAX_SAMPLES = 5
+
+OIL_GRADE = re.compile(r"\b\d{1,2}W-\d{2}\b")
+ENGINE_TAG = re.compile(r"[a-z]{2}\d{2}\w*")
+WORD = re.compile(r"[a-z0-9]+")
+
+
+# --- Normalizers: raw cell -> set of comparable facts (None = no fact) ---
+
+def oil_grades(value):
+    return frozenset(OIL_GRADE.findall(value or "")) or None
+
+
+def presence(value):
+    return frozenset(["present" if value else "blank"])
+
+
+def timing_drive(value):
+    value = (value or "").lower()
+    if "belt" in value:
+        return frozenset(["belt"])
+    if "chain" in value:
+        return frozenset(["chain"])
+    return None
+
+
+def timing_service(value):
+    # maintenance.csv only schedules a timing belt; no entry means chain
+    return frozenset(["belt" if value else "chain"])
+
+
+class Rule:
+    """Two `source.field` references that must agree once normalized.
+
+    Sources are the CATEGORIES rows joined for the vehicle, plus "oil_seed"
+    (the oil.json viscosity entries that apply to it). A rule is skipped when
+    either side is missing or normalizes to None, and reports a contradiction
+    when the two normalized sets share nothing.
+    """
+
+    def __init__(self, name, left, right, normalize, right_normalize=None):
+        self.name = name
+        self.left = left.split(".")
+        self.right = right.split(".")
+        self.normalize = normalize
+        self.right_normalize = right_normalize or normalize
+
+    def check(self, joined):
+        left_row = joined.get(self.left[0])
+        right_row = joined.get(self.right[0])
+        if left_row is None or right_row is None:
+            return None
+        left_raw, right_raw = left_row.get(self.left[1], ""), right_row.get(self.right[1], "")
+        left, right = self.normalize(left_raw), self.right_normalize(right_raw)
+        if left is None or right is None or left & right:
+            return None
+        return {
+            "rule": self.name,
+            ".".join(self.left): left_raw,
+            ".".join(self.right): right_raw,
+        }
+
+
+RULES = [
+    Rule("oil_viscosity", "engines.oil_viscosity", "fluids.engine_oil_unit", oil_grades),
+    Rule("oil_viscosity_seed", "engines.oil_viscosity", "oil_seed.viscosity", oil_grades),
+    Rule("engine_oil", "engines.oil_viscosity", "fluids.engine_oil_qty", presence),
+    Rule("timing_drive", "engines.timing_drive", "maintenance.drive_belt_timing", timing_drive, timing_service),
+    Rule("spark_plugs", "engines.spark_plug", "torque.spark_plugs", presence),
+]
+
+
+class OilSeeds:
+    """oil.json viscosity entries, matched to vehicles by their tags: an
+    engine tag that prefixes the engine code (fa20 -> FA20F), the year when
+    the entry lists years, and a model word when the entry names a model."""
+
+    def __init__(self, path, model_words):
+        self.entries = []
+        if not path.exists():
+            return
+        with open(path, "r", encoding="utf-8-sig") as f:
+            seeds = json.load(f)
+        for s in seeds:
+            tags = set(s.get("tags", "").split(","))
+            if "viscosity" not in tags:
+                continue
+            engines = tuple(t for t in tags if ENGINE_TAG.fullmatch(t))
+            if not engines:
+                continue
+            years = {t for t in tags if t.isdigit()}
+            self.entries.append((engines, years, tags & model_words, s.get("body", "")))
+
+    def lookup(self, engine_code, year, words):
+        """A pseudo-row for the rules, or None when no entry applies."""
+        code = engine_code.lower()
+        bodies = [
+            body for engines, years, models, body in self.entries
+            if code.startswith(engines)
+            and (not years or year in years)
+            and (not models or models & words)
+        ]
+        return {"viscosity": " | ".join(bodies)} if bodies else None
+
+
+def vehicle_label(v):
+    return f"{v.get('year')}|{v.get('make', 'Subaru')}|{v.get('model')}|{v.get('trim')}"
+
+
+def check_vehicles(vehicles, indexes, seeds, rules=RULES):
+    """One pass over the vehicles; returns contradictions keyed by engine code."""
+    by_engine = {}
+    for v in vehicles:
+        joined = {name: index.one(v) for name, index in indexes.items()}
+        engine = joined.get("engines") or {}
+        code = engine.get("engine_code") or "unknown"
+        words = set(WORD.findall(f"{v.get('model', '')} {v.get('trim', '')}".lower()))
+        joined["oil_seed"] = seeds.lookup(code, str(v.get("year", "")), words)
+        for rule in rules:
+            found = rule.check(joined)
+            if found:
+                found["vehicle"] = vehicle_label(v)
+                by_engine.setdefault(code, []).append(found)
+    return by_engine
+
+
+def baseline_key(c):
+    return f"{c['rule']}|{c['vehicle']}"
+
+
+def load_baseline(path=BASELINE_PATH):
+    if not path.exists():
+        return set()
+    with open(path, "r", encoding="utf-8") as f:
+        return set(json.load(f).get("contradictions", []))
+
+
+def print_report(by_engine, known, show_all):
+    shown = 0
+    for code, found in sorted(by_engine.items(), key=lambda kv: (-len(kv[1]), kv[0])):
+        new = [c for c in found if baseline_key(c) not in known]
+        listed = found if show_all else new
+        if not listed:
+            continue
+        rules = {}
+        for c in listed:
+            rules.setdefault(c["rule"], []).append(c)
+        print(f"\n{code}: {len(listed)} contradictions" + ("" if show_all else " (new)"))
+        for rule, items in rules.items():
+            first = {k: v for k, v in items[0].items() if k not in ("rule", "vehicle")}
+            values = ", ".join(f"{k}={v!r}" for k, v in first.items())
+            print(f"  [{rule}] {len(items)} vehicles, e.g. {values}")
+            for c in items[:MAX_SAMPLES]:
+                print(f"    {c['vehicle']}")
+            if len(items) > MAX_SAMPLES:
+                print(f"    ... and {len(items) - MAX_SAMPLES} more")
+        shown += len(listed)
+    return shown
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that facts repeated across fitment categories agree")
+    parser.add_argument("--all", action="store_true", help="List baselined contradictions too, not just new ones")
+    parser.add_argument("--save-baseline", action="store_true", help="Accept the current contradictions as the baseline")
+    parser.add_argument("--report", type=Path, default=REPORT_PATH, help="Where to write the JSON report")
+    instrumentation.add_argument(parser)
+    args = parser.parse_args()
+    instrumentation.setup(__file__, args.profile)
+
+    instrumentation.begin("index")
+    with open(VEHICLES_JSON, "r", encoding="utf-8-sig") as f:
+        vehicles = json.load(f)
+    indexes = {name: FitmentIndex.from_csv(name, FITMENT_DIR / filename) for name, filename in CATEGORIES.items()}
+    model_words = {w for v in vehicles for w in WORD.findall(v.get("model", "").lower())}
+    seeds = OilSeeds(OIL_JSON, model_words)
+    instrumentation.count("vehicles_in", len(vehicles))
+    instrumentation.count("rows_in", sum(len(i) for i in indexes.values()))
+
+    instrumentation.begin("check")
+    by_engine = check_vehicles(vehicles, indexes, seeds)
+    found = [c for items in by_engine.values() for c in items]
+    instrumentation.count("contradictions", len(found))
+
+    instrumentation.begin("report")
+    print(f"Checked {len(vehicles)} vehicles against {len(RULES)} rules")
+    for index in indexes.values():
+        index.report()
+
+    if args.save_baseline:
+        BASELINE_PATH.write_text(json.dumps({
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "contradictions": sorted(baseline_key(c) for c in found),
+        }, indent=2) + "\n", encoding="utf-8")
+        print(f"Baseline of {len(found)} contradictions written to {BASELINE_PATH}")
+    known = load_baseline()
+    new = [c for c in found if baseline_key(c) not in known]
+    print_report(by_engine, known, args.all)
+
+    by_rule = {}
+    for c in found:
+        by_rule[c["rule"]] = by_rule.get(c["rule"], 0) + 1
+    args.report.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.report, "w", encoding="utf-8") as f:
+        f.write(json.dumps({
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "vehicles": len(vehicles),
+            "contradictions": len(found),
+            "new": len(new),
+            "rules": by_rule,
+            "engines": by_engine,
+        }, indent=2) + "\n")
+    print(f"\nReport written to {args.report}")
+
+    print("\n" + "=" * 50)
+    summary = ", ".join(f"{rule}={n}" for rule, n in sorted(by_rule.items())) or "none"
+    if new:
+        print(f"CONSISTENCY FAILED - {len(new)} new contradictions ({len(found)} total: {summary})")
+    else:
+        print(f"CONSISTENCY PASSED - no new contradictions ({len(found)} baselined: {summary})")
+    instrumentation.end()
+    return 1 if new else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Shared Engine Code Resolver
+Maps a raw vehicles.json `engineCode` (e.g. "EJ20 Turbo", "FB25 NA") to the
+canonical engine code used as the ENGINE_SPECS key by the engines generator,
+and to the family key used by the fluids generator.
+
+The ordered substring rules are compiled once into a single anchored regex:
+each alternative is `.*?(TOKEN)`, so alternation order gives first-rule-wins
+precedence exactly like the old chain of `in` tests. Results are memoized in
+bounded LRU caches.
+"""
+
+import re
+from functools import lru_cache
+
+
+def _year(year_val):
+    try:
+        return int(year_val)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _ej20(code, model, y, trim):
+    if "Turbo" in code:
+        if y >= 2000:
+            return "EJ205"  # GD WRX
+        elif y >= 1996:
+            return "EJ20K"  # GC8 late
+        else:
+            return "EJ20G"  # GC8 early
+    return "EJ20G"  # Default turbo
+
+
+def _ez30(code, model, y, trim):
+    if "R" in code or "SPEC" in trim.upper():
+        return "EZ30R"
+    return "EZ30D"
+
+
+def _fa20(code, model, y, trim):
+    # FA20F (Turbo) vs FA20D (NA)
+    if "BRZ" in model: return "FA20D"
+    if "WRX" in model or "Forester" in model or "Levorg" in model: return "FA20F"
+    return "FA20D"
+
+
+def _fa24(code, model, y, trim):
+    # FA24F (Turbo) vs FA24D (NA)
+    if "BRZ" in model or "GR86" in model: return "FA24D"
+    return "FA24F"
+
+
+def _fb20(code, model, y, trim):
+    if "Hybrid" in code:
+        return "FB20H"
+    # FB20B (Port) vs FB20D (DI)
+    if "Crosstrek" in model or "XV" in model:
+        return "FB20D" if y >= 2018 else "FB20B"
+    if "Impreza" in model:
+        return "FB20D" if y >= 2017 else "FB20B"
+    if "Forester" in model and y >= 2019:
+        return "FB20D"
+    return "FB20D" if y >= 2017 else "FB20B"
+
+
+def _fb25(code, model, y, trim):
+    # FB25B (Port) vs FB25D (DI)
+    if "Forester" in model:
+        return "FB25D" if y >= 2019 else "FB25B"
+    if "Legacy" in model or "Outback" in model:
+        return "FB25D" if y >= 2020 else "FB25B"
+    if "Crosstrek" in model or "XV" in model: return "FB25D"
+    if "Impreza" in model: return "FB25D"
+    if "Exiga" in model: return "FB25B"
+    return "FB25D" if y >= 2019 else "FB25B"
+
+
+# Ordered (token, result) rules: first token found anywhere in the code wins.
+# A result is either the canonical code or a callable(code, model, year, trim).
+RULES = [
+    # Toyota OEM
+    ("1NR-FE", "1NR-FE"), ("1NZ-FE", "1NZ-FE"),
+    # Kei engines
+    ("EN07", "EN07"), ("EN05", "EN05"), ("KF", "KF"),
+    # JDM-specific EJ
+    ("EJ20G", "EJ20G"), ("EJ20K", "EJ20K"),
+    ("EJ206", "EJ206"), ("EJ208", "EJ208"),
+    ("EJ20X", "EJ20X"), ("EJ20Y", "EJ20Y"),
+    # Other JDM
+    ("EL15", "EL15"), ("EF10", "EF10"), ("EZ30R", "EZ30R"),
+    ("FB16", "FB16"), ("CB18", "CB18"),
+    # EA/EF/ER/EG and 5-char EJ codes
+    ("EA71", "EA71"), ("EA82T", "EA82T"), ("EA82", "EA82"), ("EA81", "EA81"),
+    ("EF12", "EF12"), ("ER27", "ER27"), ("EG33", "EG33"),
+    ("Electric", "Electric"),
+    ("EJ257", "EJ257"), ("EJ255", "EJ255"), ("EJ207", "EJ207"), ("EJ205", "EJ205"),
+    ("EJ253", "EJ253"), ("EJ252", "EJ253"), ("EJ251", "EJ251"), ("EJ25D", "EJ25D"), ("EJ25", "EJ253"),
+    ("EJ22T", "EJ22T"), ("EJ22", "EJ22E"), ("EJ18", "EJ18E"),
+    ("EJ15", "EJ15"), ("EJ16", "EJ16"),
+    # Model/year dependent families
+    ("EJ20", _ej20),
+    ("EZ36", "EZ36D"), ("EZ30", _ez30),
+    ("FA20", _fa20), ("FA24", _fa24),
+    ("FB20", _fb20), ("FB25", _fb25),
+]
+
+
+def _ej22_fluids(code, model, y, trim):
+    return "EJ22T" if "Turbo" in code else "EJ22"
+
+
+# Fluids capacities are tabulated per family rather than per variant, so the
+# fluids generator keeps its own coarser rules: NA and turbo EJ20/EJ25 codes
+# land on the generic "EJ20"/"EJ25" entries, never on a turbo variant's specs.
+FLUID_RULES = [
+    # JDM-specific direct mappings first
+    ("1NR-FE", "1NR-FE"), ("1NZ-FE", "1NZ-FE"),
+    ("EN07", "EN07"), ("EN05", "EN05"),
+    ("KF", "KF"),
+    ("CB18", "CB18"), ("FB16", "FB16"),
+    ("EJ20G", "EJ20G"), ("EJ20K", "EJ20K"),
+    ("EJ206", "EJ206"), ("EJ208", "EJ208"),
+    ("EJ20X", "EJ20X"), ("EJ20Y", "EJ20Y"),
+    ("EL15", "EL15"), ("EF10", "EF10"),
+    ("EJ15", "EJ15"), ("EJ16", "EJ16"),
+    # Standard engine families
+    ("EA71", "EA71"), ("EA82T", "EA82T"), ("EA82", "EA82"), ("EA81", "EA81"),
+    ("EF12", "EF12"), ("ER27", "ER27"), ("EG33", "EG33"),
+    ("FA24", "FA24"), ("FA20", "FA20"), ("FB25", "FB25"), ("FB20", "FB20"),
+    ("Electric", "Electric"),
+    ("EZ36", "EZ36"), ("EZ30", "EZ30"),
+    ("EJ257", "EJ257"), ("EJ255", "EJ255"), ("EJ207", "EJ207"), ("EJ205", "EJ205"),
+    ("EJ253", "EJ253"), ("EJ252", "EJ253"), ("EJ251", "EJ251"), ("EJ25D", "EJ25D"), ("EJ25", "EJ25"),
+    ("EJ22T", "EJ22T"), ("EJ22", _ej22_fluids), ("EJ18", "EJ18"), ("EJ20", "EJ20"),
+]
+
+
+def _compile(rules):
+    return re.compile(
+        "^(?:" + "|".join(f".*?({re.escape(token)})" for token, _ in rules) + ")",
+        re.DOTALL,
+    )
+
+
+_RULE_RE = _compile(RULES)
+_FLUID_RULE_RE = _compile(FLUID_RULES)
+
+
+def _resolve(rules, rule_re, engine_code, model, year_val, trim):
+    if not engine_code:
+        return ""
+    code = engine_code.strip()
+    m = rule_re.match(code)
+    if not m:
+        return ""
+    result = rules[m.lastindex - 1][1]
+    if callable(result):
+        return result(code, model or "", _year(year_val), trim or "")
+    return result
+
+
+@lru_cache(maxsize=4096)
+def resolve_engine_code(engine_code, model="", year_val=0, trim=""):
+    """Canonical engine code for a vehicle, or "" when no rule matches."""
+    return _resolve(RULES, _RULE_RE, engine_code, model, year_val, trim)
+
+
+@lru_cache(maxsize=1024)
+def resolve_fluid_code(engine_code):
+    """Fluids ENGINE_SPECS key for a raw engineCode, or "" when no rule matches."""
+    return _resolve(FLUID_RULES, _FLUID_RULE_RE, engine_code, "", 0, "")
+
+
+def cache_stats():
+    infos = [resolve_engine_code.cache_info(), resolve_fluid_code.cache_info()]
+    return {
+        "hits": sum(i.hits for i in infos),
+        "misses": sum(i.misses for i in infos),
+        "size": sum(i.currsize for i in infos),
+        "maxsize": sum(i.maxsize for i in infos),
+    }
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Vehicle Duplicate Finder
+Finds near-duplicate entries in vehicles.json, e.g. "Base (US)" vs "Base",
+"22B STI (JDM)" vs "STI 22B (JDM)", or a JDM trim with and without a grade
+suffix, and prints merge suggestions.
+
+Vehicles are blocked by (year, model, engine family), so only entries in the
+same block are compared and the cost stays near-linear in the catalog size.
+Within a block trims are compared as normalized tokens (market tags and
+punctuation dropped) with a Dice score. Pairs from different markets, or
+whose extra tokens name a body, drivetrain or induction variant ("Wagon",
+"4WD", "SC") or a grade ("Spec.B", "E-tune II"), are never duplicates.
+
+Suggestions are "merge" when the trims have the same tokens and "review"
+when one only adds a suffix or the tokens are merely similar. The report is
+written to .cache/validation/vehicle_duplicates.json.
+
+Usage: python3 scripts/find_vehicle_duplicates.py [--threshold 0.85] [--profile]
+"""
+
+import argparse
+import json
+import re
+from collections import Counter
+from pathlib import Path
+
+import instrumentation
+
+REPO_ROOT = Path(__file__).parent.parent
+VEHICLES_JSON = REPO_ROOT / "assets" / "seed" / "vehicles.json"
+REPORT_PATH = REPO_ROOT / ".cache" / "validation" / "vehicle_duplicates.json"
+
+THRESHOLD = 0.85
+MARKET_TAGS = {"us": "USDM", "usdm": "USDM", "jdm": "JDM", "edm": "EDM", "adm": "ADM"}
+# Tokens that make two otherwise equal trims different vehicles: body,
+# drivetrain and induction variants, and grade suffixes ("Spec.B", "Spec C",
+# "E-tune II", "S Package", "Version III")
+DISTINCT_TOKENS = {
+    "wagon", "sedan", "coupe", "hatchback", "van", "truck",
+    "4wd", "2wd", "awd", "fwd", "sc", "turbo", "sti",
+    "spec", "specb", "specc", "a", "b", "c", "s", "r", "ra", "package",
+    "tune", "tuned", "etune", "limited", "version",
+    "i", "ii", "iii", "iv", "v", "vi", "vii", "viii", "ix", "x",
+}
+TOKEN = re.compile(r"[a-z0-9]+")
+ENGINE_FAMILY = re.compile(r"[A-Za-z]+\d{0,2}")
+
+
+def trim_tokens(trim):
+    """'2.0GT Spec.B (JDM)' -> Counter({'20gt': 1, 'specb': 1})"""
+    return Counter(t for t in TOKEN.findall((trim or "").lower().replace(".", "")) if t not in MARKET_TAGS)
+
+
+def vehicle_market(v):
+    for t in TOKEN.findall((v.get("trim") or "").lower()):
+        if t in MARKET_TAGS:
+            return MARKET_TAGS[t]
+    return v.get("market") or None
+
+
+def block_key(v):
+    """(year, model, engine family): 'EJ25 NA' and 'EJ253' share a block."""
+    m = ENGINE_FAMILY.match(v.get("engineCode") or "")
+    return (v.get("year"), (v.get("model") or "").casefold(), m.group(0).upper() if m else "")
+
+
+def similarity(a, b):
+    """(score, reason) for two token Counters, or None if they can't be the same vehicle."""
+    if a == b:
+        return 1.0, "identical"
+    if set((a - b) + (b - a)) & DISTINCT_TOKENS:
+        return None
+    shared = sum((a & b).values())
+    score = 2 * shared / (sum(a.values()) + sum(b.values()))
+    reason = "suffix" if shared == min(sum(a.values()), sum(b.values())) else "similar"
+    return round(score, 3), reason
+
+
+class VehicleBlocks:
+    """Vehicles bucketed by block_key, with their trim tokens and market
+    computed once."""
+
+    def __init__(self, vehicles=()):
+        self.blocks = {}
+        for v in vehicles:
+            self.add(v)
+
+    def add(self, v):
+        self.blocks.setdefault(block_key(v), []).append((v, trim_tokens(v.get("trim")), vehicle_market(v)))
+
+    @staticmethod
+    def compare(a, b):
+        (va, ta, ma), (vb, tb, mb) = a, b
+        if ma and mb and ma != mb:
+            return None
+        return similarity(ta, tb)
+
+    def match(self, v, threshold=THRESHOLD):
+        """Best (score, reason, other) for `v` among indexed vehicles, or None."""
+        entry = (v, trim_tokens(v.get("trim")), vehicle_market(v))
+        best = None
+        for other in self.blocks.get(block_key(v), ()):
+            found = self.compare(entry, other)
+            if found and found[0] >= threshold and (best is None or found[0] > best[0]):
+                best = (found[0], found[1], other[0])
+        return best
+
+    def pairs(self, threshold=THRESHOLD):
+        """Every (score, reason, a, b) within a block at or above `threshold`."""
+        for entries in self.blocks.values():
+            for i, a in enumerate(entries):
+                for b in entries[i + 1:]:
+                    instrumentation.count("pairs_compared")
+                    found = self.compare(a, b)
+                    if found and found[0] >= threshold:
+                        yield found[0], found[1], a[0], b[0]
+
+
+def suggestion(score, reason, a, b):
+    """Keep the more complete record (then the lower id) and drop the other."""
+    def rank(v):
+        return (-sum(1 for val in v.values() if val not in ("", None)), v.get("id", ""))
+    keep, drop = sorted((a, b), key=rank)
+    return {
+        "action": "merge" if reason == "identical" else "review",
+        "score": score,
+        "reason": reason,
+        "block": list(block_key(a)),
+        "keep": {"id": keep.get("id"), "trim": keep.get("trim")},
+        "drop": {"id": drop.get("id"), "trim": drop.get("trim")},
+    }
+
+
+def find_duplicates(vehicles, threshold=THRESHOLD):
+    blocks = VehicleBlocks(vehicles)
+    found = [suggestion(*p) for p in blocks.pairs(threshold)]
+    found.sort(key=lambda s: (s["action"] != "merge", -s["score"], s["block"][0] or 0, s["block"][1]))
+    return blocks, found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find near-duplicate vehicles in vehicles.json")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help=f"Minimum trim similarity (default: {THRESHOLD})")
+    parser.add_argument("--report", type=Path, default=REPORT_PATH, help="Where to write the JSON report")
+    instrumentation.add_argument(parser)
+    args = parser.parse_args()
+    instrumentation.setup(__file__, args.profile)
+
+    instrumentation.begin("load")
+    with open(VEHICLES_JSON, "r", encoding="utf-8-sig") as f:
+        vehicles = json.load(f)
+    instrumentation.count("vehicles_in", len(vehicles))
+
+    instrumentation.begin("compare")
+    blocks, found = find_duplicates(vehicles, args.threshold)
+    largest = max((len(b) for b in blocks.blocks.values()), default=0)
+    print(f"Compared {len(vehicles)} vehicles in {len(blocks.blocks)} blocks (largest: {largest})")
+    instrumentation.count("suggestions", len(found))
+
+    instrumentation.begin("report")
+    merges = sum(1 for s in found if s["action"] == "merge")
+    print(f"Found {len(found)} likely duplicates: {merges} to merge, {len(found) - merges} to review")
+    for s in found:
+        year, model, family = s["block"]
+        print(f"  [{s['action'].upper()}] {s['score']:.2f} {s['reason']:<8} {year} {model} {family}: "
+              f"keep {s['keep']['trim']!r} ({s['keep']['id']}), drop {s['drop']['trim']!r} ({s['drop']['id']})")
+    args.report.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.report, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"threshold": args.threshold, "vehicles": len(vehicles), "suggestions": found}, indent=2) + "\n")
+    print(f"Report written to {args.report}")
+    instrumentation.end()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Fitment Build Engine
+Loads vehicles.json once, sorts it once, and streams every vehicle through
+the registered per-category row emitters (engines, fluids, torque) so all
+fitment CSVs are written in a single pass.
+
+Builds are incremental: a manifest records, per emitter and vehicle id, a
+hash of the vehicle record plus the spec-table entries its row used. Rows
+whose hash is unchanged are spliced in from the previous CSV.
+
+Usage: python3 scripts/fitment_build.py [--only engines,torque] [--dry-run] [--full] [--profile]
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+import instrumentation
+from engine_resolver import cache_stats
+from ymmt_key import YMMTKey
+
+SCRIPT_DIR = Path(__file__).parent
+REPO_ROOT = SCRIPT_DIR.parent
+VEHICLES_JSON = REPO_ROOT / "assets" / "seed" / "vehicles.json"
+MANIFEST_PATH = REPO_ROOT / ".cache" / "fitment_build_manifest.json"
+
+
+def load_vehicles(path=VEHICLES_JSON):
+    with open(path, "r", encoding="utf-8-sig") as f:
+        return json.load(f)
+
+
+def vehicle_sort_key(v):
+    return (v.get("year", 9999), v.get("make", ""), v.get("model", ""), v.get("trim", ""))
+
+
+def vehicle_id(v):
+    return v.get("id") or f"{v.get('year')}|{v.get('make')}|{v.get('model')}|{v.get('trim')}"
+
+
+def digest(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+def file_digest(path):
+    return digest(Path(path).read_bytes()) if Path(path).exists() else ""
+
+
+def load_manifest(path=MANIFEST_PATH):
+    if not path.exists():
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(json.dumps(manifest, separators=(",", ":")))
+
+
+class BuildContext:
+    """Shared state for one build pass.
+
+    Emitters publish lookup indexes here (e.g. engines rows by YMMT key) so
+    later emitters can enrich from them without re-reading the CSV.
+    """
+
+    def __init__(self, emitters):
+        self.emitters = {em.name: em for em in emitters}
+        self.indexes = {}
+        self.record_digest = ""
+
+    def has(self, name):
+        return name in self.emitters
+
+
+class RowEmitter:
+    """Base class for a per-category CSV writer.
+
+    Subclasses set `name`, `path` and `header`, and implement `create_row`.
+    Rows are deduplicated on `dedupe_key` (first vehicle wins). Subclasses
+    that read spec tables return the entries they used from `spec_inputs`
+    so the manifest can tell when a row needs regenerating.
+    """
+
+    name = ""
+    path = None
+    header = []
+
+    def __init__(self):
+        self.rows = []
+        self.seen = set()
+        self.manifest = {}
+        self.prev = {}
+        self.prev_rows = []
+        self.reused = 0
+        self.regenerated = 0
+        self.duplicates = 0
+
+    def begin(self, ctx):
+        pass
+
+    def create_row(self, v, ctx):
+        raise NotImplementedError
+
+    def spec_inputs(self, v, ctx):
+        return None
+
+    def dedupe_key(self, row, v):
+        return YMMTKey.from_record(row)
+
+    def code_fingerprint(self):
+        """Hash of the generator sources; any code change forces a full rebuild."""
+        sources = [Path(sys.modules[type(self).__module__].__file__), Path(__file__), SCRIPT_DIR / "engine_resolver.py", SCRIPT_DIR / "ymmt_key.py"]
+        return digest(b"".join(p.read_bytes() for p in sources))
+
+    def fingerprint(self, v, ctx):
+        payload = ctx.record_digest + json.dumps(self.spec_inputs(v, ctx), sort_keys=True, default=str)
+        return digest(payload.encode("utf-8"))
+
+    def load_previous(self, entry):
+        """Adopt the previous build's rows if its manifest entry still applies."""
+        if not entry or entry.get("code") != self.code_fingerprint():
+            return
+        if entry.get("csv") != file_digest(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8", newline="") as f:
+            self.prev_rows = list(csv.DictReader(f))
+        self.prev = entry.get("rows", {})
+
+    def manifest_entry(self):
+        return {"code": self.code_fingerprint(), "csv": file_digest(self.path), "rows": self.manifest}
+
+    def emit(self, v, ctx):
+        vid = vehicle_id(v)
+        fp = self.fingerprint(v, ctx)
+        cached = self.prev.get(vid)
+        row = None
+        if cached and cached[0] == fp:
+            key = YMMTKey(*cached[1])
+            if cached[2] >= 0:
+                row = self.prev_rows[cached[2]]
+            self.reused += 1
+        else:
+            row = self.create_row(v, ctx)
+            key = self.dedupe_key(row, v)
+            self.regenerated += 1
+
+        if key in self.seen:
+            self.manifest[vid] = [fp, list(key.astuple()), -1]
+            self.duplicates += 1
+            return None
+        if row is None:
+            # Was a duplicate last build but is now the first of its key
+            row = self.create_row(v, ctx)
+        self.seen.add(key)
+        self.manifest[vid] = [fp, list(key.astuple()), len(self.rows)]
+        self.rows.append(row)
+        return row
+
+    def unchanged(self):
+        return self.regenerated == 0 and len(self.rows) == len(self.prev_rows)
+
+    def write(self):
+        print(f"Writing {len(self.rows)} rows to {self.path.name}...")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=self.header, quoting=csv.QUOTE_MINIMAL, lineterminator="\n")
+            writer.writeheader()
+            writer.writerows(self.rows)
+
+    def report(self):
+        pass
+
+
+def run_build(emitters, vehicles=None, dry_run=False, incremental=True):
+    """Resolve every vehicle once and feed it through each emitter in order.
+
+    With `incremental`, rows whose manifest hash is unchanged are reused from
+    the previous CSV instead of being regenerated.
+    """
+    with instrumentation.stage("load"):
+        if vehicles is None:
+            print("Loading vehicles.json...")
+            vehicles = load_vehicles()
+        print(f"Found {len(vehicles)} vehicles")
+        instrumentation.count("vehicles_in", len(vehicles))
+
+        manifest = load_manifest() if incremental else {}
+        ctx = BuildContext(emitters)
+        for em in emitters:
+            em.load_previous(manifest.get(em.name))
+            em.begin(ctx)
+
+    with instrumentation.stage("sort"):
+        ordered = sorted(vehicles, key=vehicle_sort_key)
+
+    print(f"Generating rows for: {', '.join(em.name for em in emitters)}")
+    with instrumentation.stage("resolve"):
+        for v in ordered:
+            ctx.record_digest = digest(json.dumps(v, sort_keys=True).encode("utf-8"))
+            for em in emitters:
+                em.emit(v, ctx)
+        stats = cache_stats()
+        instrumentation.count("resolver_cache_hits", stats["hits"])
+        instrumentation.count("resolver_cache_misses", stats["misses"])
+
+    for em in emitters:
+        print(f"{em.name}: {em.regenerated} rows regenerated, {em.reused} reused")
+        with instrumentation.stage(f"write:{em.name}"):
+            instrumentation.count("rows_out", len(em.rows))
+            instrumentation.count("rows_reused", em.reused)
+            instrumentation.count("duplicates_dropped", em.duplicates)
+            if dry_run:
+                print(f"[Dry Run] Would write {len(em.rows)} rows to {em.path.name}.")
+            elif em.unchanged():
+                print(f"{em.path.name} is up to date.")
+            else:
+                em.write()
+            em.report()
+            manifest[em.name] = em.manifest_entry()
+
+    if not dry_run:
+        with instrumentation.stage("manifest"):
+            save_manifest(manifest)
+
+    print(f"Engine resolver cache: {stats['hits']} hits, {stats['misses']} misses")
+    return ctx
+
+
+def default_emitters():
+    """All registered emitters, in dependency order (torque reads engines)."""
+    from generate_engines_csv import EnginesEmitter
+    from generate_fluids_csv_v2 import FluidsEmitter
+    from generate_torque_specs_csv import TorqueEmitter
+    return [EnginesEmitter(), FluidsEmitter(), TorqueEmitter()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build all fitment CSVs in one pass")
+    parser.add_argument("--only", help="Comma-separated emitter names (e.g. engines,torque)")
+    parser.add_argument("--dry-run", action="store_true", help="Do not write files")
+    parser.add_argument("--full", action="store_true", help="Ignore the build manifest and regenerate every row")
+    instrumentation.add_argument(parser)
+    args = parser.parse_args()
+    instrumentation.setup(__file__, args.profile)
+
+    emitters = default_emitters()
+    if args.only:
+        wanted = {n.strip() for n in args.only.split(",")}
+        emitters = [em for em in emitters if em.name in wanted]
+
+    run_build(emitters, dry_run=args.dry_run, incremental=not args.full)
+    print("Done!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Fitment Coverage Heatmap
+Loads each fitment CSV into columnar form once (every cell classified as
+populated, "n/a" or blank) and reports coverage for every column, overall and
+grouped by model, year, market and engine family. Engine family comes from
+engines.csv, joined on the YMMT key, so every category can be sliced by it.
+
+With NumPy installed the cell states are boolean matrices and each grouping
+is a single matrix product; without it every column and group is an int
+bitmask over the rows and a count is one `&` plus bit_count(). Both paths
+produce identical output.
+
+Writes .cache/coverage/coverage.json (all files, percentages per column in
+header order) and one wide <file>.csv heatmap per fitment CSV.
+
+Usage: python3 scripts/fitment_coverage.py [--only engines,fluids] [--by model,year] [--out DIR] [--profile]
+"""
+
+import argparse
+import csv
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+
+import instrumentation
+from fitment_join import FitmentIndex
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+REPO_ROOT = Path(__file__).parent.parent
+FITMENT_DIR = REPO_ROOT / "assets" / "seed" / "specs" / "fitment"
+OUT_DIR = REPO_ROOT / ".cache" / "coverage"
+
+FILES = ["engines", "fluids", "maintenance", "torque_specs"]
+DIMENSIONS = ["model", "year", "market", "engine_family"]
+# Identity columns are always filled, so they are left out of the heatmap
+KEY_COLUMNS = ["year", "make", "model", "trim", "body", "market"]
+
+
+def bitmask(flags):
+    """Row flags -> int with bit i set for row i."""
+    return int("".join("1" if f else "0" for f in reversed(flags)) or "0", 2)
+
+
+class ColumnTable:
+    """One fitment CSV held column-wise, plus a group label per row for
+    each dimension."""
+
+    def __init__(self, name, header, rows, engines=None):
+        self.name = name
+        self.header = header
+        self.columns = [c for c in header if c not in KEY_COLUMNS]
+        self.size = len(rows)
+        width = len(header)
+        rows = [r if len(r) == width else (r + [""] * width)[:width] for r in rows]
+        pos = {c: i for i, c in enumerate(header)}
+        cols = list(zip(*rows)) if rows else [()] * width
+
+        if np is not None:
+            cells = np.array([cols[pos[c]] for c in self.columns], dtype=str).reshape(len(self.columns), self.size)
+            self.na = cells == "n/a"
+            self.populated = (cells != "") & ~self.na
+        else:
+            self.na_bits = [bitmask([v == "n/a" for v in cols[pos[c]]]) for c in self.columns]
+            self.populated_bits = [bitmask([v != "" and v != "n/a" for v in cols[pos[c]]]) for c in self.columns]
+
+        def column(c):
+            return list(cols[pos[c]]) if c in pos else [""] * self.size
+
+        self.labels = {
+            "model": column("model"),
+            "year": column("year"),
+            "market": column("market"),
+        }
+        if "engine_family" in pos:
+            self.labels["engine_family"] = column("engine_family")
+        elif engines is not None:
+            keys = zip(column("year"), column("make"), column("model"), column("trim"))
+            self.labels["engine_family"] = [
+                (row or {}).get("engine_family", "")
+                for row in (engines.one(dict(zip(("year", "make", "model", "trim"), k))) for k in keys)
+            ]
+
+    @classmethod
+    def load(cls, name, path, engines=None):
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            return cls(name, header, list(reader), engines)
+
+    def counts(self, ids, n):
+        """Per group: (rows, populated per column, "n/a" per column)."""
+        if np is not None:
+            onehot = np.zeros((n, self.size), dtype=np.int32)
+            onehot[np.asarray(ids, dtype=np.intp), np.arange(self.size)] = 1
+            populated = onehot @ self.populated.T.astype(np.int32)
+            na = onehot @ self.na.T.astype(np.int32)
+            return onehot.sum(axis=1).tolist(), populated.tolist(), na.tolist()
+        groups = [0] * n
+        for row, g in enumerate(ids):
+            groups[g] |= 1 << row
+        return (
+            [mask.bit_count() for mask in groups],
+            [[(mask & col).bit_count() for col in self.populated_bits] for mask in groups],
+            [[(mask & col).bit_count() for col in self.na_bits] for mask in groups],
+        )
+
+    def heatmap(self, dimensions):
+        """{dimension: {group: {"rows", "populated": [%...], "na": [%...]}}}"""
+        out = {}
+        for dim in ["all"] + dimensions:
+            if dim == "all":
+                names, ids = ["all"], [0] * self.size
+            elif dim in self.labels:
+                names, ids = factorize(self.labels[dim])
+            else:
+                continue
+            sizes, populated, na = self.counts(ids, len(names))
+            out[dim] = {
+                name: {
+                    "rows": rows,
+                    "populated": [percent(k, rows) for k in populated[g]],
+                    "na": [percent(k, rows) for k in na[g]],
+                }
+                for g, (name, rows) in enumerate(zip(names, sizes))
+            }
+        return out
+
+
+def factorize(labels):
+    """Labels -> (sorted distinct names, group id per row). Years sort numerically."""
+    names = sorted(set(labels), key=lambda s: (not s.isdigit(), int(s) if s.isdigit() else 0, s))
+    code = {name: i for i, name in enumerate(names)}
+    return [name or "(blank)" for name in names], [code[label] for label in labels]
+
+
+def percent(k, n):
+    return round(100.0 * k / n, 1) if n else 0.0
+
+
+def write_csv(path, columns, heatmap):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["dimension", "group", "rows"] + columns)
+        for dim, groups in heatmap.items():
+            for group, cell in groups.items():
+                writer.writerow([dim, group, cell["rows"]] + cell["populated"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Column coverage heatmaps for the fitment CSVs")
+    parser.add_argument("--only", help=f"Comma-separated files (default: {','.join(FILES)})")
+    parser.add_argument("--by", default=",".join(DIMENSIONS), help=f"Grouping dimensions (default: {','.join(DIMENSIONS)})")
+    parser.add_argument("--out", type=Path, default=OUT_DIR, help="Directory for coverage.json and the per-file CSVs")
+    instrumentation.add_argument(parser)
+    args = parser.parse_args()
+    instrumentation.setup(__file__, args.profile)
+
+    names = FILES
+    if args.only:
+        wanted = {n.strip().removesuffix(".csv") for n in args.only.split(",")}
+        names = [n for n in FILES if n in wanted]
+    dimensions = [d.strip() for d in args.by.split(",") if d.strip()]
+    print(f"Coverage backend: {'numpy ' + np.__version__ if np is not None else 'pure Python'}")
+
+    instrumentation.begin("load")
+    engines = FitmentIndex.from_csv("engines", FITMENT_DIR / "engines.csv")
+    tables = []
+    for name in names:
+        path = FITMENT_DIR / f"{name}.csv"
+        if path.exists():
+            tables.append(ColumnTable.load(name, path, engines))
+    instrumentation.count("rows_in", sum(t.size for t in tables))
+
+    instrumentation.begin("reduce")
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "backend": "numpy" if np is not None else "python",
+        "files": {},
+    }
+    for t in tables:
+        report["files"][t.name] = {"rows": t.size, "columns": t.columns, "coverage": t.heatmap(dimensions)}
+
+    instrumentation.begin("write")
+    args.out.mkdir(parents=True, exist_ok=True)
+    with open(args.out / "coverage.json", "w", encoding="utf-8") as f:
+        f.write(json.dumps(report, separators=(",", ":")) + "\n")
+    for name, entry in report["files"].items():
+        write_csv(args.out / f"{name}.csv", entry["columns"], entry["coverage"])
+        overall = entry["coverage"]["all"]["all"]["populated"]
+        mean = sum(overall) / len(overall) if overall else 0.0
+        weakest = sorted(zip(overall, entry["columns"]))[:3]
+        print(f"{name}: {entry['rows']} rows, {len(entry['columns'])} columns, {mean:.1f}% populated on average; "
+              f"lowest: {', '.join(f'{c} {p}%' for p, c in weakest)}")
+    print(f"Heatmaps written to {args.out}")
+    instrumentation.end()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Fitment Joins
+Hash index over one category's rows (e.g. engines.csv) so generators can
+enrich each vehicle from another category in O(1) per lookup, with every
+miss counted instead of silently falling back to defaults.
+
+Rows and vehicles are matched on the canonical YMMTKey of year, make, model
+and trim. Market and body are left out on purpose: generators derive market
+from the trim in different ways (engines.csv leaves unmarked trims blank,
+torque assumes USDM), so keying on it makes identical vehicles miss.
+
+    engines = FitmentIndex.from_csv("engines", ENGINES_CSV)
+    row = engines.one(v)           # one-to-one: first row, or None
+    rows = bulbs.many(v)           # one-to-many: every row for the vehicle
+    engines.report()               # matched / unmatched / ambiguous
+"""
+
+import csv
+from pathlib import Path
+
+import instrumentation
+from ymmt_key import YMMTKey
+
+# Unmatched keys kept for the report
+MISS_SAMPLES = 10
+
+
+def join_key(record):
+    """Canonical join key of a vehicle record or fitment row."""
+    get = record.get
+    return YMMTKey(get("year"), get("make"), get("model"), get("trim"))
+
+
+class FitmentIndex:
+    """Rows of one category bucketed by join key, plus lookup counters."""
+
+    def __init__(self, name, rows=(), key=join_key):
+        self.name = name
+        self.key = key
+        self.buckets = {}
+        self.rows = 0
+        self.matched = 0
+        self.unmatched = 0
+        self.ambiguous = 0
+        self.misses = []
+        for row in rows:
+            self.add(row)
+
+    @classmethod
+    def from_csv(cls, name, path, key=join_key):
+        """Index a fitment CSV; a missing file gives an empty index."""
+        path = Path(path)
+        if not path.exists():
+            return cls(name, key=key)
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            return cls(name, csv.DictReader(f), key=key)
+
+    def add(self, row):
+        self.buckets.setdefault(self.key(row), []).append(row)
+        self.rows += 1
+
+    def __len__(self):
+        return self.rows
+
+    def __contains__(self, record):
+        return self.key(record) in self.buckets
+
+    def many(self, record):
+        """All rows for `record` (one-to-many); an empty list counts as a miss."""
+        key = self.key(record)
+        bucket = self.buckets.get(key)
+        if not bucket:
+            self._miss(key)
+            return []
+        self.matched += 1
+        return bucket
+
+    def one(self, record):
+        """The row for `record` (one-to-one), or None. With several candidates
+        the first indexed row wins and the lookup is counted as ambiguous."""
+        key = self.key(record)
+        bucket = self.buckets.get(key)
+        if not bucket:
+            self._miss(key)
+            return None
+        self.matched += 1
+        if len(bucket) > 1:
+            self.ambiguous += 1
+        return bucket[0]
+
+    def _miss(self, key):
+        self.unmatched += 1
+        if len(self.misses) < MISS_SAMPLES:
+            self.misses.append(key)
+
+    def summary(self):
+        return {
+            "rows": self.rows,
+            "keys": len(self.buckets),
+            "matched": self.matched,
+            "unmatched": self.unmatched,
+            "ambiguous": self.ambiguous,
+            "misses": [str(k) for k in self.misses],
+        }
+
+    def report(self, label=None):
+        """Print lookup counts (and sample misses) and feed them to the profiler."""
+        label = label or self.name
+        print(f"  Join {label}: {self.matched} matched, {self.unmatched} unmatched, {self.ambiguous} ambiguous ({self.rows} rows indexed)")
+        for key in self.misses:
+            print(f"    [MISS] {key}")
+        if self.unmatched > len(self.misses):
+            print(f"    ... and {self.unmatched - len(self.misses)} more")
+        instrumentation.count(f"join_{self.name}_matched", self.matched)
+        instrumentation.count(f"join_{self.name}_unmatched", self.unmatched)
+        instrumentation.count(f"join_{self.name}_ambiguous", self.ambiguous)
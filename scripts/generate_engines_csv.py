@@ -4,10 +4,14 @@ EnginesYMMTFitmentWriter v1
 Generates engines.csv with YMMT engine specs (US + Metric in same cell).
 """
 
-import json
-import csv
+import argparse
 from pathlib import Path
 
+from engine_resolver import resolve_engine_code
+from fitment_build import RowEmitter, run_build
+import instrumentation
+from fitment_join import FitmentIndex
+
 SCRIPT_DIR = Path(__file__).parent
 REPO_ROOT = SCRIPT_DIR.parent
 VEHICLES_JSON = REPO_ROOT / "assets" / "seed" / "vehicles.json"
@@ -1004,148 +1008,6 @@ ENGINE_SPECS = {
         "confidence": "high"
     },
 }
-def get_engine_base(engine_code, model, year_val, trim=""):
-    if not engine_code: return ""
-    code = engine_code.strip()
-    
-    # Direct mappings for specific codes
-    direct_map = {
-        # Toyota OEM
-        "1NR-FE": "1NR-FE", "1NZ-FE": "1NZ-FE",
-        # Kei engines
-        "EN07": "EN07", "EN05": "EN05",
-        "KF": "KF",
-        # JDM-specific EJ
-        "EJ20G": "EJ20G", "EJ20K": "EJ20K", 
-        "EJ206": "EJ206", "EJ208": "EJ208",
-        "EJ20X": "EJ20X", "EJ20Y": "EJ20Y",
-        # Other JDM
-        "EL15": "EL15", "EF10": "EF10",
-        "EZ30R": "EZ30R",
-        # FA/FB variants
-        "FB16": "FB16", "CB18": "CB18",
-    }
-    for pattern, result in direct_map.items():
-        if pattern in code:
-            return result
-    
-    # Handle Supercharged/Turbo variants
-    if "EN07" in code:
-        if "Supercharged" in code or "SC" in code:
-            return "EN07S"
-        return "EN07"
-    
-    if "KF" in code:
-        if "Turbo" in code:
-            return "KFT"
-        return "KF"
-    
-    if "FB16" in code:
-        if "Turbo" in code or "DIT" in code:
-            return "FB16T"
-        return "FB16"
-    
-    if "FB20" in code:
-        if "Hybrid" in code:
-            return "FB20H"
-    
-    # 5-char codes check for USDM
-    patterns = [
-        ("EA71", "EA71"), ("EA82T", "EA82T"), ("EA82", "EA82"), ("EA81", "EA81"),
-        ("EF12", "EF12"), ("ER27", "ER27"), ("EG33", "EG33"),
-        ("Electric", "Electric"),
-        ("EJ257", "EJ257"), ("EJ255", "EJ255"), ("EJ207", "EJ207"), ("EJ205", "EJ205"),
-        ("EJ253", "EJ253"), ("EJ252", "EJ253"), ("EJ251", "EJ251"), ("EJ25D", "EJ25D"), ("EJ25", "EJ253"),
-        ("EJ22T", "EJ22T"), ("EJ22", "EJ22E"), ("EJ18", "EJ18E"),
-        ("EJ15", "EJ15"), ("EJ16", "EJ16"),  # JDM specific, map to themselves
-    ]
-    for pattern, result in patterns:
-        if pattern in code:
-            if pattern == "EJ20" and "5" in code: return "EJ205"
-            if pattern == "EJ20" and "7" in code: return "EJ207"
-            if pattern == "EJ20" and "8" in code: return "EJ208"
-            if pattern == "EJ20" and "6" in code: return "EJ206"
-            if pattern == "EJ20" and "X" in code: return "EJ20X"
-            if pattern == "EJ20" and "Y" in code: return "EJ20Y"
-            if pattern == "EJ20" and "K" in code: return "EJ20K"
-            if pattern == "EJ20" and "G" in code: return "EJ20G"
-            return result
-    
-    # Handle EJ20 variants based on trim/year
-    if "EJ20" in code:
-        if "Turbo" in code:
-            try:
-                y = int(year_val)
-            except:
-                y = 0
-            if y >= 2000:
-                return "EJ205"  # GD WRX
-            elif y >= 1996:
-                return "EJ20K"  # GC8 late
-            else:
-                return "EJ20G"  # GC8 early
-        return "EJ20G"  # Default turbo
-    
-    # Dynamic 5-char mapping for EZ/FA/FB
-    if "EZ36" in code: return "EZ36D"
-    if "EZ30" in code:
-        if "R" in code or "Spec" in trim.upper():
-            return "EZ30R"
-        return "EZ30D"
-    
-    if "FA20" in code:
-        # FA20F (Turbo) vs FA20D (NA)
-        if "BRZ" in model: return "FA20D"
-        if "WRX" in model or "Forester" in model or "Levorg" in model: return "FA20F"
-        return "FA20D"
-    
-    if "FA24" in code:
-        # FA24F (Turbo) vs FA24D (NA)
-        if "BRZ" in model or "GR86" in model: return "FA24D"
-        return "FA24F"
-    
-    try:
-        y = int(year_val)
-    except:
-        y = 0
-        
-    if "FB20" in code:
-        if "Hybrid" in code:
-            return "FB20H"
-        # FB20B (Port) vs FB20D (DI)
-        if "Crosstrek" in model or "XV" in model:
-            if y >= 2018: return "FB20D"
-            else: return "FB20B"
-        if "Impreza" in model:
-            if y >= 2017: return "FB20D"
-            else: return "FB20B"
-        if "Forester" in model:
-            if y >= 2019: return "FB20D"
-            pass
-        if y >= 2017: return "FB20D"
-        return "FB20B"
-
-    if "FB25" in code:
-        # FB25B (Port) vs FB25D (DI)
-        if "Forester" in model:
-            if y >= 2019: return "FB25D"
-            else: return "FB25B"
-        if "Legacy" in model or "Outback" in model:
-            if y >= 2020: return "FB25D"
-            else: return "FB25B"
-        if "Crosstrek" in model or "XV" in model: return "FB25D"
-        if "Impreza" in model: return "FB25D"
-        if "Exiga" in model: return "FB25B"
-        
-        if y >= 2019: return "FB25D"
-        return "FB25B"
-    
-    if "CB18" in code:
-        return "CB18"
-
-    return ""
-
-
 def extract_market(trim):
     t = trim.upper()
     if "(US)" in t or "USDM" in t: return "USDM"
@@ -1160,7 +1022,7 @@ def create_row(v):
     engine_code_raw = v.get("engineCode", "")
     market = extract_market(trim)
     
-    eng = get_engine_base(engine_code_raw, model, year, trim)
+    eng = resolve_engine_code(engine_code_raw, model, year, trim)
     specs = ENGINE_SPECS.get(eng, {})
     
     row = {
@@ -1193,41 +1055,45 @@ def create_row(v):
     }
     return row
 
+class EnginesEmitter(RowEmitter):
+    name = "engines"
+    path = ENGINES_CSV
+    header = HEADER
+
+    def begin(self, ctx):
+        # Published for emitters that enrich from engines (e.g. torque)
+        ctx.indexes["engines"] = FitmentIndex("engines")
+
+    def create_row(self, v, ctx):
+        return create_row(v)
+
+    def spec_inputs(self, v, ctx):
+        eng = resolve_engine_code(v.get("engineCode", ""), v.get("model", ""), v.get("year", ""), v.get("trim", ""))
+        return ENGINE_SPECS.get(eng)
+
+    def emit(self, v, ctx):
+        row = super().emit(v, ctx)
+        if row is not None:
+            ctx.indexes["engines"].add(row)
+        return row
+
+    def report(self):
+        rows = self.rows
+        with_code = sum(1 for r in rows if r["engine_code"])
+        with_power = sum(1 for r in rows if r["power"])
+        with_disp = sum(1 for r in rows if r["displacement"])
+        print(f"\nValidation:")
+        print(f"  Rows with engine code: {with_code}/{len(rows)}")
+        print(f"  Rows with displacement: {with_disp}/{len(rows)}")
+        print(f"  Rows with power: {with_power}/{len(rows)}")
+
 def main():
-    print("Loading vehicles.json...")
-    with open(VEHICLES_JSON, "r", encoding="utf-8-sig") as f:
-        vehicles = json.load(f)
-    print(f"Found {len(vehicles)} vehicles")
-    
-    vehicles_sorted = sorted(vehicles, key=lambda v: (v.get("year", 9999), v.get("make", ""), v.get("model", ""), v.get("trim", "")))
-    
-    print("Generating engines rows...")
-    rows, seen = [], set()
-    for v in vehicles_sorted:
-        row = create_row(v)
-        key = (row["year"], row["make"], row["model"], row["trim"], row["body"], row["market"])
-        if key in seen: continue
-        seen.add(key)
-        rows.append(row)
-    
-    print(f"Writing {len(rows)} rows to engines.csv...")
-    ENGINES_CSV.parent.mkdir(parents=True, exist_ok=True)
-    
-    with open(ENGINES_CSV, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=HEADER, quoting=csv.QUOTE_MINIMAL)
-        writer.writeheader()
-        writer.writerows(rows)
-    
+    parser = argparse.ArgumentParser(description="Generate engines.csv from vehicles.json")
+    instrumentation.add_argument(parser)
+    args = parser.parse_args()
+    instrumentation.setup(__file__, args.profile)
+    run_build([EnginesEmitter()])
     print(f"Done! Written to {ENGINES_CSV}")
-    
-    # Validation
-    with_code = sum(1 for r in rows if r["engine_code"])
-    with_power = sum(1 for r in rows if r["power"])
-    with_disp = sum(1 for r in rows if r["displacement"])
-    print(f"\nValidation:")
-    print(f"  Rows with engine code: {with_code}/{len(rows)}")
-    print(f"  Rows with displacement: {with_disp}/{len(rows)}")
-    print(f"  Rows with power: {with_power}/{len(rows)}")
 
 if __name__ == "__main__":
     main()
@@ -4,10 +4,13 @@ FluidsYMMTFitmentWriter v2 Script
 Generates fluids.csv with proper fluid TYPES/SPECS in *_unit columns.
 """
 
-import json
-import csv
+import argparse
 from pathlib import Path
 
+from engine_resolver import resolve_fluid_code
+from fitment_build import RowEmitter, run_build
+import instrumentation
+
 SCRIPT_DIR = Path(__file__).parent
 REPO_ROOT = SCRIPT_DIR.parent
 VEHICLES_JSON = REPO_ROOT / "assets" / "seed" / "vehicles.json"
@@ -470,46 +473,38 @@ ENGINE_SPECS = {
 }
 
 
-def get_engine_base(engine_code):
-    if not engine_code:
-        return ""
-    code = engine_code.strip()
-    
-    # JDM-specific direct mappings first
-    jdm_patterns = [
-        ("1NR-FE", "1NR-FE"), ("1NZ-FE", "1NZ-FE"),
-        ("EN07", "EN07"), ("EN05", "EN05"),
-        ("KF", "KF"),
-        ("CB18", "CB18"), ("FB16", "FB16"),
-        ("EJ20G", "EJ20G"), ("EJ20K", "EJ20K"),
-        ("EJ206", "EJ206"), ("EJ208", "EJ208"),
-        ("EJ20X", "EJ20X"), ("EJ20Y", "EJ20Y"),
-        ("EL15", "EL15"), ("EF10", "EF10"),
-        ("EJ15", "EJ15"), ("EJ16", "EJ16"),
-    ]
-    for pattern, result in jdm_patterns:
-        if pattern in code:
-            return result
-    
-    # Standard engine patterns
-    patterns = [
-        ("EA71", "EA71"), ("EA82T", "EA82T"), ("EA82", "EA82"), ("EA81", "EA81"),
-        ("EF12", "EF12"), ("ER27", "ER27"), ("EG33", "EG33"),
-        ("FA24", "FA24"), ("FA20", "FA20"), ("FB25", "FB25"), ("FB20", "FB20"),
-        ("Electric", "Electric"),
-        ("EZ36", "EZ36"), ("EZ30", "EZ30"),
-        ("EJ257", "EJ257"), ("EJ255", "EJ255"), ("EJ207", "EJ207"), ("EJ205", "EJ205"),
-        ("EJ253", "EJ253"), ("EJ252", "EJ253"), ("EJ251", "EJ251"), ("EJ25D", "EJ25D"), ("EJ25", "EJ25"),
-        ("EJ22T", "EJ22T"), ("EJ22", "EJ22"), ("EJ18", "EJ18"), ("EJ20", "EJ20"),
-    ]
-    for pattern, result in patterns:
-        if pattern in code:
-            if pattern == "EJ22" and "Turbo" in code:
-                return "EJ22T"
-            if pattern == "EJ20" and "Turbo" in code:
-                return "EJ20"
-            return result
-    return ""
+# Per-vehicle cells from the FSM that the engine tables can't express.
+# Format: { (year, model, trim): { column: value } }, applied over the
+# generated row.
+STI_US_WASHER = {
+    "washer_fluid_qty": "capacity: 4.2 qt / 4.0 L", "washer_fluid_unit": "Washer Fluid",
+    "notes": "6MT; front diff shared; washer: fill to max; Intercooler spray: 3.8 L",
+}
+OUTBACK_36R_US = {
+    "body": "Crossover",
+    "engine_oil_qty": "w/ filter: 6.9 qt / 6.5 L", "engine_oil_unit": "5W-30 Synthetic (API SM/SN)",
+    "engine_coolant_qty": "capacity: 8.6 qt / 8.1 L", "engine_coolant_unit": "Subaru Super Coolant",
+    "brake_fluid_qty": "", "brake_fluid_unit": "",
+    "power_steering_fluid_qty": "capacity: 0.7 qt / 0.7 L", "power_steering_fluid_unit": "",
+    "manual_trans_fluid_qty": "n/a", "manual_trans_fluid_unit": "",
+    "automatic_trans_fluid_qty": "total: 10.2 qt / 9.6 L", "automatic_trans_fluid_unit": "",
+    "cvt_fluid_qty": "", "cvt_fluid_unit": "",
+    "front_diff_fluid_qty": "capacity: 1.3 - 1.5 qt / 1.2 - 1.4 L", "front_diff_fluid_unit": "",
+    "rear_diff_fluid_qty": "capacity: 0.8 qt / 0.8 L", "rear_diff_fluid_unit": "",
+    "ac_refrigerant_qty": "14.1 - 15.9 oz / 400 - 450 g", "ac_refrigerant_unit": "",
+    "notes": "5EAT Auto; Hydraulic PS",
+    "source_1": "Subaru FSM", "source_2": "", "confidence": "high",
+}
+VEHICLE_OVERRIDES = {
+    **{(year, "Impreza", trim): STI_US_WASHER
+       for year in range(2004, 2008) for trim in ("WRX STI (US)", "WRX STI Sedan (US)")},
+    (2004, "Impreza", "WRX STI (US)"): {
+        **STI_US_WASHER,
+        "notes": "6MT; front diff shared; washer: 4.0 L | fill to max; Intercooler spray: 3.8 L",
+    },
+    **{(2012, "Outback", trim): OUTBACK_36R_US
+       for trim in ("3.6R (US)", "3.6R Limited (US)", "3.6R Premium (US)")},
+}
 
 
 def extract_market(trim):
@@ -536,7 +531,7 @@ def create_row(v):
     trim = v.get("trim", "")
     engine_code = v.get("engineCode", "")
     market = extract_market(trim)
-    eng = get_engine_base(engine_code)
+    eng = resolve_fluid_code(engine_code)
     specs = ENGINE_SPECS.get(eng, {})
     
     mt, at, awd = has_mt(trim, model, engine_code), has_at(trim, model, engine_code), is_awd(trim, model)
@@ -589,49 +584,42 @@ def create_row(v):
         "source_2": specs.get("source_2", ""),
         "confidence": specs.get("confidence", "low") if eng else "low"
     }
+    row.update(VEHICLE_OVERRIDES.get((year, model, trim), {}))
     return row
 
+class FluidsEmitter(RowEmitter):
+    name = "fluids"
+    path = FLUIDS_CSV
+    header = HEADER
+
+    def create_row(self, v, ctx):
+        return create_row(v)
+
+    def spec_inputs(self, v, ctx):
+        return ENGINE_SPECS.get(resolve_fluid_code(v.get("engineCode", "")))
+
+    def report(self):
+        rows = self.rows
+        with_oil = sum(1 for r in rows if r["engine_oil_qty"])
+        with_spec = sum(1 for r in rows if r["engine_oil_unit"] and "combo" not in r["engine_oil_unit"].lower())
+        print(f"\nValidation:")
+        print(f"  Rows with engine oil qty: {with_oil}/{len(rows)}")
+        print(f"  Rows with proper oil spec (not combo): {with_spec}/{len(rows)}")
+
+        # Check for combo+condition
+        bad = [r for r in rows if "combo" in str(r.get("engine_oil_unit", "")).lower()]
+        if bad:
+            print(f"  ERROR: {len(bad)} rows still have 'combo' in unit!")
+        else:
+            print("  OK: No 'combo+condition' in any unit column!")
+
 def main():
-    print("Loading vehicles.json...")
-    with open(VEHICLES_JSON, "r", encoding="utf-8-sig") as f:
-        vehicles = json.load(f)
-    print(f"Found {len(vehicles)} vehicles")
-    
-    vehicles_sorted = sorted(vehicles, key=lambda v: (v.get("year", 9999), v.get("make", ""), v.get("model", ""), v.get("trim", "")))
-    
-    print("Generating fluids rows with proper fluid specs...")
-    rows, seen = [], set()
-    for v in vehicles_sorted:
-        row = create_row(v)
-        key = (row["year"], row["make"], row["model"], row["trim"], row["body"], row["market"])
-        if key in seen:
-            continue
-        seen.add(key)
-        rows.append(row)
-    
-    print(f"Writing {len(rows)} rows to fluids.csv...")
-    FLUIDS_CSV.parent.mkdir(parents=True, exist_ok=True)
-    
-    with open(FLUIDS_CSV, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=HEADER, quoting=csv.QUOTE_MINIMAL)
-        writer.writeheader()
-        writer.writerows(rows)
-    
+    parser = argparse.ArgumentParser(description="Generate fluids.csv from vehicles.json")
+    instrumentation.add_argument(parser)
+    args = parser.parse_args()
+    instrumentation.setup(__file__, args.profile)
+    run_build([FluidsEmitter()])
     print(f"Done! Written to {FLUIDS_CSV}")
-    
-    # Validation
-    with_oil = sum(1 for r in rows if r["engine_oil_qty"])
-    with_spec = sum(1 for r in rows if r["engine_oil_unit"] and "combo" not in r["engine_oil_unit"].lower())
-    print(f"\nValidation:")
-    print(f"  Rows with engine oil qty: {with_oil}/{len(rows)}")
-    print(f"  Rows with proper oil spec (not combo): {with_spec}/{len(rows)}")
-    
-    # Check for combo+condition
-    bad = [r for r in rows if "combo" in str(r.get("engine_oil_unit", "")).lower()]
-    if bad:
-        print(f"  ERROR: {len(bad)} rows still have 'combo' in unit!")
-    else:
-        print("  OK: No 'combo+condition' in any unit column!")
 
 if __name__ == "__main__":
     main()
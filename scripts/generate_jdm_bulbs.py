@@ -1,20 +1,41 @@
 #!/usr/bin/env python3
 """
 JDM Bulbs Generator
-Adds exterior lighting specifications for JDM vehicles to bulbs.csv
+Adds exterior lighting specifications to bulbs.csv for every vehicle in
+vehicles.json (all markets; the templates started out as JDM data and most
+codes are shared with USDM).
+
+Templates are chosen by the declarative BULB_RULES table: model matcher,
+year range and trim matcher -> template list, first match wins. BulbRules
+compiles the table per model into year segments, so a lookup is one bisect,
+and the resolved rows are memoized per (model, segment, trim class). New
+rows are merged into the sorted bulbs.csv in one streaming pass.
+
+Usage: python3 scripts/generate_jdm_bulbs.py [--market JDM,USDM] [--profile]
 """
 
-import json
+import argparse
 import csv
+import heapq
+import json
+import os
+from bisect import bisect_right
+from itertools import pairwise
 from pathlib import Path
 
+import instrumentation
+from find_vehicle_duplicates import vehicle_market
+from ymmt_key import YMMTKey, canonical_year
+
 REPO = Path(__file__).parent.parent
 VEHICLES_JSON = REPO / "assets" / "seed" / "vehicles.json"
 BULBS_CSV = REPO / "assets" / "seed" / "specs" / "fitment" / "bulbs.csv"
 
-# JDM bulb specifications by model/era
-# Format: (model_contains, year_start, year_end, body_type) -> bulb_specs
-# Each bulb_spec is a list of dicts for each light function
+FIELDNAMES = [
+    "year", "make", "model", "trim", "body", "market",
+    "function_key", "location_hint", "tech", "bulb_code", "base", "qty", "serviceable", "notes",
+    "source_1", "source_2", "confidence",
+]
 
 # Standard JDM bulb codes (many share with USDM)
 STANDARD_FRONT = [
@@ -77,117 +98,198 @@ KEI_REAR = [
 ]
 
 
-def get_bulb_specs(model, year, trim, body):
-    """Returns list of bulb specs for a JDM vehicle"""
-    specs = []
-    y = int(year) if year else 0
-    m = model.upper() if model else ""
-    t = trim.upper() if trim else ""
-    
-    # Kei cars
-    if m in ["SAMBAR", "VIVIO", "PLEO", "R1", "R2", "STELLA", "LUCRA", "REX", "DIAS WAGON"]:
-        specs.extend(KEI_FRONT)
-        specs.extend(KEI_REAR)
-        return specs
-    
+# --- Rules ---
+
+KEI_MODELS = {"SAMBAR", "VIVIO", "PLEO", "R1", "R2", "STELLA", "LUCRA", "REX", "DIAS WAGON"}
+# Matched as substrings, so "WRX" also covers WRX STI and WRX S4
+LED_MODELS = ["LEVORG", "XV", "IMPREZA", "FORESTER", "LEGACY", "OUTBACK", "WRX", "BRZ"]
+SPORT_TRIMS = ["WRX", "STI", "GT", "XT"]
+
+
+def named_in(names):
+    return lambda value: value in names
+
+
+def containing(words):
+    return lambda value: any(w in value for w in words)
+
+
+class BulbRule:
+    """Templates for vehicles whose uppercased model matches `models`, year
+    is within [first, last] and uppercased trim matches `trims` (None
+    matches anything)."""
+
+    def __init__(self, name, templates, models=None, first=0, last=9999, trims=None):
+        self.name = name
+        self.models = models
+        self.first = first
+        self.last = last
+        self.trims = trims
+        self.specs = [spec for template in templates for spec in template]
+
+
+BULB_RULES = [
+    BulbRule("kei", [KEI_FRONT, KEI_REAR], models=named_in(KEI_MODELS)),
     # Modern LED era (2018+)
-    if y >= 2018:
-        if any(x in m for x in ["LEVORG", "XV", "IMPREZA", "FORESTER", "LEGACY", "OUTBACK", "WRX", "BRZ"]):
-            specs.extend(MODERN_LED_FRONT)
-            specs.extend(MODERN_LED_REAR)
-            specs.append(H11_FOG)
-            return specs
-    
-    # Modern halogen era (2008-2017)
-    if y >= 2008:
-        specs.extend(MODERN_HALOGEN_FRONT)
-        specs.extend(STANDARD_REAR)
-        if y >= 2012:
-            specs.append(H11_FOG)
-        else:
-            specs.append(H3_FOG)
+    BulbRule("led", [MODERN_LED_FRONT, MODERN_LED_REAR, [H11_FOG]], models=containing(LED_MODELS), first=2018),
+    # Modern halogen era (2008-2017, and later models without LED lamps)
+    BulbRule("halogen", [MODERN_HALOGEN_FRONT, STANDARD_REAR, [H11_FOG]], first=2012),
+    BulbRule("halogen_h3_fog", [MODERN_HALOGEN_FRONT, STANDARD_REAR, [H3_FOG]], first=2008, last=2011),
+    # Classic era (pre-2008); sport trims add fogs
+    BulbRule("classic_sport", [STANDARD_FRONT, STANDARD_REAR, [H3_FOG]], last=2007, trims=containing(SPORT_TRIMS)),
+    BulbRule("classic", [STANDARD_FRONT, STANDARD_REAR], last=2007),
+]
+
+
+class BulbRules:
+    """BULB_RULES compiled per model: the year axis is cut at every rule
+    boundary and each segment keeps its candidate rules in table order."""
+
+    def __init__(self, rules=BULB_RULES):
+        self.rules = rules
+        self.models = {}
+        self.memo = {}
+
+    def compile(self, model):
+        rules = [r for r in self.rules if r.models is None or r.models(model)]
+        bounds = sorted({0} | {r.first for r in rules} | {r.last + 1 for r in rules})
+        return bounds, [[r for r in rules if r.first <= lo <= r.last] for lo in bounds]
+
+    def lookup(self, model, year, trim):
+        """Bulb spec dicts for a vehicle (empty when no rule applies)."""
+        model = (model or "").upper()
+        compiled = self.models.get(model)
+        if compiled is None:
+            compiled = self.models[model] = self.compile(model)
+        bounds, segments = compiled
+        segment = max(bisect_right(bounds, year) - 1, 0)
+        candidates = segments[segment]
+        trim = (trim or "").upper()
+        trim_class = tuple(r.trims is None or r.trims(trim) for r in candidates)
+        key = (model, segment, trim_class)
+        specs = self.memo.get(key)
+        if specs is None:
+            rule = next((r for r, ok in zip(candidates, trim_class) if ok), None)
+            specs = self.memo[key] = rule.specs if rule else []
         return specs
-    
-    # Classic era (pre-2008)
-    specs.extend(STANDARD_FRONT)
-    specs.extend(STANDARD_REAR)
-    if "WRX" in t or "STI" in t or "GT" in t or "XT" in t:
-        specs.append(H3_FOG)
-    
-    return specs
+
+
+RULES = BulbRules()
+
+
+def get_bulb_specs(model, year, trim, body):
+    """Returns list of bulb specs for a vehicle"""
+    return list(RULES.lookup(model, canonical_year(year), trim))
+
+
+# --- bulbs.csv ---
+
+def row_sort_key(r):
+    return (int(r["year"]) if r["year"] not in ("", None) else 9999, r["make"], r["model"], r["trim"], r["function_key"])
+
+
+def spec_row(v, market, spec):
+    """Templates come from JDM sources; other markets cite them as derived."""
+    return {
+        "year": v.get("year", ""),
+        "make": v.get("make", "Subaru"),
+        "model": v.get("model", ""),
+        "trim": v.get("trim", ""),
+        "body": v.get("body", ""),
+        "market": market,
+        "function_key": spec["function_key"],
+        "location_hint": spec["location_hint"],
+        "tech": spec["tech"],
+        "bulb_code": spec["bulb_code"],
+        "base": spec.get("base", ""),
+        "qty": spec["qty"],
+        "serviceable": str(spec["serviceable"]).lower(),
+        "notes": spec.get("notes", ""),
+        "source_1": "JDM FSM" if market == "JDM" else "derived from JDM template",
+        "source_2": "JDM specs",
+        "confidence": "medium" if market == "JDM" else "low",
+    }
+
+
+def load_bulbs(path):
+    """(fieldnames, rows) of bulbs.csv, sorted by row_sort_key; a missing
+    file is an empty table."""
+    if not path.exists():
+        return FIELDNAMES, []
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        rows = list(reader)
+        fieldnames = reader.fieldnames or FIELDNAMES
+    if any(row_sort_key(a) > row_sort_key(b) for a, b in pairwise(rows)):
+        rows.sort(key=row_sort_key)
+    return fieldnames, rows
+
+
+def write_bulbs(path, fieldnames, rows):
+    """Stream rows to path via a temporary file."""
+    tmp = path.with_name(path.name + ".tmp")
+    count = 0
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, quoting=csv.QUOTE_MINIMAL, extrasaction="ignore")
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    os.replace(tmp, path)
+    return count
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Add bulb rows to bulbs.csv")
+    parser.add_argument("--market", help="Comma-separated markets to generate (default: all)")
+    instrumentation.add_argument(parser)
+    args = parser.parse_args()
+    instrumentation.setup(__file__, args.profile)
+    markets = {m.strip().upper() for m in args.market.split(",")} if args.market else None
+
+    instrumentation.begin("load")
     print("Loading vehicles.json...")
     with open(VEHICLES_JSON, "r", encoding="utf-8-sig") as f:
         vehicles = json.load(f)
-    
-    # Load existing bulbs.csv
-    existing_keys = set()
-    existing_rows = []
-    with open(BULBS_CSV, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        fieldnames = reader.fieldnames
-        for row in reader:
-            key = (row["year"], row["make"], row["model"], row["trim"], row["function_key"])
-            existing_keys.add(key)
-            existing_rows.append(row)
-    
+
+    fieldnames, existing_rows = load_bulbs(BULBS_CSV)
+    existing_keys = {
+        (YMMTKey(row["year"], row["make"], row["model"], row["trim"]), row["function_key"])
+        for row in existing_rows
+    }
     print(f"Existing bulbs.csv rows: {len(existing_rows)}")
-    
-    # Find JDM vehicles that need bulb specs
-    jdm_vehicles = [v for v in vehicles if "(JDM)" in v.get("trim", "") or v.get("market", "") == "JDM"]
-    print(f"JDM vehicles in vehicles.json: {len(jdm_vehicles)}")
-    
-    # Generate specs for missing JDM vehicles
+    instrumentation.count("rows_in", len(existing_rows))
+
+    # Generate specs for vehicles that lack them
+    instrumentation.begin("resolve")
     new_rows = []
-    for v in jdm_vehicles:
-        year = v.get("year", "")
-        make = v.get("make", "Subaru")
-        model = v.get("model", "")
-        trim = v.get("trim", "")
-        body = v.get("body", "")
-        
-        bulb_specs = get_bulb_specs(model, year, trim, body)
-        
-        for spec in bulb_specs:
-            key = (str(year), make, model, trim, spec["function_key"])
-            if key not in existing_keys:
-                row = {
-                    "year": year,
-                    "make": make,
-                    "model": model,
-                    "trim": trim,
-                    "body": body,
-                    "market": "JDM",
-                    "function_key": spec["function_key"],
-                    "location_hint": spec["location_hint"],
-                    "tech": spec["tech"],
-                    "bulb_code": spec["bulb_code"],
-                    "base": spec.get("base", ""),
-                    "qty": spec["qty"],
-                    "serviceable": str(spec["serviceable"]).lower(),
-                    "notes": spec.get("notes", ""),
-                    "source_1": "JDM FSM",
-                    "source_2": "JDM specs",
-                    "confidence": "medium"
-                }
-                new_rows.append(row)
-                existing_keys.add(key)
-    
-    print(f"New JDM bulb rows generated: {len(new_rows)}")
-    
-    # Combine and sort
-    all_rows = existing_rows + new_rows
-    all_rows.sort(key=lambda r: (int(r["year"]) if r["year"] else 9999, r["make"], r["model"], r["trim"], r["function_key"]))
-    
-    # Write back
-    with open(BULBS_CSV, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames, quoting=csv.QUOTE_MINIMAL)
-        writer.writeheader()
-        writer.writerows(all_rows)
-    
-    print(f"Total bulbs.csv rows: {len(all_rows)}")
+    per_market = {}
+    for v in vehicles:
+        market = vehicle_market(v) or "USDM"
+        if markets and market not in markets:
+            continue
+        key = YMMTKey(v.get("year"), v.get("make", "Subaru"), v.get("model"), v.get("trim"))
+        for spec in RULES.lookup(v.get("model"), key.year, v.get("trim")):
+            row_key = (key, spec["function_key"])
+            if row_key not in existing_keys:
+                new_rows.append(spec_row(v, market, spec))
+                existing_keys.add(row_key)
+                per_market[market] = per_market.get(market, 0) + 1
+
+    print(f"New bulb rows generated: {len(new_rows)}")
+    for market, count in sorted(per_market.items()):
+        print(f"  {market}: {count}")
+    print(f"Rule index: {len(RULES.models)} models, {len(RULES.memo)} memoized template sets")
+    instrumentation.count("rows_added", len(new_rows))
+
+    # Merge into the sorted table and write back
+    instrumentation.begin("write")
+    new_rows.sort(key=row_sort_key)
+    total = write_bulbs(BULBS_CSV, fieldnames, heapq.merge(existing_rows, new_rows, key=row_sort_key))
+    instrumentation.count("rows_out", total)
+    instrumentation.end()
+
+    print(f"Total bulbs.csv rows: {total}")
     print(f"Written to {BULBS_CSV}")
 
 
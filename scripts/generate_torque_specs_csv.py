@@ -4,11 +4,14 @@ TorqueSpecsYMMTFitmentWriter
 Generates torque_specs.csv with YMMT torque specifications.
 """
 
-import json
-import csv
-import math
+import argparse
 from pathlib import Path
 
+import instrumentation
+from fitment_build import RowEmitter, run_build
+from fitment_join import FitmentIndex
+from ymmt_key import YMMTKey
+
 REPO = Path(__file__).parent.parent
 VEHICLES_JSON = REPO / "assets" / "seed" / "vehicles.json"
 ENGINES_CSV = REPO / "assets" / "seed" / "specs" / "fitment" / "engines.csv"
@@ -44,15 +47,7 @@ def fmt_torque(nm, condition="capacity", round_digits=0):
     return f"{condition}: {nm_str} N·m / {ftlb_str} ft-lb"
 
 def load_engines():
-    eng_map = {}
-    if not ENGINES_CSV.exists():
-        return {}
-    with open(ENGINES_CSV, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            key = (row["year"], row["make"], row["model"], row["trim"], row["market"])
-            eng_map[key] = row
-    return eng_map
+    return FitmentIndex.from_csv("engines", ENGINES_CSV)
 
 def get_trans_type(trim, model, year, engine_row):
     # Heuristic to guess transmission
@@ -206,47 +201,55 @@ def get_specs(v, eng_row):
 
     return row
 
-def main():
-    print("Loading engines.csv...")
-    eng_map = load_engines()
-    
-    print("Loading vehicles.json...")
-    with open(VEHICLES_JSON, "r", encoding="utf-8-sig") as f:
-        vehicles = json.load(f)
-    
-    # Sort
-    vehicles.sort(key=lambda v: (v.get("year", 9999), v.get("make", ""), v.get("model", ""), v.get("trim", "")))
-    
-    rows = []
-    seen = set()
-    
-    print("Generating torque spex...")
-    for v in vehicles:
-        year = v.get("year", "")
-        make = v.get("make", "")
-        model = v.get("model", "")
+class TorqueEmitter(RowEmitter):
+    name = "torque"
+    path = TORQUE_CSV
+    header = HEADER
+
+    def __init__(self):
+        super().__init__()
+        self.engines = None
+        self._engine_for = None
+        self._engine = None
+
+    def begin(self, ctx):
+        # Standalone runs enrich from the engines.csv on disk
+        if not ctx.has("engines"):
+            print("Loading engines.csv...")
+            ctx.indexes["engines"] = load_engines()
+        self.engines = ctx.indexes["engines"]
+
+    def engine_row(self, v, ctx):
+        # spec_inputs and create_row both ask; look each vehicle up once
+        if self._engine_for is not v:
+            self._engine_for = v
+            self._engine = self.engines.one(v)
+        return self._engine
+
+    def create_row(self, v, ctx):
+        return get_specs(v, self.engine_row(v, ctx))
+
+    def spec_inputs(self, v, ctx):
+        eng_row = self.engine_row(v, ctx)
+        if not eng_row:
+            return None
+        return [eng_row.get("engine_family", ""), eng_row.get("engine_code", "")]
+
+    def dedupe_key(self, row, v):
         trim = v.get("trim", "")
-        body = v.get("body", "")
         market = "JDM" if "(JDM)" in trim or v.get("market") == "JDM" else "USDM"
-        
-        # Engine lookup key
-        key = (str(year), make, model, trim, market)
-        eng_row = eng_map.get(key)
-        
-        row = get_specs(v, eng_row)
-        
-        uniq_key = (year, make, model, trim, body, market)
-        if uniq_key in seen:
-            continue
-        seen.add(uniq_key)
-        rows.append(row)
-
-    print(f"Writing {len(rows)} rows to torque_specs.csv...")
-    TORQUE_CSV.parent.mkdir(parents=True, exist_ok=True)
-    with open(TORQUE_CSV, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=HEADER, quoting=csv.QUOTE_MINIMAL)
-        writer.writeheader()
-        writer.writerows(rows)
+        return YMMTKey(v.get("year"), v.get("make"), v.get("model"), trim, v.get("body"), market)
+
+    def report(self):
+        print(f"\nValidation:")
+        self.engines.report()
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate torque_specs.csv from vehicles.json")
+    instrumentation.add_argument(parser)
+    args = parser.parse_args()
+    instrumentation.setup(__file__, args.profile)
+    run_build([TorqueEmitter()])
     print("Done!")
 
 if __name__ == "__main__":
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Seed Script Instrumentation
+Opt-in stage tracing shared by every script under scripts/ and tool/seed/.
+
+Enable with `--profile` (or `--profile cprofile`) on any script, or by setting
+SEED_PROFILE=trace|cprofile in the environment. When enabled, each named stage
+records its wall time, tracemalloc peak and counters (rows in/out, duplicates
+dropped, cache hits, ...). At exit the trace is printed and written to
+.cache/profile/<script>.json; in cprofile mode every top-level stage is also
+profiled and the hottest one's stats are dumped as <script>.<stage>.prof.
+
+Library code calls the module-level `stage()` and `count()` helpers, which
+are no-ops until a script calls `setup()`:
+
+    with instrumentation.stage("load"):
+        rows = load()
+    instrumentation.count("rows_in", len(rows))
+
+Straight-line scripts can mark consecutive stages with `begin()` instead:
+
+    instrumentation.begin("load")
+    ...
+    instrumentation.begin("write")
+"""
+
+import atexit
+import cProfile
+import json
+import os
+import pstats
+import re
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).parent.parent
+PROFILE_DIR = REPO_ROOT / ".cache" / "profile"
+ENV_VAR = "SEED_PROFILE"
+MODES = ("trace", "cprofile")
+
+
+class Profiler:
+    """Collects a flat list of stage records; nested stages are recorded too."""
+
+    def __init__(self, script, mode=None):
+        self.script = script
+        self.mode = mode
+        self.enabled = mode in MODES
+        self.stages = []
+        self.totals = {}
+        self._stack = []
+        self._profiles = {}
+        self._open = None
+        self._started = time.perf_counter()
+        if self.enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name):
+        if not self.enabled:
+            yield
+            return
+        if self._stack:
+            # Fold the running peak into the parent before measuring the child
+            parent = self._stack[-1]
+            parent["peak"] = max(parent["peak"], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        # Only one cProfile can be active, so nested stages share their parent's
+        profile = cProfile.Profile() if self.mode == "cprofile" and not self._stack else None
+        frame = {"name": name, "peak": 0, "counters": {}}
+        # Reserve the record now so the trace lists parents before children
+        index = len(self.stages)
+        self.stages.append(None)
+        self._stack.append(frame)
+        started = time.perf_counter()
+        if profile:
+            profile.enable()
+        try:
+            yield
+        finally:
+            if profile:
+                profile.disable()
+            seconds = time.perf_counter() - started
+            self._stack.pop()
+            peak = max(frame["peak"], tracemalloc.get_traced_memory()[1])
+            if self._stack:
+                self._stack[-1]["peak"] = max(self._stack[-1]["peak"], peak)
+            tracemalloc.reset_peak()
+            self.stages[index] = {
+                "stage": name,
+                "depth": len(self._stack),
+                "seconds": round(seconds, 4),
+                "peak_kb": round(peak / 1024, 1),
+                "counters": frame["counters"],
+            }
+            if profile:
+                self._profiles[index] = profile
+
+    def begin(self, name):
+        """Start a stage that runs until the next begin() or end()."""
+        self.end()
+        if self.enabled:
+            self._open = self.stage(name)
+            self._open.__enter__()
+
+    def end(self):
+        if self._open is not None:
+            self._open, opened = None, self._open
+            opened.__exit__(None, None, None)
+
+    def count(self, key, n=1):
+        if not self.enabled:
+            return
+        self.totals[key] = self.totals.get(key, 0) + n
+        if self._stack:
+            counters = self._stack[-1]["counters"]
+            counters[key] = counters.get(key, 0) + n
+
+    def report(self):
+        return {
+            "script": self.script,
+            "mode": self.mode,
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "seconds": round(time.perf_counter() - self._started, 4),
+            "stages": self.stages,
+            "counters": self.totals,
+        }
+
+    def finish(self):
+        if not self.enabled:
+            return None
+        self.end()
+        report = self.report()
+        print(f"\n[profile] {self.script}: {report['seconds']:.3f}s total")
+        for r in self.stages:
+            counters = ", ".join(f"{k}={v}" for k, v in r["counters"].items())
+            indent = "  " * r["depth"]
+            print(f"[profile]   {indent}{r['stage']:<{24 - len(indent)}} {r['seconds'] * 1000:>10.1f} ms {r['peak_kb'] / 1024:>8.1f} MB  {counters}")
+
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        if self._profiles:
+            # Hottest top-level stage by wall time
+            index = max(self._profiles, key=lambda i: self.stages[i]["seconds"])
+            name = self.stages[index]["stage"]
+            prof_path = PROFILE_DIR / f"{self.script}.{re.sub(r'[^A-Za-z0-9_.-]+', '_', name)}.prof"
+            self._profiles[index].dump_stats(str(prof_path))
+            report["cprofile"] = {"stage": name, "path": str(prof_path)}
+            print(f"[profile] cProfile of hottest stage '{name}' written to {prof_path}")
+            pstats.Stats(str(prof_path)).sort_stats("cumulative").print_stats(15)
+
+        trace_path = PROFILE_DIR / f"{self.script}.json"
+        with open(trace_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(report, indent=2) + "\n")
+        print(f"[profile] Trace written to {trace_path}")
+        return report
+
+
+_active = Profiler(None)
+
+
+def add_argument(parser):
+    parser.add_argument(
+        "--profile", nargs="?", const="trace", choices=MODES,
+        help=f"Print and save a per-stage timing/memory trace (also ${ENV_VAR}); 'cprofile' adds cProfile stats for the hottest stage",
+    )
+
+
+def setup(script, mode=None):
+    """Enable profiling for this process if `mode` or $SEED_PROFILE asks for it."""
+    global _active
+    mode = mode or os.environ.get(ENV_VAR) or None
+    if mode == "1":
+        mode = "trace"
+    _active = Profiler(Path(script).stem, mode)
+    if _active.enabled:
+        atexit.register(_active.finish)
+    return _active
+
+
+def stage(name):
+    return _active.stage(name)
+
+
+def begin(name):
+    _active.begin(name)
+
+
+def end():
+    _active.end()
+
+
+def count(key, n=1):
+    _active.count(key, n)
@@ -9,13 +9,17 @@ Expands the bulb resolution with:
 4. More comprehensive model coverage
 """
 
+import argparse
 import json
 import csv
+from bisect import bisect_right
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 from datetime import datetime
 import os
 
+import instrumentation
+
 # Paths
 SCRIPT_DIR = Path(__file__).parent
 ASSETS_DIR = SCRIPT_DIR.parent / "assets" / "seed"
@@ -441,48 +445,102 @@ JDM_REAR_FOG_SPECS = {
 }
 
 
-def lookup_spec(model: str, year: int, func_key: str, market: str) -> Optional[Tuple[str, str]]:
-    """Look up spec from research tables."""
-    model_norm = model.strip()
-    
-    # Tail/Brake
-    if func_key in ("tail", "brake"):
-        for (mdl, y1, y2), specs in TAIL_BRAKE_SPECS.items():
-            if mdl == model_norm and y1 <= year <= y2:
-                if func_key in specs:
-                    return specs[func_key]
-        return None
-    
-    # Turn signals
-    if func_key in ("turn_front", "turn_rear"):
-        for (mdl, y1, y2), specs in TURN_SPECS.items():
-            if mdl == model_norm and y1 <= year <= y2:
-                if func_key in specs:
-                    return specs[func_key]
-        return None
-    
-    # Reverse
-    if func_key == "reverse":
-        for (mdl, y1, y2), spec in REVERSE_SPECS.items():
-            if mdl == model_norm and y1 <= year <= y2:
-                return spec
-        return None
-    
-    # License plate
-    if func_key == "license_plate":
-        for (mdl, y1, y2), spec in LICENSE_PLATE_SPECS.items():
-            if (mdl == model_norm or mdl == "_default_") and y1 <= year <= y2:
+# ============================================================================
+# INTERVAL INDEX
+# ============================================================================
+
+# (table, functions, market scope). Single-function tables map key -> spec;
+# multi-function tables map key -> {function: spec}. Scope None = all markets.
+SPEC_TABLES = [
+    (TAIL_BRAKE_SPECS, ("tail", "brake"), None),
+    (TURN_SPECS, ("turn_front", "turn_rear"), None),
+    (REVERSE_SPECS, ("reverse",), None),
+    (LICENSE_PLATE_SPECS, ("license_plate",), None),
+    (JDM_REAR_FOG_SPECS, ("rear_fog",), "JDM"),
+]
+
+# Fallback table keys tried after the exact model, in precedence order
+FALLBACK_MODELS = {
+    "JDM": ("_jdm_default_", "_default_"),
+}
+DEFAULT_FALLBACK_MODELS = ("_default_",)
+
+
+class SpecIntervalIndex:
+    """Per-(function, model) sorted, non-overlapping year intervals.
+
+    Overlapping ranges are flattened at build time so the entry listed first
+    in its table keeps winning (matching the old linear scan), and every
+    overlap is recorded in `overlaps` for reporting.
+    """
+
+    def __init__(self, tables):
+        self.overlaps = []
+        self._starts = {}
+        self._segments = {}
+
+        ranges = {}  # (func, model, scope) -> [(y1, y2, spec)] in table order
+        for table, funcs, scope in tables:
+            for (mdl, y1, y2), value in table.items():
+                for func in funcs:
+                    spec = value.get(func) if isinstance(value, dict) else value
+                    if spec:
+                        ranges.setdefault((func, mdl.strip(), scope), []).append((y1, y2, spec))
+
+        for key, entries in ranges.items():
+            self._check_overlaps(key, entries)
+            segments = self._flatten(entries)
+            self._segments[key] = segments
+            self._starts[key] = [seg[0] for seg in segments]
+
+    def _check_overlaps(self, key, entries):
+        func, mdl, _ = key
+        for i, (a1, a2, _) in enumerate(entries):
+            for b1, b2, _ in entries[i + 1:]:
+                if a1 <= b2 and b1 <= a2:
+                    self.overlaps.append((mdl, func, (a1, a2), (b1, b2)))
+
+    @staticmethod
+    def _flatten(entries):
+        bounds = sorted({y for y1, y2, _ in entries for y in (y1, y2 + 1)})
+        segments = []
+        for lo, hi in zip(bounds, bounds[1:]):
+            winner = next((spec for y1, y2, spec in entries if y1 <= lo and hi - 1 <= y2), None)
+            if winner is None:
+                continue
+            if segments and segments[-1][1] == lo - 1 and segments[-1][2] == winner:
+                segments[-1] = (segments[-1][0], hi - 1, winner)
+            else:
+                segments.append((lo, hi - 1, winner))
+        return segments
+
+    def _find(self, key, year):
+        starts = self._starts.get(key)
+        if not starts:
+            return None
+        i = bisect_right(starts, year) - 1
+        if i >= 0:
+            y1, y2, spec = self._segments[key][i]
+            if year <= y2:
                 return spec
         return None
-    
-    # JDM rear fog
-    if func_key == "rear_fog" and market == "JDM":
-        for (mdl, y1, y2), spec in JDM_REAR_FOG_SPECS.items():
-            if (mdl == model_norm or mdl.startswith("_jdm_")) and y1 <= year <= y2:
-                return spec
+
+    def lookup(self, model, year, func_key, market):
+        models = (model.strip(),) + FALLBACK_MODELS.get(market, DEFAULT_FALLBACK_MODELS)
+        for mdl in models:
+            for scope in (None, market):
+                spec = self._find((func_key, mdl, scope), year)
+                if spec:
+                    return spec
         return None
-    
-    return None
+
+
+SPEC_INDEX = SpecIntervalIndex(SPEC_TABLES)
+
+
+def lookup_spec(model: str, year: int, func_key: str, market: str) -> Optional[Tuple[str, str]]:
+    """Look up spec from research tables."""
+    return SPEC_INDEX.lookup(model, year, func_key, market)
 
 
 def load_wide_csv() -> List[Dict[str, str]]:
@@ -504,15 +562,25 @@ def save_wide_csv(rows: List[Dict[str, str]], header: List[str]):
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Resolve unknown bulb specs in bulbs_wide.csv")
+    instrumentation.add_argument(parser)
+    args = parser.parse_args()
+    instrumentation.setup(__file__, args.profile)
+
     print("[LUMEN DEEP v2] FSM/Catalog + JDM Spec Resolver")
     print("=" * 60)
     
     # Load existing wide CSV
     print("\n[1/4] Loading bulbs_wide.csv...")
+    instrumentation.begin("load")
     rows = load_wide_csv()
+    instrumentation.count("rows_in", len(rows))
     print(f"      Loaded {len(rows)} YMMT rows")
     
     header = list(rows[0].keys()) if rows else []
+
+    for mdl, func, first, second in SPEC_INDEX.overlaps:
+        print(f"      [WARN] Overlapping {func} ranges for {mdl}: {first[0]}-{first[1]} wins over {second[0]}-{second[1]}")
     
     # Functions to resolve in this pass
     TARGET_FUNCS = [
@@ -528,6 +596,7 @@ def main():
     }
     
     print("[2/4] Resolving FSM/Catalog specs...")
+    instrumentation.begin("resolve")
     for row in rows:
         year = int(row.get("year", 0))
         model = row.get("model", "")
@@ -567,10 +636,15 @@ def main():
         if stats["rows_processed"] % 500 == 0:
             print(f"      Processed {stats['rows_processed']}/{len(rows)}...")
     
+    instrumentation.count("unknowns_resolved", stats["unknowns_resolved"])
+
     print("[3/4] Saving bulbs_wide_v2.csv...")
+    instrumentation.begin("write")
     save_wide_csv(rows, header)
+    instrumentation.count("rows_out", len(rows))
     
     print("[4/4] Writing v2 resolution report...")
+    instrumentation.begin("report")
     os.makedirs(REPORT_DIR, exist_ok=True)
     
     with open(REPORT_PATH, "w", encoding="utf-8") as f:
@@ -600,6 +674,7 @@ def main():
         f.write("|------|-------|--------|----------|-------------|--------|\n")
         for res in stats["resolutions"][:30]:
             f.write(f"| {res['year']} | {res['model']} | {res['market']} | {res['function']} | `{res['resolved_to']}` | {res['source']} |\n")
+    instrumentation.end()
     
     print("\n" + "=" * 60)
     print("[OK] COMPLETE!")
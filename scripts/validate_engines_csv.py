@@ -1,10 +1,14 @@
 #!/usr/bin/env python3
 """Validate engines.csv coverage and format."""
 
+import argparse
 import json
 import csv
 from pathlib import Path
 
+import instrumentation
+from ymmt_key import YMMTKey
+
 REPO_ROOT = Path(__file__).parent.parent
 VEHICLES_JSON = REPO_ROOT / "assets" / "seed" / "vehicles.json"
 ENGINES_CSV = REPO_ROOT / "assets" / "seed" / "specs" / "fitment" / "engines.csv"
@@ -16,18 +20,27 @@ def extract_market(trim):
     return ""
 
 def main():
+    parser = argparse.ArgumentParser(description="Validate engines.csv coverage and format")
+    instrumentation.add_argument(parser)
+    args = parser.parse_args()
+    instrumentation.setup(__file__, args.profile)
+
+    instrumentation.begin("load")
     with open(VEHICLES_JSON, "r", encoding="utf-8-sig") as f:
         vehicles = json.load(f)
     with open(ENGINES_CSV, "r", encoding="utf-8") as f:
         engines = list(csv.DictReader(f))
+    instrumentation.count("rows_in", len(engines))
     
-    vehicle_keys = set((v.get("year"), v.get("make"), v.get("model"), v.get("trim"), "", extract_market(v.get("trim", ""))) for v in vehicles)
-    engine_keys = set((int(e["year"]) if e["year"] else 0, e["make"], e["model"], e["trim"], e["body"], e["market"]) for e in engines)
+    instrumentation.begin("validate")
+    vehicle_keys = set(YMMTKey(v.get("year"), v.get("make"), v.get("model"), v.get("trim"), "", extract_market(v.get("trim", ""))) for v in vehicles)
+    engine_keys = set(YMMTKey.from_record(e) for e in engines)
     
     print(f"Vehicles in JSON: {len(vehicles)}")
     print(f"Rows in engines.csv: {len(engines)}")
     
     missing = vehicle_keys - engine_keys
+    instrumentation.count("vehicles_missing", len(missing))
     if missing:
         print(f"\nMissing in engines.csv ({len(missing)}):")
         for m in sorted(missing)[:10]: print(f"  {m}")
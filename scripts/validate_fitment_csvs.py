@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Fitment CSV Validator
+Streams every fitment CSV (engines, fluids, maintenance, torque) once and runs
+all registered checks on each row in that single pass: required columns and
+key values, dual-unit "US / metric" format, confidence values and duplicate
+vehicle keys. Files are validated in parallel; coverage against vehicles.json
+is joined afterwards from the keys each file reports.
+
+A machine-readable report is written to .cache/validation/fitment_report.json
+(or --report). Exits non-zero on any row error; coverage gaps are warnings
+unless --strict.
+
+Usage: python3 scripts/validate_fitment_csvs.py [--only engines,fluids] [--jobs N] [--report PATH] [--strict] [--profile]
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+import instrumentation
+from fitment_join import join_key
+from ymmt_key import YMMTKey
+
+REPO_ROOT = Path(__file__).parent.parent
+FITMENT_DIR = REPO_ROOT / "assets" / "seed" / "specs" / "fitment"
+VEHICLES_JSON = REPO_ROOT / "assets" / "seed" / "vehicles.json"
+REPORT_PATH = REPO_ROOT / ".cache" / "validation" / "fitment_report.json"
+
+KEY_COLUMNS = ["year", "make", "model", "trim", "body", "market"]
+META_COLUMNS = {"notes", "source_1", "source_2", "confidence"}
+CONFIDENCE_VALUES = {"high", "medium", "low"}
+# Offending rows kept per check for the report
+MAX_SAMPLES = 10
+
+
+def spec_column(col):
+    return col not in KEY_COLUMNS and col not in META_COLUMNS
+
+
+# Columns whose non-blank values must carry both units ("5.1 qt / 4.8 L")
+DUAL_UNIT_COLUMNS = {
+    "engines": lambda col: col in ("displacement", "power", "torque", "bore", "stroke", "plug_gap"),
+    "fluids": lambda col: col.endswith("_qty"),
+    "maintenance": lambda col: spec_column(col) and col != "interval_schedule",
+    "torque_specs": spec_column,
+}
+FILES = list(DUAL_UNIT_COLUMNS)
+
+
+class Issues:
+    """Per-check error counts plus the first few offending rows."""
+
+    def __init__(self):
+        self.checks = {}
+
+    def add(self, check, line, message):
+        entry = self.checks.setdefault(check, {"count": 0, "samples": []})
+        entry["count"] += 1
+        if len(entry["samples"]) < MAX_SAMPLES:
+            entry["samples"].append({"line": line, "message": message})
+
+    def total(self):
+        return sum(e["count"] for e in self.checks.values())
+
+
+# Each check gets (file name, header, issues) once per file and returns the
+# per-row callable (or None when it only inspects the header). Rows are
+# plain lists in header order, padded to the header width plus one blank
+# sentinel that stands in for columns the header lacks.
+CHECKS = []
+
+
+def check(fn):
+    CHECKS.append(fn)
+    return fn
+
+
+@check
+def required_columns(name, header, issues):
+    for col in KEY_COLUMNS + ["confidence"]:
+        if col not in header:
+            issues.add("required_columns", 1, f"missing column {col}")
+
+    cols = [(col, header.index(col)) for col in ("year", "make", "model", "trim") if col in header]
+    year_i = header.index("year") if "year" in header else len(header)
+
+    def row(line, r):
+        for col, i in cols:
+            if not r[i]:
+                issues.add("required_values", line, f"blank {col}")
+        year = r[year_i]
+        if year and not year.isdigit():
+            issues.add("required_values", line, f"year={year!r}")
+    return row
+
+
+@check
+def dual_units(name, header, issues):
+    cols = [(col, i) for i, col in enumerate(header) if DUAL_UNIT_COLUMNS[name](col)]
+
+    def row(line, r):
+        for col, i in cols:
+            val = r[i]
+            if val and "/" not in val:
+                issues.add("dual_units", line, f"{col}={val!r}")
+    return row
+
+
+@check
+def confidence(name, header, issues):
+    if "confidence" not in header:
+        return None
+    i = header.index("confidence")
+
+    def row(line, r):
+        val = r[i]
+        if val not in CONFIDENCE_VALUES:
+            issues.add("confidence", line, f"confidence={val!r}")
+    return row
+
+
+def validate_file(name, path=None):
+    """Single pass over one CSV. Returns its report plus the join keys seen
+    (interned YMMTKeys, as fitment_join.join_key builds them), which the
+    caller checks against vehicles.json."""
+    path = Path(path or FITMENT_DIR / f"{name}.csv")
+    started = time.perf_counter()
+    issues = Issues()
+    keys = []
+    first_line = {}
+    rows = 0
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        width = len(header)
+        row_checks = [c for c in (fn(name, header, issues) for fn in CHECKS) if c is not None]
+        key_cols = [header.index(c) if c in header else width for c in ("year", "make", "model", "trim")]
+        filled = [0] * (width + 1)
+        for r in reader:
+            line = reader.line_num
+            if len(r) != width:
+                issues.add("row_width", line, f"{len(r)} fields, header has {width}")
+                r = (r + [""] * width)[:width]
+            r.append("")  # sentinel for key columns missing from the header
+            rows += 1
+            for fn in row_checks:
+                fn(line, r)
+            for i, val in enumerate(r):
+                if val:
+                    filled[i] += 1
+            key = YMMTKey(*[r[i] for i in key_cols])
+            if key in first_line:
+                issues.add("duplicate_keys", line, f"same vehicle as line {first_line[key]}")
+            else:
+                first_line[key] = line
+            keys.append(key)
+    report = {
+        "path": str(path.relative_to(REPO_ROOT) if path.is_relative_to(REPO_ROOT) else path),
+        "rows": rows,
+        "columns": len(header),
+        "seconds": round(time.perf_counter() - started, 4),
+        "errors": issues.total(),
+        "issues": issues.checks,
+        "filled": dict(zip(header, filled)),
+    }
+    return name, report, keys
+
+
+def coverage(keys, vehicle_keys):
+    present = set(keys)
+    missing = sorted(k for k in vehicle_keys if k not in present)
+    return {
+        "vehicles": len(vehicle_keys),
+        "covered": len(vehicle_keys) - len(missing),
+        "missing_count": len(missing),
+        "missing": ["|".join(str(f) for f in k.astuple()[:4]) for k in missing[:MAX_SAMPLES]],
+    }
+
+
+def print_file(name, report):
+    cov = report["coverage"]
+    print(f"\n{name}.csv: {report['rows']} rows, {report['errors']} errors, "
+          f"{cov['covered']}/{cov['vehicles']} vehicles covered ({report['seconds'] * 1000:.0f} ms)")
+    for check_name, entry in report["issues"].items():
+        print(f"  [ERROR] {check_name}: {entry['count']}")
+        for s in entry["samples"][:3]:
+            print(f"    line {s['line']}: {s['message']}")
+    for k in cov["missing"]:
+        print(f"  [MISSING] {k}")
+    if cov["missing_count"] > len(cov["missing"]):
+        print(f"  ... and {cov['missing_count'] - len(cov['missing'])} more")
+    if report["rows"]:
+        sparse = [c for c, n in report["filled"].items() if spec_column(c) and n == 0]
+        if sparse:
+            print(f"  Empty columns: {', '.join(sparse)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate all fitment CSVs in one pass per file")
+    parser.add_argument("--only", help=f"Comma-separated files to validate (default: {','.join(FILES)})")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Files validated in parallel (default: CPU count)")
+    parser.add_argument("--report", type=Path, default=REPORT_PATH, help="Where to write the JSON report")
+    parser.add_argument("--strict", action="store_true", help="Also fail when a vehicle has no row in some file")
+    instrumentation.add_argument(parser)
+    args = parser.parse_args()
+    instrumentation.setup(__file__, args.profile)
+
+    names = FILES
+    if args.only:
+        wanted = {n.strip().removesuffix(".csv") for n in args.only.split(",")}
+        names = [n for n in FILES if n in wanted]
+
+    instrumentation.begin("load")
+    with open(VEHICLES_JSON, "r", encoding="utf-8-sig") as f:
+        vehicle_keys = {join_key(v) for v in json.load(f)}
+    instrumentation.count("vehicles_in", len(vehicle_keys))
+
+    instrumentation.begin("validate")
+    names = [n for n in names if (FITMENT_DIR / f"{n}.csv").exists()]
+    jobs = max(1, min(args.jobs, len(names)))
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(validate_file, names))
+    else:
+        results = [validate_file(n) for n in names]
+
+    instrumentation.begin("coverage")
+    files = {}
+    for name, report, keys in results:
+        report["coverage"] = coverage(keys, vehicle_keys)
+        files[name] = report
+        instrumentation.count("rows_in", report["rows"])
+        instrumentation.count("row_errors", report["errors"])
+        instrumentation.count("vehicles_missing", report["coverage"]["missing_count"])
+
+    errors = sum(r["errors"] for r in files.values())
+    missing = sum(r["coverage"]["missing_count"] for r in files.values())
+    ok = errors == 0 and (missing == 0 or not args.strict)
+
+    instrumentation.begin("report")
+    for name, report in files.items():
+        print_file(name, report)
+    summary = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "ok": ok,
+        "strict": args.strict,
+        "vehicles": len(vehicle_keys),
+        "errors": errors,
+        "missing": missing,
+        "files": files,
+    }
+    args.report.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.report, "w", encoding="utf-8") as f:
+        f.write(json.dumps(summary, indent=2) + "\n")
+    print(f"\nReport written to {args.report}")
+
+    print("\n" + "=" * 50)
+    if ok:
+        warn = f" ({missing} coverage gaps)" if missing else ""
+        print(f"VALIDATION PASSED - {len(files)} fitment CSVs{warn}")
+    else:
+        print(f"VALIDATION FAILED - {errors} row errors, {missing} coverage gaps")
+    instrumentation.end()
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+YMMT Keys
+One identity for a vehicle or fitment row, shared by the fitment sync, the
+validators and the generators: year, make, model, trim, body, market.
+
+Fields are canonicalized on construction: year becomes an int (0 when blank
+or unparseable), text fields are stripped and blank/None becomes "n/a", the
+same placeholder the synced JSON uses. Keys are interned, so equal keys are
+the same object, hash once, and compare by identity in the common case.
+Ordering is field order, so a key doubles as the sort key:
+
+    key = YMMTKey.from_record(row)
+    rows.sort(key=YMMTKey.from_record)
+
+Callers that only know part of the identity (e.g. a vehicle without body or
+market) leave those fields out on both sides of the join, never just one.
+"""
+
+import functools
+import weakref
+
+MISSING = "n/a"
+FIELDS = ("year", "make", "model", "trim", "body", "market")
+
+
+def canonical_year(value):
+    # Numbers that compare equal must canonicalize alike (see the raw aliases)
+    if isinstance(value, int):
+        return int(value)
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else 0
+    try:
+        return int(str(value).strip())
+    except (TypeError, ValueError):
+        return 0
+
+
+def canonical_text(value):
+    if value is None:
+        return MISSING
+    text = value.strip() if isinstance(value, str) else str(value).strip()
+    return text or MISSING
+
+
+# fields tuple -> weakref to its key. Raw (not yet canonical) field tuples
+# are stored as aliases too, so records that repeat a key skip
+# canonicalization. Weak so streaming passes don't pin every key they've seen.
+_interned = {}
+
+
+def _intern(fields, key):
+    def forget(ref, fields=fields):
+        if _interned.get(fields) is ref:
+            del _interned[fields]
+    _interned[fields] = weakref.ref(key, forget)
+
+
+@functools.total_ordering
+class YMMTKey:
+    __slots__ = ("year", "make", "model", "trim", "body", "market", "_fields", "_hash", "__weakref__")
+
+    def __new__(cls, year, make, model, trim, body=None, market=None):
+        raw = (year, make, model, trim, body, market)
+        ref = _interned.get(raw)
+        key = ref() if ref is not None else None
+        if key is not None:
+            return key
+        fields = (
+            canonical_year(year),
+            canonical_text(make),
+            canonical_text(model),
+            canonical_text(trim),
+            canonical_text(body),
+            canonical_text(market),
+        )
+        ref = _interned.get(fields)
+        key = ref() if ref is not None else None
+        if key is None:
+            key = object.__new__(cls)
+            (key.year, key.make, key.model, key.trim, key.body, key.market) = fields
+            key._fields = fields
+            key._hash = hash(fields)
+            _intern(fields, key)
+        if raw != fields and all(v is None or type(v) is str for v in raw[1:]):
+            _intern(raw, key)
+        return key
+
+    @classmethod
+    def from_record(cls, record):
+        """Key of a CSV/JSON row or a vehicles.json entry (missing fields are n/a)."""
+        get = record.get
+        raw = (get("year"), get("make"), get("model"), get("trim"), get("body"), get("market"))
+        ref = _interned.get(raw)
+        key = ref() if ref is not None else None
+        return key if key is not None else cls(*raw)
+
+    def astuple(self):
+        return self._fields
+
+    def replace(self, **changes):
+        values = dict(zip(FIELDS, self._fields))
+        values.update(changes)
+        return YMMTKey(*(values[f] for f in FIELDS))
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if not isinstance(other, YMMTKey):
+            return NotImplemented
+        return self._fields == other._fields
+
+    def __lt__(self, other):
+        if not isinstance(other, YMMTKey):
+            return NotImplemented
+        return self._fields < other._fields
+
+    def __reduce__(self):
+        # Re-intern on unpickling (e.g. in --jobs workers)
+        return (YMMTKey, self._fields)
+
+    def __str__(self):
+        return "|".join(str(f) for f in self._fields)
+
+    def __repr__(self):
+        return f"YMMTKey{self._fields!r}"
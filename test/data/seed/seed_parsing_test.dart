@@ -55,6 +55,40 @@ void main() {
       expect(specs[0].updatedAt, DateTime.utc(2024, 1, 1));
     });
 
+    test('fitment spec ids match the prebuilt DB', () {
+      // Same ids as test_spec_ids_match_seed_runner in
+      // tool/seed/test_build_fitment_sqlite.py
+      final specs = parseSpecs('''
+      [
+        {
+          "year": 2024,
+          "make": "Subaru",
+          "model": "WRX",
+          "trim": "Base",
+          "body": "Sedan",
+          "market": "USDM",
+          "function_key": "headlight_low",
+          "bulb_code": "H11"
+        }
+      ]
+      ''');
+      expect(specs.single.id, 'fit_abd6add16d003d86');
+
+      final wide = parseSpecs('''
+      [
+        {
+          "year": 2015,
+          "make": "Subaru",
+          "model": "WRX",
+          "trim": "Base",
+          "market": "USDM",
+          "engine_oil_qty": "5.1 qt"
+        }
+      ]
+      ''');
+      expect(wide.single.id, 'wide_fc5cfbbb01959731');
+    });
+
     test('parseParts parses valid JSON correctly', () {
       const jsonString = '''
       [
@@ -0,0 +1,72 @@
+import 'dart:convert';
+import 'dart:io';
+import 'package:flutter_test/flutter_test.dart';
+import 'package:path/path.dart' as p;
+import 'package:specsnparts/data/seed/seed_runner.dart';
+import 'package:specsnparts/data/seed/spec_bundle.dart';
+
+void main() {
+  group('Spec bundles', () {
+    final specsDir = p.join(Directory.current.path, 'assets', 'seed', 'specs');
+    final manifest =
+        json.decode(File(p.join(specsDir, 'index.json')).readAsStringSync())
+            as Map<String, dynamic>;
+    final bundles = (manifest['bundles'] as Map<String, dynamic>)
+        .cast<String, String>();
+
+    test('index.json lists a bundle for every fitment file', () {
+      for (final file in [
+        'engines.json',
+        'fluids.json',
+        'maintenance.json',
+        'torque_specs.json',
+      ]) {
+        expect(bundles[file], isNotNull, reason: '$file has no bundle');
+      }
+    });
+
+    test('pubspec ships the bundle instead of the bundled JSON', () {
+      final assets = File(p.join(Directory.current.path, 'pubspec.yaml'))
+          .readAsLinesSync()
+          .map((line) => line.trim())
+          .where((line) => line.startsWith('- assets/'))
+          .map((line) => line.substring(2))
+          .toSet();
+
+      expect(assets, isNot(contains('assets/seed/specs/')));
+      expect(assets, contains('assets/seed/specs/index.json'));
+      for (final entry in bundles.entries) {
+        expect(assets, contains('assets/seed/specs/${entry.value}'));
+        expect(assets, isNot(contains('assets/seed/specs/${entry.key}')));
+      }
+    });
+
+    for (final entry in bundles.entries) {
+      test('${entry.value} decodes to the same rows as ${entry.key}', () {
+        final bytes = File(p.join(specsDir, entry.value)).readAsBytesSync();
+        final rows = json.decode(
+          File(p.join(specsDir, entry.key)).readAsStringSync(),
+        );
+
+        expect(SpecBundle.decode(bytes).toRows(), equals(rows));
+
+        final fromBundle = parseSpecBundle(bytes);
+        final fromJson = parseSpecs(json.encode(rows));
+        expect(fromBundle.length, fromJson.length);
+        for (var i = 0; i < fromBundle.length; i++) {
+          expect(fromBundle[i].id, fromJson[i].id);
+          expect(fromBundle[i].title, fromJson[i].title);
+          expect(fromBundle[i].body, fromJson[i].body);
+          expect(fromBundle[i].tags, fromJson[i].tags);
+        }
+      });
+    }
+
+    test('rejects data that is not a bundle', () {
+      expect(
+        () => SpecBundle.decode(utf8.encode('[]')),
+        throwsA(isA<FormatException>()),
+      );
+    });
+  });
+}
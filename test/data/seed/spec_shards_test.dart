@@ -0,0 +1,53 @@
+import 'package:flutter_test/flutter_test.dart';
+import 'package:specsnparts/data/seed/spec_shards.dart';
+
+void main() {
+  group('SpecShardIndex', () {
+    final index = SpecShardIndex.fromManifest({
+      'files': ['fluids.json'],
+      'shards': {
+        'fluids.json': {
+          'by': 'model-year',
+          'shards': [
+            {
+              'model': 'WRX',
+              'years': [2015, 2015],
+              'file': 'shards/fluids/wrx_2015.json',
+              'rows': 4,
+              'bytes': 4096,
+            },
+            {
+              'model': 'WRX',
+              'years': [2022, 2022],
+              'file': 'shards/fluids/wrx_2022.json',
+              'rows': 3,
+              'bytes': 3072,
+            },
+            {
+              'model': 'Outback',
+              'years': [1995, 2025],
+              'file': 'shards/fluids/outback.json',
+              'rows': 90,
+              'bytes': 92160,
+            },
+          ],
+        },
+      },
+    });
+
+    test('selects shards by model and year', () {
+      expect(
+        index.shardsFor('fluids.json', 'wrx', year: 2022).map((s) => s.file),
+        ['shards/fluids/wrx_2022.json'],
+      );
+      expect(index.shardsFor('fluids.json', 'WRX'), hasLength(2));
+      expect(index.shardsFor('fluids.json', 'Outback', year: 2026), isEmpty);
+    });
+
+    test('unsharded files have no shards', () {
+      expect(index.isSharded('fluids.json'), isTrue);
+      expect(index.isSharded('engines.json'), isFalse);
+      expect(index.shardsFor('engines.json', 'WRX'), isEmpty);
+    });
+  });
+}
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Benchmark the Seed Pipeline
+
+Synthesizes vehicles.json and the fitment inputs at multiples of the current
+catalog, then runs each pipeline stage against them and records wall time,
+peak RSS and rows/sec.
+
+Each scale gets a throwaway repo root holding copies of scripts/ and
+tool/seed/, so the stages run unmodified (their paths resolve against that
+root) and never touch the real assets. Stages run as child processes; peak
+RSS is that child's ru_maxrss.
+
+Stages: engines, fluids, torque (scripts/generate_*.py), build (all three
+through scripts/fitment_build.py), lumen (scripts/lumen_deep_resolver_v2.py),
+sync and sync_stream (tool/seed/sync_fitment_csv_to_specs_json.py).
+
+Results go to .cache/benchmarks/seed_pipeline.json and are compared against
+tool/seed/benchmark_baseline.json; --save-baseline replaces the baseline.
+A stage regresses when it is slower or larger than its baseline by more than
+--tolerance and by more than MIN_DELTA, so jitter in sub-second, small-RSS
+runs at 1x is not flagged.
+
+--profile runs every stage with SEED_PROFILE set and attaches each child's
+per-stage trace (see scripts/instrumentation.py) to its result. Tracing slows
+the stages down, so profiled runs are neither saved as nor compared with the
+baseline. Otherwise SEED_PROFILE is cleared for the children.
+
+Usage: python3 tool/seed/benchmark_seed_pipeline.py [--scales 1,10,100,1000]
+           [--stages engines,sync] [--timeout 1800] [--save-baseline]
+           [--fail-on-regression] [--tolerance 0.25] [--keep] [--profile]
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+TOOL_DIR = Path(__file__).resolve().parent
+REPO_ROOT = TOOL_DIR.parent.parent
+
+sys.path.append(str(REPO_ROOT / "scripts"))
+import instrumentation
+
+RESULTS_PATH = REPO_ROOT / ".cache" / "benchmarks" / "seed_pipeline.json"
+BASELINE_PATH = TOOL_DIR / "benchmark_baseline.json"
+
+DEFAULT_SCALES = [1, 10, 100, 1000]
+# Absolute change below which a ratio over --tolerance is treated as noise
+MIN_DELTA = {"seconds": 0.5, "peak_rss_mb": 16.0}
+FITMENT = Path("assets/seed/specs/fitment")
+
+# Columns resolved by lumen_deep_resolver_v2.py
+LUMEN_FUNCS = ["tail", "brake", "turn_front", "turn_rear", "reverse", "license_plate", "rear_fog"]
+
+# name -> (command relative to the synthetic root, stages it needs first)
+STAGES = {
+    "engines": (["scripts/generate_engines_csv.py"], []),
+    "fluids": (["scripts/generate_fluids_csv_v2.py"], []),
+    "torque": (["scripts/generate_torque_specs_csv.py"], ["engines"]),
+    "build": (["scripts/fitment_build.py", "--full"], []),
+    "lumen": (["scripts/lumen_deep_resolver_v2.py"], []),
+    "sync": (["tool/seed/sync_fitment_csv_to_specs_json.py", "--no-digest-cache"], ["engines", "fluids", "torque"]),
+    "sync_stream": (["tool/seed/sync_fitment_csv_to_specs_json.py", "--stream", "--no-digest-cache"], ["engines", "fluids", "torque"]),
+}
+
+# --- Synthesis ---
+
+def scaled(rows: List[Dict[str, Any]], scale: int, trim_key: str = "trim") -> Iterator[Dict[str, Any]]:
+    """Yield `scale` copies of rows; copies get a distinct trim so YMMT keys stay unique."""
+    for copy in range(scale):
+        for row in rows:
+            if copy == 0:
+                yield row
+                continue
+            clone = dict(row)
+            clone[trim_key] = f"{row.get(trim_key) or 'Base'} [x{copy}]"
+            if "id" in clone:
+                clone["id"] = f"{row['id']}_x{copy}"
+            yield clone
+
+def write_json_rows(path: Path, rows: Iterator[Dict[str, Any]]) -> int:
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[")
+        for row in rows:
+            f.write(",\n" if count else "\n")
+            f.write(json.dumps(row, ensure_ascii=False))
+            count += 1
+        f.write("\n]\n")
+    return count
+
+def write_csv_rows(path: Path, header: List[str], rows: Iterator[Dict[str, Any]]) -> int:
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=header, extrasaction="ignore")
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+def synthesize(root: Path, scale: int) -> Dict[str, int]:
+    """Populate a throwaway repo root at `scale`× the catalog; returns input row counts."""
+    shutil.copytree(REPO_ROOT / "scripts", root / "scripts", ignore=shutil.ignore_patterns("__pycache__"))
+    shutil.copytree(TOOL_DIR, root / "tool" / "seed", ignore=shutil.ignore_patterns("__pycache__", "*.json"))
+    (root / "pubspec.yaml").write_text("name: seed_benchmark\n", encoding="utf-8")
+    (root / FITMENT).mkdir(parents=True)
+
+    with open(REPO_ROOT / "assets/seed/vehicles.json", "r", encoding="utf-8-sig") as f:
+        vehicles = json.load(f)
+    counts = {"vehicles": write_json_rows(root / "assets/seed/vehicles.json", scaled(vehicles, scale))}
+
+    # Maintenance has no generator, so the sync gets a scaled copy of the real CSV
+    with open(REPO_ROOT / FITMENT / "maintenance.csv", "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.DictReader(f)
+        header, rows = reader.fieldnames, list(reader)
+    counts["maintenance"] = write_csv_rows(root / FITMENT / "maintenance.csv", header, scaled(rows, scale))
+
+    lumen_rows = ({"year": v["year"], "make": v["make"], "model": v["model"], "trim": v["trim"],
+                   "market": v.get("market", "USDM"), **dict.fromkeys(LUMEN_FUNCS, "unknown")}
+                  for v in scaled(vehicles, scale))
+    counts["bulbs_wide"] = write_csv_rows(
+        root / FITMENT / "bulbs_wide.csv", ["year", "make", "model", "trim", "market"] + LUMEN_FUNCS, lumen_rows)
+    return counts
+
+def stage_rows(stage: str, root: Path, counts: Dict[str, int]) -> int:
+    if stage in ("engines", "fluids", "torque"):
+        return counts["vehicles"]
+    if stage == "build":
+        return counts["vehicles"] * 3
+    if stage == "lumen":
+        return counts["bulbs_wide"]
+    total = 0
+    for csv_path in (root / FITMENT).glob("*.csv"):
+        if csv_path.name == "bulbs_wide.csv":
+            continue
+        with open(csv_path, "r", encoding="utf-8") as f:
+            total += max(sum(1 for _ in f) - 1, 0)
+    return total
+
+# --- Running ---
+
+def run_stage(root: Path, argv: List[str], timeout: Optional[float], profile: Optional[str] = None) -> Dict[str, Any]:
+    """Run one stage in a child process; returns status, seconds, peak RSS and, with `profile`, its trace."""
+    killed = threading.Event()
+    env = {k: v for k, v in os.environ.items() if k != instrumentation.ENV_VAR}
+    trace_path = root / ".cache" / "profile" / f"{Path(argv[0]).stem}.json"
+    if profile:
+        env[instrumentation.ENV_VAR] = profile
+        trace_path.unlink(missing_ok=True)
+
+    def kill(proc: subprocess.Popen) -> None:
+        killed.set()
+        proc.kill()
+
+    with tempfile.TemporaryFile() as stderr:
+        started = time.perf_counter()
+        proc = subprocess.Popen([sys.executable, *argv], cwd=root, env=env, stdout=subprocess.DEVNULL, stderr=stderr)
+        timer = threading.Timer(timeout, kill, (proc,)) if timeout else None
+        if timer:
+            timer.start()
+        rss_kb = None
+        if hasattr(os, "wait4"):
+            _, code, usage = os.wait4(proc.pid, 0)
+            proc.returncode = os.waitstatus_to_exitcode(code)
+            # ru_maxrss is KiB on Linux and bytes on macOS
+            rss_kb = usage.ru_maxrss / 1024 if sys.platform == "darwin" else usage.ru_maxrss
+        else:
+            proc.wait()
+        seconds = time.perf_counter() - started
+        if timer:
+            timer.cancel()
+        stderr.seek(0)
+        tail = stderr.read().decode("utf-8", "replace").strip().splitlines()[-1:]
+
+    status = "timeout" if killed.is_set() else "failed" if proc.returncode != 0 else "ok"
+    result = {
+        "status": status,
+        "seconds": round(seconds, 4),
+        "peak_rss_mb": None if rss_kb is None else round(rss_kb / 1024, 1),
+        "error": tail[0] if status == "failed" and tail else None,
+    }
+    if profile and trace_path.exists():
+        trace = load_json(trace_path)
+        result["trace"] = {"stages": trace.get("stages", []), "counters": trace.get("counters", {})}
+    return result
+
+def run_benchmarks(scales: List[int], stages: List[str], timeout: Optional[float], keep: bool, profile: Optional[str] = None) -> List[Dict[str, Any]]:
+    results = []
+    gave_up = set()  # stages that timed out stay skipped at larger scales
+    for scale in scales:
+        root = Path(tempfile.mkdtemp(prefix=f"seed_bench_{scale}x_"))
+        try:
+            started = time.perf_counter()
+            with instrumentation.stage(f"synthesize:{scale}x"):
+                counts = synthesize(root, scale)
+            print(f"[{scale}x] synthesized {counts['vehicles']} vehicles in {time.perf_counter() - started:.1f}s ({root})")
+            done = set()
+            for stage in stages:
+                argv, needs = STAGES[stage]
+                missing = [n for n in needs if n not in done and n not in stages]
+                blocked = [n for n in needs if n in stages and n not in done]
+                if stage in gave_up or blocked:
+                    result = {"status": "skipped", "seconds": None, "peak_rss_mb": None, "error": None}
+                else:
+                    if missing:
+                        # Run prerequisites untimed so the stage has its inputs
+                        for need in missing:
+                            run_stage(root, STAGES[need][0], timeout)
+                    with instrumentation.stage(f"{stage}:{scale}x"):
+                        result = run_stage(root, argv, timeout, profile)
+                if result["status"] == "ok":
+                    done.add(stage)
+                elif result["status"] == "timeout":
+                    gave_up.add(stage)
+                rows = stage_rows(stage, root, counts)
+                result.update({
+                    "scale": scale,
+                    "stage": stage,
+                    "rows": rows,
+                    "rows_per_sec": round(rows / result["seconds"], 1) if result["status"] == "ok" and result["seconds"] else None,
+                })
+                results.append(result)
+                print(format_result(result))
+        finally:
+            if keep:
+                print(f"[{scale}x] kept {root}")
+            else:
+                shutil.rmtree(root, ignore_errors=True)
+    return results
+
+def format_result(r: Dict[str, Any]) -> str:
+    if r["status"] != "ok":
+        return f"  {r['stage']:<12} {r['status']}" + (f": {r['error']}" if r.get("error") else "")
+    rss = "n/a" if r["peak_rss_mb"] is None else f"{r['peak_rss_mb']:.1f} MB"
+    return f"  {r['stage']:<12} {r['seconds']:>9.2f}s  {rss:>10}  {r['rows']:>9} rows  {r['rows_per_sec']:>10.0f} rows/s"
+
+# --- Baseline ---
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Print the change against the baseline; returns the regressions found."""
+    base = {(r["scale"], r["stage"]): r for r in baseline.get("results", [])}
+    regressions = []
+    print(f"Compared with baseline from {baseline.get('created', '?')}:")
+    for r in results:
+        b = base.get((r["scale"], r["stage"]))
+        if not b or r["status"] != "ok" or b.get("status") != "ok":
+            continue
+        parts = []
+        for key, label in (("seconds", "time"), ("peak_rss_mb", "rss")):
+            if r.get(key) and b.get(key):
+                ratio = r[key] / b[key]
+                parts.append(f"{label} {ratio:.2f}x")
+                if ratio > 1 + tolerance and r[key] - b[key] > MIN_DELTA[key]:
+                    regressions.append(f"{r['stage']} at {r['scale']}x: {label} {b[key]} -> {r[key]}")
+        print(f"  {r['scale']:>5}x {r['stage']:<12} " + ", ".join(parts))
+    return regressions
+
+def load_json(path: Path) -> Dict[str, Any]:
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_json(data: Dict[str, Any], path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(json.dumps(data, indent=2) + "\n")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the seed generators and fitment sync at scale")
+    parser.add_argument("--scales", default=",".join(map(str, DEFAULT_SCALES)), help="Comma-separated catalog multiples")
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"Comma-separated stages ({', '.join(STAGES)})")
+    parser.add_argument("--timeout", type=float, default=1800, help="Seconds before a stage is killed and skipped at larger scales")
+    parser.add_argument("--output", default=str(RESULTS_PATH), help="Results JSON path")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH), help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Write these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown / RSS growth before flagging (0.25 = 25%%)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit 1 when a stage regresses past --tolerance")
+    parser.add_argument("--keep", action="store_true", help="Keep the synthetic repo roots for inspection")
+    instrumentation.add_argument(parser)
+    args = parser.parse_args()
+    profiler = instrumentation.setup(__file__, args.profile)
+    profile = profiler.mode if profiler.enabled else None
+    if profile and args.save_baseline:
+        print("Error: --profile timings are not comparable; run --save-baseline without it.")
+        sys.exit(2)
+
+    scales = [int(s) for s in args.scales.split(",") if s.strip()]
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        print(f"Error: unknown stages: {', '.join(unknown)}")
+        sys.exit(2)
+
+    results = run_benchmarks(scales, stages, args.timeout or None, args.keep, profile)
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "profile": profile,
+        "results": results,
+    }
+    save_json(report, Path(args.output))
+    print(f"Results written to {args.output}")
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        save_json(report, baseline_path)
+        print(f"Baseline written to {baseline_path}")
+        return
+
+    if profile:
+        print("Skipping the baseline comparison: --profile timings include tracing overhead.")
+        return
+    baseline = load_json(baseline_path)
+    if not baseline:
+        print(f"No baseline at {baseline_path}; run with --save-baseline to record one.")
+        return
+    regressions = compare(results, baseline, args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION: {line}")
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
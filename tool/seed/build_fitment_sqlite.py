@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Build Fitment SQLite
+
+Reads: assets/seed/specs/fitment/*.csv (cleaned, completed, deduplicated and
+       sorted exactly as the JSON sync does), assets/seed/specs/index.json,
+       assets/seed/vehicles.json, assets/seed/parts.json
+Outputs: build/seed/fitment.db
+
+Tables:
+- fitment_<category>: one typed row per CSV row ("n/a" becomes NULL), indexed
+  on (year, make, model, trim, market) and, where the category has one, on
+  function_key
+- fitment_notes_fts: FTS5 index over the notes of every category, pointing
+  back at (category, row_id)
+- vehicles, specs, parts: the Drift tables from lib/data/db/tables.dart, filled
+  with the rows SeedRunner would insert, so the app can ship this file as a
+  prebuilt database. Fitment spec ids use the same SHA-1 scheme as
+  SeedRunner (fitmentSpecId), so a reseed replaces rows instead of adding
+  copies.
+
+Everything is inserted with executemany inside one transaction; indexes are
+created after the data is loaded.
+
+Usage: python3 tool/seed/build_fitment_sqlite.py [--out PATH] [--only fluids] [--profile]
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+sys.path.append(str(Path(__file__).resolve().parent))
+sys.path.append(str(Path(__file__).resolve().parents[2] / "scripts"))
+
+import instrumentation
+from sync_fitment_csv_to_specs_json import build_rows, find_repo_root, load_vehicles
+
+# AppDatabase.schemaVersion; Drift keeps it in PRAGMA user_version
+DRIFT_SCHEMA_VERSION = 1
+
+DRIFT_TABLES = [
+    'CREATE TABLE "vehicles" ("id" TEXT NOT NULL, "year" INTEGER NOT NULL, '
+    '"make" TEXT NOT NULL DEFAULT \'Subaru\', "model" TEXT NOT NULL, "trim" TEXT NULL, '
+    '"engine_code" TEXT NULL, "updated_at" INTEGER NOT NULL, PRIMARY KEY ("id"))',
+    'CREATE TABLE "specs" ("id" TEXT NOT NULL, "category" TEXT NOT NULL, "title" TEXT NOT NULL, '
+    '"body" TEXT NOT NULL, "tags" TEXT NOT NULL, "updated_at" INTEGER NOT NULL, PRIMARY KEY ("id"))',
+    'CREATE TABLE "parts" ("id" TEXT NOT NULL, "name" TEXT NOT NULL, "oem_number" TEXT NOT NULL, '
+    '"aftermarket_numbers" TEXT NOT NULL, "fits" TEXT NOT NULL, "notes" TEXT NULL, '
+    '"updated_at" INTEGER NOT NULL, PRIMARY KEY ("id"))',
+]
+
+YMMT_COLUMNS = ("year", "make", "model", "trim", "market")
+INTEGER_COLUMNS = {"year", "qty", "serviceable"}
+
+# Mirrors _parseWideRow in lib/data/seed/seed_runner.dart
+WIDE_IGNORE_KEYS = {
+    "year", "make", "model", "trim", "body", "market", "id", "updatedAt",
+    "notes", "source_1", "source_2", "confidence", "interval_schedule",
+    "function_key", "location_hint",
+}
+
+# --- Dart parity helpers ---
+
+def norm(s: str) -> str:
+    """FitmentKey.norm"""
+    return re.sub(r"\s+", " ", s.strip().lower())
+
+def dart_str(value: Any) -> str:
+    """Object.toString() for JSON values, as List.join and interpolation use it."""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+def epoch_seconds(iso: str) -> int:
+    return int(datetime.fromisoformat(iso.replace("Z", "+00:00")).timestamp())
+
+def stable_id(prefix: str, key: str) -> str:
+    """fitmentSpecId in lib/data/seed/seed_runner.dart"""
+    return f"{prefix}_{hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]}"
+
+def build_tags(row: Dict[str, Any]) -> str:
+    values = [row.get(k) for k in ("year", "make", "model", "trim", "market")]
+    return ",".join(norm(dart_str(v)) for v in values if v is not None and v != "n/a")
+
+def wide_category(key: str) -> str:
+    if key in ("power", "torque"):
+        return "Engine"
+    if "torque" in key or "_plug" in key or "_bolt" in key or "lug_nut" in key:
+        return "Torque"
+    if "oil" in key or "fluid" in key or "coolant" in key:
+        return "Fluids"
+    if any(t in key for t in ("filter", "belt", "spark_plug", "plug_gap", "brake_")):
+        return "Maintenance"
+    if any(t in key for t in ("trans_", "clutch_", "cvt_")):
+        return "Transmission"
+    if "diff_" in key:
+        return "Differential"
+    if "wheel_" in key or "tire_" in key:
+        return "Wheels"
+    if any(t in key for t in ("compression", "displacement", "bore", "stroke", "engine_", "fuel_", "valve_", "cylinders")):
+        return "Engine"
+    if any(t in key for t in ("weight", "length", "width", "height", "ground_clearance", "wheelbase")):
+        return "Dimensions"
+    return "Specs"
+
+def fitment_specs(row: Dict[str, Any], updated_at: int) -> Iterator[Tuple]:
+    """Spec rows SeedRunner derives from one fitment row (tall or wide)."""
+    tags = build_tags(row)
+    if "function_key" in row:
+        key = "|".join(dart_str(row.get(k)) for k in (
+            "year", "make", "model", "trim", "body", "market", "function_key", "location_hint"))
+        category, body = "Fitment", "n/a"
+        if "bulb_code" in row:
+            category = "Bulbs"
+            body = dart_str(row["bulb_code"])
+            if row.get("tech") not in (None, "n/a"):
+                body += f" ({row['tech']})"
+        elif "capacity" in row:
+            category, body = "Fluids", dart_str(row["capacity"])
+        elif "value" in row:
+            body = dart_str(row["value"])
+        else:
+            body = next((dart_str(v) for v in row.values() if v is not None), "n/a")
+        title = dart_str(row["function_key"]).replace("_", " ").upper()
+        sub = row.get("location_hint") or ""
+        yield (stable_id("fit", key), category, f"{title} - {sub}" if sub else title, body, tags, updated_at)
+        return
+
+    prefix = "|".join(dart_str(row.get(k)) for k in ("year", "make", "model", "trim", "body", "market"))
+    for key, value in row.items():
+        if key in WIDE_IGNORE_KEYS or value is None or value == "n/a":
+            continue
+        title = key.replace("_", " ").upper()
+        yield (stable_id("wide", f"{prefix}|{key}"), wide_category(key), title, dart_str(value), tags, updated_at)
+
+_RANGE_RE = re.compile(r"\b(\d{4})\s*-\s*(\d{4})\b", re.ASCII)
+_PLUS_RE = re.compile(r"\b(\d{4})\+", re.ASCII)
+_YEAR_RE = re.compile(r"\b(\d{4})\b", re.ASCII)
+
+def enrich_tags_with_years(tags: str, title: str) -> str:
+    """_enrichTagsWithYears"""
+    tag_set = dict.fromkeys(t for t in (norm(e) for e in tags.split(",")) if t)
+    found_range = False
+    m = _RANGE_RE.search(title)
+    if m:
+        start, end = int(m.group(1)), int(m.group(2))
+        if start <= end and start > 1900 and end < 2100:
+            tag_set.update(dict.fromkeys(str(y) for y in range(start, end + 1)))
+            found_range = True
+    if not found_range:
+        m = _PLUS_RE.search(title)
+        if m:
+            start = int(m.group(1))
+            if 1900 < start < 2100:
+                tag_set.update(dict.fromkeys(str(y) for y in range(start, 2027)))
+    for m in _YEAR_RE.finditer(title):
+        if 1900 < int(m.group(1)) < 2100:
+            tag_set[m.group(1)] = None
+    return ",".join(tag_set)
+
+def legacy_specs(data: List[Dict[str, Any]]) -> Iterator[Tuple]:
+    for spec in data:
+        title = spec.get("title") or ""
+        yield (spec["id"], spec["category"], title, spec["body"],
+               enrich_tags_with_years(spec.get("tags") or "", title), epoch_seconds(spec["updatedAt"]))
+
+# --- Build ---
+
+def fitment_table(conn: sqlite3.Connection, stem: str, rows: List[Dict[str, Any]]) -> int:
+    table = f"fitment_{stem}"
+    columns: Dict[str, None] = {}
+    for row in rows:
+        columns.update(dict.fromkeys(row))
+    defs = ", ".join(f'"{c}" {"INTEGER" if c in INTEGER_COLUMNS else "TEXT"}' for c in columns)
+    conn.execute(f'CREATE TABLE "{table}" ("row_id" INTEGER PRIMARY KEY, {defs})')
+
+    names = list(columns)
+    quoted = ", ".join(f'"{c}"' for c in names)
+    placeholders = ", ".join("?" for _ in names)
+    conn.executemany(
+        f'INSERT INTO "{table}" ("row_id", {quoted}) VALUES (?, {placeholders})',
+        ((i, *(None if r.get(c, "n/a") == "n/a" else r[c] for c in names)) for i, r in enumerate(rows, 1)),
+    )
+    if "notes" in columns:
+        conn.executemany(
+            "INSERT INTO fitment_notes_fts (notes, category, row_id) VALUES (?, ?, ?)",
+            ((r["notes"], stem, i) for i, r in enumerate(rows, 1) if r.get("notes", "n/a") != "n/a"),
+        )
+    if all(c in columns for c in YMMT_COLUMNS):
+        conn.execute(f'CREATE INDEX "idx_{table}_ymmt" ON "{table}" ({", ".join(YMMT_COLUMNS)})')
+    if "function_key" in columns:
+        conn.execute(f'CREATE INDEX "idx_{table}_function_key" ON "{table}" ("function_key")')
+    return len(rows)
+
+def build_database(root: Path, out_path: Path, only: Optional[str] = None) -> Dict[str, int]:
+    """Build the database at `out_path` (atomically); returns row counts per table."""
+    input_dir = root / "assets/seed/specs/fitment"
+    specs_dir = root / "assets/seed/specs"
+    with instrumentation.stage("vehicles"):
+        vehicles = load_vehicles(root)
+        instrumentation.count("vehicles_in", len(vehicles))
+    updated_at = int(time.time())
+    counts: Dict[str, int] = {}
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = out_path.with_suffix(out_path.suffix + ".tmp")
+    tmp_path.unlink(missing_ok=True)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        with conn:
+            for ddl in DRIFT_TABLES:
+                conn.execute(ddl)
+            conn.execute("CREATE VIRTUAL TABLE fitment_notes_fts USING fts5(notes, category UNINDEXED, row_id UNINDEXED)")
+
+            fitment_rows: Dict[str, List[Dict[str, Any]]] = {}
+            for csv_path in sorted(input_dir.glob("*.csv")):
+                if only and only not in csv_path.name:
+                    continue
+                print(f"Loading {csv_path.name}...")
+                with instrumentation.stage(f"fitment:{csv_path.stem}"):
+                    fitment_rows[csv_path.stem] = build_rows(csv_path, vehicles)
+                    with instrumentation.stage("insert"):
+                        counts[f"fitment_{csv_path.stem}"] = fitment_table(conn, csv_path.stem, fitment_rows[csv_path.stem])
+                        instrumentation.count("rows_out", counts[f"fitment_{csv_path.stem}"])
+
+            # specs: same files and order as SeedRunner._seedSpecs
+            instrumentation.begin("specs")
+            with open(specs_dir / "index.json", "r", encoding="utf-8") as f:
+                files = json.load(f)["files"]
+            spec_rows: List[Tuple] = []
+            for name in files:
+                stem = Path(name).stem
+                if stem in fitment_rows:
+                    for row in fitment_rows[stem]:
+                        spec_rows.extend(fitment_specs(row, updated_at))
+                elif not only and (specs_dir / name).exists():
+                    with open(specs_dir / name, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                    if data and ("function_key" in data[0] or "year" in data[0]):
+                        for row in data:
+                            spec_rows.extend(fitment_specs(row, updated_at))
+                    else:
+                        spec_rows.extend(legacy_specs(data))
+            conn.executemany("INSERT OR REPLACE INTO specs VALUES (?, ?, ?, ?, ?, ?)", spec_rows)
+            counts["specs"] = conn.execute("SELECT COUNT(*) FROM specs").fetchone()[0]
+            instrumentation.count("rows_out", counts["specs"])
+
+            if not only:
+                instrumentation.begin("vehicles_parts")
+                conn.executemany(
+                    "INSERT OR REPLACE INTO vehicles VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    ((v["id"], v["year"], v["make"], v["model"], v.get("trim"), v.get("engineCode"),
+                      epoch_seconds(v["updatedAt"])) for v in vehicles),
+                )
+                with open(root / "assets/seed/parts.json", "r", encoding="utf-8-sig") as f:
+                    parts = json.load(f)
+                conn.executemany(
+                    "INSERT OR REPLACE INTO parts VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    ((p["id"], p["name"], p["oemNumber"], p["aftermarketNumbers"], p["fits"], p.get("notes"),
+                      epoch_seconds(p["updatedAt"])) for p in parts),
+                )
+                counts["vehicles"] = len(vehicles)
+                counts["parts"] = len(parts)
+
+            counts["fitment_notes_fts"] = conn.execute("SELECT COUNT(*) FROM fitment_notes_fts").fetchone()[0]
+            conn.execute(f"PRAGMA user_version = {DRIFT_SCHEMA_VERSION}")
+            instrumentation.begin("commit")
+        instrumentation.begin("analyze")
+        conn.execute("ANALYZE")
+    finally:
+        instrumentation.end()
+        conn.close()
+    tmp_path.replace(out_path)
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the fitment SQLite database")
+    parser.add_argument("--out", help="Output database path (default: build/seed/fitment.db)")
+    parser.add_argument("--only", help="Build only specific CSV filename (e.g. fluids); skips vehicles and parts")
+    instrumentation.add_argument(parser)
+    args = parser.parse_args()
+    instrumentation.setup(__file__, args.profile)
+
+    root = find_repo_root()
+    out_path = Path(args.out) if args.out else root / "build/seed/fitment.db"
+
+    started = time.perf_counter()
+    counts = build_database(root, out_path, args.only)
+    for table, count in counts.items():
+        print(f"  {table}: {count} rows")
+    print(f"Wrote {out_path} ({out_path.stat().st_size / 1e6:.1f} MB) in {time.perf_counter() - started:.2f}s.")
+
+if __name__ == "__main__":
+    main()
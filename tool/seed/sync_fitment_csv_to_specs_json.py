@@ -4,20 +4,67 @@ Sync Fitment CSV to Specs JSON
 
 Reads: assets/seed/specs/fitment/*.csv
 Outputs: assets/seed/specs/<name>.json
+         assets/seed/specs/<name>.bin (columnar bundle, listed in index.json)
 
 Guarantees:
 - Stable sorting
 - Consistent "n/a" handling
 - Strict JSON array format
 - Full bulb coverage completion (for bulbs.csv)
+
+--stream keeps memory bounded: rows are sorted in chunks spilled to disk,
+k-way merged, deduped on the fly and written to the JSON file element by
+element.
+
+--check records SHA-256 digests of each CSV, its JSON output, vehicles.json
+and this script plus the modules that decide row identity and order
+(TOOL_SOURCES) in tool/seed/sync_digests.json, and skips files whose
+digests still match the last successful sync or check.
+
+Each JSON file is paired with a compact bundle of the same rows: one
+interned string table plus per-column varint arrays (see BundleWriter). The
+app seeds from the bundle when index.json lists one under "bundles", and
+pubspec.yaml ships only the .bin for those files; when a new bundle is
+added, replace its JSON entry there with the .bin.
+
+--shard model|model-year also splits each synced JSON file into
+shards/<name>/<model>.json (or <model>_<year>.json) and records, per file,
+each shard's model, year range, row count and byte size under "shards" in
+index.json, so consumers can load only the shards they need. Later runs
+without --shard re-shard (or --check) those files with their recorded mode.
+Shard folders are not bundled by pubspec.yaml; list them there before
+relying on them in the app.
+
+--jobs N processes the CSVs in a process pool; vehicles.json is loaded once
+and handed to each worker, and results are reported in file order.
+
+--profile (or SEED_PROFILE=trace|cprofile) prints a per-stage trace; see
+scripts/instrumentation.py. With --jobs > 1 only the parent's stages are
+recorded.
 """
 
 import csv
+import hashlib
+import heapq
+import io
 import json
 import argparse
+import re
+import struct
 import sys
+import tempfile
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Set, Any, Optional
+from typing import List, Dict, Set, Any, Optional, Iterable, Iterator, Tuple
+
+sys.path.append(str(Path(__file__).resolve().parents[2] / "scripts"))
+import instrumentation
+import ymmt_key
+from ymmt_key import YMMTKey
 
 # --- Constants ---
 
@@ -58,6 +105,8 @@ LOCATION_DEFAULTS = {
     "footwell": "Footwell"
 }
 
+DIGESTS_PATH = Path(__file__).resolve().parent / "sync_digests.json"
+
 # --- Utils ---
 
 def find_repo_root() -> Path:
@@ -104,39 +153,71 @@ def clean_row(row: Dict[str, str]) -> Dict[str, Any]:
             
     return cleaned
 
-def get_row_identity(row: Dict[str, Any]) -> str:
-    """unique key: year|make|model|trim|body|market|secondary"""
+def get_row_identity(row: Dict[str, Any]) -> tuple:
+    """unique key: (YMMTKey, secondary[, location_hint])"""
     secondary = row.get("function_key") or row.get("spec_key") or "row"
-    parts = [
-        str(row.get("year", "")),
-        str(row.get("make", "")),
-        str(row.get("model", "")),
-        str(row.get("trim", "")),
-        str(row.get("body", "")),
-        str(row.get("market", "")),
-        str(secondary),
-    ]
     
     # Update: To avoid data loss on valid multiple bulbs (e.g. separate high/low if rows split, or multiple dome lights),
     # I will append location_hint to secondary if it exists for bulbs to avoid squashing valid data.
     if "location_hint" in row and row["location_hint"] != "n/a":
-        parts.append(str(row["location_hint"]))
-        
-    return "|".join(parts)
+        return (YMMTKey.from_record(row), str(secondary), str(row["location_hint"]))
+    return (YMMTKey.from_record(row), str(secondary))
+
+def format_identity(ident: tuple) -> str:
+    return "|".join(str(part) for part in ident)
+
+def row_sort_key(r: Dict[str, Any]) -> tuple:
+    return (YMMTKey.from_record(r), r.get("function_key", ""), r.get("location_hint", ""))
 
 def sort_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    def sort_key(r):
-        return (
-            r.get("year", 0),
-            r.get("make", ""),
-            r.get("model", ""),
-            r.get("trim", ""),
-            r.get("body", ""),
-            r.get("market", ""),
-            r.get("function_key", ""),
-            r.get("location_hint", "")
-        )
-    return sorted(rows, key=sort_key)
+    return sorted(rows, key=row_sort_key)
+
+# --- Digests ---
+
+def file_digest(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def load_digests(path: Path = DIGESTS_PATH) -> Dict[str, Any]:
+    if not path.exists():
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_digests(digests: Dict[str, Any], path: Path = DIGESTS_PATH) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(json.dumps(digests, indent=2, sort_keys=True) + "\n")
+
+# Code whose changes alter row content or order: editing any of these
+# invalidates every recorded digest
+TOOL_SOURCES = (Path(__file__).resolve(), Path(ymmt_key.__file__).resolve())
+
+@lru_cache(maxsize=1)
+def tool_digest() -> str:
+    h = hashlib.sha256()
+    for path in TOOL_SOURCES:
+        h.update(file_digest(path).encode())
+    return h.hexdigest()
+
+def current_digests(csv_path: Path, json_path: Path, vehicles_digest: str) -> Dict[str, str]:
+    """Digests of everything the outputs of `csv_path` depend on."""
+    bundle_path = bundle_path_for(json_path)
+    entry = {
+        "csv": file_digest(csv_path),
+        "json": file_digest(json_path) if json_path.exists() else "",
+        "bundle": file_digest(bundle_path) if bundle_path.exists() else "",
+        "tool": tool_digest(),
+    }
+    # Only bulb completion reads vehicles.json
+    if csv_path.name == "bulbs.csv":
+        entry["vehicles"] = vehicles_digest
+    return entry
 
 # --- Bulb Completion Logic ---
 
@@ -154,147 +235,683 @@ def load_vehicles(root: Path) -> List[Dict[str, Any]]:
         return data["value"]
     return []
 
-def complete_bulbs(rows: List[Dict[str, Any]], vehicles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    # 1. Build set of existing coverages
-    existing_coverage = set()
-    rows_by_vehicle = {} # Map "y|m|m|t|b|m" -> list of rows
-    
-    for row in rows:
-        v_key = f"{row['year']}|{row['make']}|{row['model']}|{row['trim']}|{row['body']}|{row['market']}"
-        f_key = row.get("function_key")
-        if f_key:
-            existing_coverage.add(f"{v_key}|{f_key}")
-            
-    # 2. Identify all target vehicles (union of vehicles.json and csv rows)
-    # We prefer vehicle objects from vehicles.json for defaults
-    target_vehicles = {} # Key -> vehicle dict
-    
-    for v in vehicles:
-        key = f"{v['year']}|{v['make']}|{v['model']}|{v['trim']}|{v.get('body', 'n/a')}|{v.get('market', 'n/a')}"
-        target_vehicles[key] = v
-        
-    for r in rows:
-        key = f"{r['year']}|{r['make']}|{r['model']}|{r['trim']}|{r['body']}|{r['market']}"
-        if key not in target_vehicles:
+class BulbCoverage:
+    """
+    Function coverage per vehicle, fed one row at a time.
+
+    Vehicles are interned to integer ids and each required function owns one
+    bit, so a vehicle's coverage is a single int mask and its gaps are
+    `full_mask & ~mask`, enumerated lowest bit first (REQUIRED_BULBS_* order).
+    """
+
+    def __init__(self, vehicles: List[Dict[str, Any]]):
+        self.functions = REQUIRED_BULBS_EXTERIOR + REQUIRED_BULBS_INTERIOR
+        self.function_bits = {func: 1 << i for i, func in enumerate(self.functions)}
+        self.full_mask = (1 << len(self.functions)) - 1
+        self.vehicle_ids: Dict[YMMTKey, int] = {}
+        self.vehicles: List[Dict[str, Any]] = []
+        self.masks: List[int] = []
+        # We prefer vehicle objects from vehicles.json for defaults
+        for v in vehicles:
+            key = YMMTKey.from_record(v)
+            vid = self.vehicle_ids.get(key)
+            if vid is None:
+                self.vehicle_ids[key] = len(self.vehicles)
+                self.vehicles.append(v)
+                self.masks.append(0)
+            else:
+                self.vehicles[vid] = v
+
+    def add_row(self, row: Dict[str, Any]) -> None:
+        key = YMMTKey.from_record(row)
+        vid = self.vehicle_ids.get(key)
+        if vid is None:
             # Reconstruct vehicle from row if missing in vehicles.json
-            target_vehicles[key] = {
-                "year": r["year"],
-                "make": r["make"],
-                "model": r["model"],
-                "trim": r["trim"],
-                "body": r["body"],
-                "market": r["market"]
+            vid = self.vehicle_ids[key] = len(self.vehicles)
+            self.vehicles.append({
+                "year": row["year"],
+                "make": row["make"],
+                "model": row["model"],
+                "trim": row["trim"],
+                "body": row["body"],
+                "market": row["market"]
+            })
+            self.masks.append(0)
+        bit = self.function_bits.get(row.get("function_key"))
+        if bit:
+            self.masks[vid] |= bit
+
+    def summary(self) -> Dict[str, Any]:
+        """Required-function coverage overall, per function and per model."""
+        per_function = [0] * len(self.functions)
+        per_model: Dict[str, Dict[str, int]] = {}
+        covered = 0
+        for vid, mask in enumerate(self.masks):
+            count = 0
+            while mask:
+                low = mask & -mask
+                per_function[low.bit_length() - 1] += 1
+                count += 1
+                mask ^= low
+            covered += count
+            model = per_model.setdefault(self.vehicles[vid]["model"], {"vehicles": 0, "covered": 0, "required": 0})
+            model["vehicles"] += 1
+            model["covered"] += count
+            model["required"] += len(self.functions)
+        return {
+            "vehicles": len(self.masks),
+            "covered": covered,
+            "required": len(self.masks) * len(self.functions),
+            "functions": dict(zip(self.functions, per_function)),
+            "models": per_model,
+        }
+
+    def placeholders(self) -> Iterator[Dict[str, Any]]:
+        # Everything after function_key is the same for every vehicle
+        tails = [
+            {
+                "location_hint": LOCATION_DEFAULTS.get(func, func.replace("_", " ").title()),
+                "tech": "bulb",
+                "bulb_code": "n/a",
+                "base": "n/a",
+                "qty": "n/a",
+                "serviceable": True, # As per plan
+                "notes": "n/a",
+                "source_1": "n/a",
+                "source_2": "n/a",
+                "confidence": "n/a"
+            }
+            for func in self.functions
+        ]
+        for vid, vehicle in enumerate(self.vehicles):
+            missing = self.full_mask & ~self.masks[vid]
+            if not missing:
+                continue
+            # Prevent duplicate adds if logic checks again
+            self.masks[vid] = self.full_mask
+            head = {
+                "year": int(vehicle["year"]),
+                "make": vehicle["make"],
+                "model": vehicle["model"],
+                "trim": vehicle["trim"],
+                "body": vehicle.get("body", "n/a"),
+                "market": vehicle.get("market", "n/a"),
             }
+            while missing:
+                low = missing & -missing
+                i = low.bit_length() - 1
+                yield {**head, "function_key": self.functions[i], **tails[i]}
+                missing ^= low
 
-    # 3. Fill gaps
-    new_rows = []
-    
-    # All required functions
-    required_funcs = REQUIRED_BULBS_EXTERIOR + REQUIRED_BULBS_INTERIOR
-    
-    csv_headers = [
-        "year","make","model","trim","body","market","function_key","location_hint",
-        "tech","bulb_code","base","qty","serviceable","notes","source_1",
-        "source_2","confidence"
-    ]
-    
-    for v_key, vehicle in target_vehicles.items():
-        for func in required_funcs:
-            coverage_key = f"{v_key}|{func}"
-            if coverage_key not in existing_coverage:
-                # Create placeholder
-                placeholder = {
-                    "year": int(vehicle["year"]),
-                    "make": vehicle["make"],
-                    "model": vehicle["model"],
-                    "trim": vehicle["trim"],
-                    "body": vehicle.get("body", "n/a"),
-                    "market": vehicle.get("market", "n/a"),
-                    "function_key": func,
-                    "location_hint": LOCATION_DEFAULTS.get(func, func.replace("_", " ").title()),
-                    "tech": "bulb",
-                    "bulb_code": "n/a",
-                    "base": "n/a",
-                    "qty": "n/a",
-                    "serviceable": True, # As per plan
-                    "notes": "n/a",
-                    "source_1": "n/a",
-                    "source_2": "n/a",
-                    "confidence": "n/a" 
-                }
-                new_rows.append(placeholder)
-                existing_coverage.add(coverage_key) # Prevent duplicate adds if logic checks again
+def print_coverage(summary: Dict[str, Any]) -> None:
+    required = summary["required"] or 1
+    print(f"  Coverage: {summary['covered']}/{summary['required']} required bulb functions "
+          f"({summary['covered'] / required:.1%}) across {summary['vehicles']} vehicles.")
+    if summary["vehicles"]:
+        weakest = sorted(summary["functions"].items(), key=lambda kv: (kv[1], kv[0]))[:3]
+        print("  Least covered: " + ", ".join(f"{func} {count / summary['vehicles']:.1%}" for func, count in weakest))
+    instrumentation.count("bulb_functions_covered", summary["covered"])
+    instrumentation.count("bulb_functions_required", summary["required"])
 
+def complete_bulbs(rows: List[Dict[str, Any]], vehicles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    coverage = BulbCoverage(vehicles)
+    for row in rows:
+        coverage.add_row(row)
+    print_coverage(coverage.summary())
+    new_rows = list(coverage.placeholders())
     print(f"  Added {len(new_rows)} placeholder bulb rows.")
     return rows + new_rows
 
 
-# --- Main ---
+# --- Streaming ---
 
-def process_file(csv_path: Path, output_dir: Path, vehicles: List[Dict[str, Any]], args: argparse.Namespace) -> bool:
-    print(f"Processing {csv_path.name}...")
-    
+DEFAULT_SPILL_ROWS = 50000
+
+def _write_run(entries: List[tuple], tmp_dir: str, index: int) -> Path:
+    run_path = Path(tmp_dir) / f"run_{index:05d}.jsonl"
+    with open(run_path, "w", encoding="utf-8") as f:
+        for sort_key, ident, seq, row in entries:
+            # Keys are spilled as their fields and re-interned on read
+            entry = [sort_key[0].astuple(), sort_key[1:], ident[1:], seq, row]
+            f.write(json.dumps(entry, ensure_ascii=False))
+            f.write("\n")
+    return run_path
+
+def _read_run(run_path: Path) -> Iterator[tuple]:
+    with open(run_path, "r", encoding="utf-8") as f:
+        for line in f:
+            fields, sort_rest, ident_rest, seq, row = json.loads(line)
+            key = YMMTKey(*fields)
+            yield (key, *sort_rest), (key, *ident_rest), seq, row
+
+def external_sort(rows: Iterable[Dict[str, Any]], tmp_dir: str, spill_rows: int = DEFAULT_SPILL_ROWS) -> Iterator[tuple]:
+    """Yield (sort_key, identity, seq, row) in output order.
+
+    Rows are sorted in chunks of `spill_rows`; once more than one chunk is
+    needed, each chunk is spilled to a JSON-lines run file in `tmp_dir` and
+    the runs are k-way merged.
+    """
+    runs: List[Path] = []
+    chunk: List[tuple] = []
+    for seq, row in enumerate(rows):
+        chunk.append((row_sort_key(row), get_row_identity(row), seq, row))
+        if len(chunk) >= spill_rows:
+            chunk.sort(key=lambda e: e[:3])
+            runs.append(_write_run(chunk, tmp_dir, len(runs)))
+            chunk = []
+    chunk.sort(key=lambda e: e[:3])
+    if not runs:
+        yield from chunk
+        return
+    if chunk:
+        runs.append(_write_run(chunk, tmp_dir, len(runs)))
+        chunk = []
+    yield from heapq.merge(*(_read_run(p) for p in runs), key=lambda e: e[:3])
+
+def dedupe_sorted(entries: Iterable[tuple], stats: Dict[str, int], strict: bool = False) -> Iterator[Dict[str, Any]]:
+    """Collapse runs of equal identity in a sorted stream (last write wins)."""
+    pending = None
+    for entry in entries:
+        if pending is not None and entry[1] == pending[1]:
+            stats["duplicates"] += 1
+            if strict:
+                print(f"Error: Strict mode - Duplicate row key found: {format_identity(entry[1])}")
+                sys.exit(1)
+        elif pending is not None:
+            yield pending[3]
+        pending = entry
+    if pending is not None:
+        yield pending[3]
+
+def write_json_array(rows: Iterable[Dict[str, Any]], out) -> int:
+    """Write rows exactly as json.dumps(rows, indent=2) would, one element at a time."""
+    count = 0
+    for row in rows:
+        element = json.dumps(row, indent=2, ensure_ascii=False).replace("\n", "\n  ")
+        out.write(("[\n  " if count == 0 else ",\n  ") + element)
+        count += 1
+    out.write("\n]\n" if count else "[]\n")
+    return count
+
+# --- Bundle ---
+
+BUNDLE_MAGIC = b"SNPB"
+BUNDLE_VERSION = 1
+BUNDLE_SUFFIX = ".bin"
+
+# Cell tags, stored in the low two bits of every cell
+CELL_ABSENT, CELL_STRING, CELL_INT, CELL_BOOL = 0, 1, 2, 3
+# Tagged cells must fit the Dart reader's 32-bit column arrays
+MAX_BUNDLE_INT = 1 << 28
+
+def _write_varint(value: int, out: bytearray) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+class BundleWriter:
+    """Columnar, string-interned encoding of the synced rows.
+
+    Layout (integers are unsigned LEB128 varints unless noted):
+      magic "SNPB", u16 little-endian format version
+      string count, then each string as UTF-8 byte length + bytes
+      column count, then each column name as a string index
+      row count
+      per column: byte length, then one cell per row
+
+    A cell is `payload << 2 | tag`: absent, string index, zigzag int or bool.
+    Read by lib/data/seed/spec_bundle.dart.
+    """
+
+    def __init__(self):
+        self.strings: Dict[str, int] = {}
+        self.columns: Dict[str, array] = {}
+        self.rows = 0
+
+    def intern(self, value: str) -> int:
+        index = self.strings.get(value)
+        if index is None:
+            index = self.strings[value] = len(self.strings)
+        return index
+
+    def cell(self, key: str, value: Any) -> int:
+        if isinstance(value, bool):
+            return (int(value) << 2) | CELL_BOOL
+        if isinstance(value, int):
+            if not -MAX_BUNDLE_INT <= value < MAX_BUNDLE_INT:
+                raise ValueError(f"Bundle int out of range in {key}: {value}")
+            zigzag = value * 2 if value >= 0 else -value * 2 - 1
+            return (zigzag << 2) | CELL_INT
+        if isinstance(value, str):
+            return (self.intern(value) << 2) | CELL_STRING
+        raise TypeError(f"Unsupported bundle value in {key}: {value!r}")
+
+    def add(self, row: Dict[str, Any]) -> None:
+        for key, value in row.items():
+            column = self.columns.get(key)
+            if column is None:
+                self.intern(key)
+                # Earlier rows did not have this column
+                column = self.columns[key] = array("I", [CELL_ABSENT]) * self.rows
+            column.append(self.cell(key, value))
+        self.rows += 1
+        if len(row) != len(self.columns):
+            for column in self.columns.values():
+                if len(column) < self.rows:
+                    column.append(CELL_ABSENT)
+
+    def to_bytes(self) -> bytes:
+        out = bytearray(BUNDLE_MAGIC)
+        out += struct.pack("<H", BUNDLE_VERSION)
+        _write_varint(len(self.strings), out)
+        for value in self.strings:
+            encoded = value.encode("utf-8")
+            _write_varint(len(encoded), out)
+            out += encoded
+        _write_varint(len(self.columns), out)
+        for key in self.columns:
+            _write_varint(self.strings[key], out)
+        _write_varint(self.rows, out)
+        for column in self.columns.values():
+            block = bytearray()
+            for cell in column:
+                _write_varint(cell, block)
+            _write_varint(len(block), out)
+            out += block
+        return bytes(out)
+
+def encode_bundle(rows: Iterable[Dict[str, Any]]) -> bytes:
+    writer = BundleWriter()
+    for row in rows:
+        writer.add(row)
+    return writer.to_bytes()
+
+def decode_bundle(data: bytes) -> List[Dict[str, Any]]:
+    """Inverse of encode_bundle; used by tests and for debugging bundles."""
+    pos = 0
+
+    def varint() -> int:
+        nonlocal pos
+        result = shift = 0
+        while True:
+            byte = data[pos]
+            pos += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return result
+            shift += 7
+
+    if data[:4] != BUNDLE_MAGIC:
+        raise ValueError("Not a spec bundle")
+    (version,) = struct.unpack_from("<H", data, 4)
+    if version != BUNDLE_VERSION:
+        raise ValueError(f"Unsupported spec bundle version {version}")
+    pos = 6
+    strings = []
+    for _ in range(varint()):
+        length = varint()
+        strings.append(data[pos:pos + length].decode("utf-8"))
+        pos += length
+    columns = [strings[varint()] for _ in range(varint())]
+    rows: List[Dict[str, Any]] = [{} for _ in range(varint())]
+    for key in columns:
+        varint()  # block length
+        for row in rows:
+            cell = varint()
+            tag, payload = cell & 3, cell >> 2
+            if tag == CELL_STRING:
+                row[key] = strings[payload]
+            elif tag == CELL_INT:
+                row[key] = (payload >> 1) ^ -(payload & 1)
+            elif tag == CELL_BOOL:
+                row[key] = bool(payload)
+    return rows
+
+def bundle_path_for(json_path: Path) -> Path:
+    return json_path.with_suffix(BUNDLE_SUFFIX)
+
+def sync_bundle(bundle: bytes, bundle_path: Path, args: argparse.Namespace) -> bool:
+    if args.check:
+        if not bundle_path.exists() or bundle_path.read_bytes() != bundle:
+            print(f"Error: --check failed. {bundle_path.name} is missing or differs.")
+            return False
+        print(f"  {bundle_path.name} is in sync.")
+    elif args.dry_run:
+        print(f"  [Dry Run] Would write {len(bundle)} bytes to {bundle_path.name}.")
+    else:
+        bundle_path.write_bytes(bundle)
+        print(f"  Written {len(bundle)} bytes to {bundle_path.name}.")
+    return True
+
+class CompareWriter:
+    """File-like sink that compares written text against an existing file."""
+
+    def __init__(self, path: Path):
+        # Universal newlines: CRLF on disk compares equal to LF
+        self._f = open(path, "r", encoding="utf-8")
+        self.matches = True
+
+    def write(self, text: str) -> None:
+        if self.matches and self._f.read(len(text)) != text:
+            self.matches = False
+
+    def close(self) -> bool:
+        if self.matches and self._f.read(1):
+            self.matches = False
+        self._f.close()
+        return self.matches
+
+class CountWriter:
+    def write(self, text: str) -> None:
+        pass
+
+def iter_clean_rows(csv_path: Path, stats: Dict[str, int], coverage: Optional[BulbCoverage] = None) -> Iterator[Dict[str, Any]]:
     with open(csv_path, "r", encoding="utf-8-sig", newline="") as f:
-        reader = csv.DictReader(f)
-        headers = reader.fieldnames
-        raw_rows = list(reader)
+        for raw in csv.DictReader(f):
+            stats["read"] += 1
+            row = clean_row(raw)
+            if coverage is not None:
+                coverage.add_row(row)
+            yield row
+    if coverage is not None:
+        print_coverage(coverage.summary())
+        for placeholder in coverage.placeholders():
+            stats["placeholders"] += 1
+            yield placeholder
+
+def process_file_streaming(csv_path: Path, output_dir: Path, vehicles: List[Dict[str, Any]], args: argparse.Namespace) -> bool:
+    print(f"Processing {csv_path.name} (streaming)...")
+    json_path = output_dir / csv_path.with_suffix(".json").name
+    stats = {"read": 0, "placeholders": 0, "duplicates": 0}
+    coverage = BulbCoverage(vehicles) if csv_path.name == "bulbs.csv" else None
+
+    if args.check:
+        if not json_path.exists():
+            print(f"Error: --check failed. {json_path.name} does not exist.")
+            return False
+        out = CompareWriter(json_path)
+    elif args.dry_run:
+        out = CountWriter()
+    else:
+        tmp_out = json_path.with_suffix(".json.tmp")
+        out = open(tmp_out, "w", encoding="utf-8")
+
+    bundle = BundleWriter()
+
+    def tee(rows: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        for row in rows:
+            bundle.add(row)
+            yield row
+
+    with instrumentation.stage("stream"), tempfile.TemporaryDirectory(prefix="fitment_sync_") as tmp_dir:
+        rows = iter_clean_rows(csv_path, stats, coverage)
+        merged = external_sort(rows, tmp_dir, args.spill_rows)
+        written = write_json_array(tee(dedupe_sorted(merged, stats, args.strict)), out)
+        instrumentation.count("rows_in", stats["read"])
+        instrumentation.count("placeholder_bulbs", stats["placeholders"])
+        instrumentation.count("duplicates_dropped", stats["duplicates"])
+        instrumentation.count("rows_out", written)
+
+    print(f"  Read {stats['read']} rows.")
+    if coverage is not None:
+        print(f"  Added {stats['placeholders']} placeholder bulb rows.")
+
+    if args.check:
+        if not out.close():
+            print(f"Error: --check failed. {json_path.name} content differs.")
+            return False
+        print(f"  {json_path.name} is in sync.")
+    elif args.dry_run:
+        print(f"  [Dry Run] Would write {written} rows to {json_path.name}.")
+    else:
+        out.close()
+        tmp_out.replace(json_path)
+        print(f"  Written {written} rows to {json_path.name}.")
+    with instrumentation.stage("bundle"):
+        return sync_bundle(bundle.to_bytes(), bundle_path_for(json_path), args)
+
+
+# --- Shards ---
+
+SHARD_DIR = "shards"
+SHARD_MODES = ("model", "model-year")
+
+def shard_slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", text.lower()).strip("_") or "unknown"
+
+def build_shards(json_path: Path, by: str) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+    """Split one synced JSON file by model (and year); returns (manifest entries, shard texts)."""
+    with open(json_path, "r", encoding="utf-8") as f:
+        rows = json.load(f)
+
+    groups: Dict[Tuple[str, int], List[Dict[str, Any]]] = {}
+    for row in rows:
+        year = row.get("year", 0) if by == "model-year" else 0
+        groups.setdefault((str(row.get("model", "n/a")), year), []).append(row)
+
+    entries: List[Dict[str, Any]] = []
+    contents: Dict[str, str] = {}
+    for (model, year), group in sorted(groups.items()):
+        base = shard_slug(model) + (f"_{year}" if by == "model-year" else "")
+        name, n = base, 2
+        # Distinct models can share a slug ("WRX STI" / "WRX-STI")
+        while f"{SHARD_DIR}/{json_path.stem}/{name}.json" in contents:
+            name, n = f"{base}_{n}", n + 1
+        rel = f"{SHARD_DIR}/{json_path.stem}/{name}.json"
+        text = json.dumps(group, indent=2, ensure_ascii=False) + "\n"
+        years = [r["year"] for r in group if isinstance(r.get("year"), int)]
+        entries.append({
+            "model": model,
+            "years": [min(years), max(years)] if years else [],
+            "file": rel,
+            "rows": len(group),
+            "bytes": len(text.encode("utf-8")),
+        })
+        contents[rel] = text
+    return entries, contents
+
+def sync_shards(output_dir: Path, json_path: Path, by: str, args: argparse.Namespace) -> Tuple[bool, Dict[str, Any]]:
+    """Write or check the shards of one JSON file; returns (ok, index.json entry)."""
+    entries, contents = build_shards(json_path, by)
+    shard_dir = output_dir / SHARD_DIR / json_path.stem
+    existing = {f"{SHARD_DIR}/{json_path.stem}/{p.name}" for p in shard_dir.glob("*.json")}
+    ok = True
+
+    if args.check:
+        stale = [rel for rel, text in contents.items()
+                 if rel not in existing or (output_dir / rel).read_text(encoding="utf-8") != text]
+        stale += sorted(existing - contents.keys())
+        if stale:
+            print(f"Error: --check failed. {len(stale)} shards of {json_path.name} differ (e.g. {stale[0]}).")
+            ok = False
+        else:
+            print(f"  {len(entries)} shards of {json_path.name} are in sync.")
+    elif args.dry_run:
+        print(f"  [Dry Run] Would write {len(entries)} shards of {json_path.name}.")
+    else:
+        shard_dir.mkdir(parents=True, exist_ok=True)
+        for rel in existing - contents.keys():
+            (output_dir / rel).unlink()
+        for rel, text in contents.items():
+            with open(output_dir / rel, "w", encoding="utf-8", newline="\n") as f:
+                f.write(text)
+        print(f"  Written {len(entries)} shards of {json_path.name} to {SHARD_DIR}/{json_path.stem}/.")
+    return ok, {"by": by, "shards": entries}
+
+def sync_all_shards(output_dir: Path, json_names: List[str], args: argparse.Namespace) -> Tuple[bool, Dict[str, Dict[str, Any]]]:
+    """Shard each file with --shard, or with the mode index.json recorded for it."""
+    recorded = load_index(output_dir).get("shards", {})
+    ok = True
+    shards: Dict[str, Dict[str, Any]] = {}
+    for name in json_names:
+        by = args.shard or recorded.get(name, {}).get("by")
+        if not by or not (output_dir / name).exists():
+            continue
+        file_ok, shards[name] = sync_shards(output_dir, output_dir / name, by, args)
+        ok = ok and file_ok
+    return ok, shards
+
+# --- Index ---
+
+def load_index(output_dir: Path) -> Dict[str, Any]:
+    index_path = output_dir / "index.json"
+    if not index_path.exists():
+        return {"files": []}
+    with open(index_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def sync_index(output_dir: Path, json_names: List[str], shards: Dict[str, Dict[str, Any]], args: argparse.Namespace) -> bool:
+    """Register bundles and shards of the synced files in index.json."""
+    index_path = output_dir / "index.json"
+    index = load_index(output_dir)
+
+    expected = dict(index)
+    bundles = dict(index.get("bundles", {}))
+    for name in json_names:
+        bundles[name] = bundle_path_for(Path(name)).name
+    expected["bundles"] = dict(sorted(bundles.items()))
+    if shards:
+        expected["shards"] = dict(sorted({**index.get("shards", {}), **shards}.items()))
+    if expected == index:
+        return True
+
+    if args.check:
+        print(f"Error: --check failed. {index_path.name} does not list every bundle and shard.")
+        return False
+    if args.dry_run:
+        print(f"[Dry Run] Would update {index_path.name}.")
+        return True
+    with open(index_path, "w", encoding="utf-8") as f:
+        f.write(json.dumps(expected, indent=2) + "\n")
+    print(f"Updated {index_path.name} ({len(json_names)} bundles, {len(shards)} sharded files).")
+    return True
+
+# --- Main ---
+
+def build_rows(csv_path: Path, vehicles: List[Dict[str, Any]], strict: bool = False) -> List[Dict[str, Any]]:
+    """Cleaned, completed, deduplicated and sorted rows of one fitment CSV."""
+    with instrumentation.stage("load"):
+        with open(csv_path, "r", encoding="utf-8-sig", newline="") as f:
+            reader = csv.DictReader(f)
+            headers = reader.fieldnames
+            raw_rows = list(reader)
+        instrumentation.count("rows_in", len(raw_rows))
         
     print(f"  Read {len(raw_rows)} rows.")
     
     # 1. Clean / Normalize
-    rows = [clean_row(r) for r in raw_rows]
+    with instrumentation.stage("clean"):
+        rows = [clean_row(r) for r in raw_rows]
     
     # 2. Bulb Completion
     if csv_path.name == "bulbs.csv":
-        rows = complete_bulbs(rows, vehicles)
+        with instrumentation.stage("complete"):
+            before = len(rows)
+            rows = complete_bulbs(rows, vehicles)
+            instrumentation.count("placeholder_bulbs", len(rows) - before)
         
     # 3. Deduplicate
-    unique_rows = {}
-    duplicates = 0
-    for r in rows:
-        ident = get_row_identity(r)
-        if ident in unique_rows:
-            duplicates += 1
-            if args.strict:
-                print(f"Error: Strict mode - Duplicate row key found: {ident}")
-                sys.exit(1)
-        # Last write wins
-        unique_rows[ident] = r
+    with instrumentation.stage("dedupe"):
+        unique_rows = {}
+        duplicates = 0
+        for r in rows:
+            ident = get_row_identity(r)
+            if ident in unique_rows:
+                duplicates += 1
+                if strict:
+                    print(f"Error: Strict mode - Duplicate row key found: {format_identity(ident)}")
+                    sys.exit(1)
+            # Last write wins
+            unique_rows[ident] = r
+        instrumentation.count("duplicates_dropped", duplicates)
         
     final_rows = list(unique_rows.values())
     
     # 4. Sort
-    final_rows = sort_rows(final_rows)
+    with instrumentation.stage("sort"):
+        return sort_rows(final_rows)
+
+def process_file(csv_path: Path, output_dir: Path, vehicles: List[Dict[str, Any]], args: argparse.Namespace) -> bool:
+    print(f"Processing {csv_path.name}...")
+    
+    final_rows = build_rows(csv_path, vehicles, args.strict)
     
     # 5. Output
     json_path = output_dir / csv_path.with_suffix(".json").name
     
     output_data = final_rows # Array of objects
+    instrumentation.count("rows_out", len(final_rows))
     
-    json_str = json.dumps(output_data, indent=2, ensure_ascii=False) + "\n"
+    with instrumentation.stage("serialize"):
+        json_str = json.dumps(output_data, indent=2, ensure_ascii=False) + "\n"
     
     if args.check:
         if not json_path.exists():
             print(f"Error: --check failed. {json_path.name} does not exist.")
             return False
         
-        with open(json_path, "r", encoding="utf-8") as f:
-            existing_content = f.read()
-            
-        # Normalize newlines for comparison
-        if existing_content.replace("\r\n", "\n") != json_str.replace("\r\n", "\n"):
+        with instrumentation.stage("compare"):
+            with open(json_path, "r", encoding="utf-8") as f:
+                existing_content = f.read()
+                
+            # Normalize newlines for comparison
+            differs = existing_content.replace("\r\n", "\n") != json_str.replace("\r\n", "\n")
+        if differs:
             print(f"Error: --check failed. {json_path.name} content differs.")
             return False
         print(f"  {json_path.name} is in sync.")
             
     elif not args.dry_run:
-        with open(json_path, "w", encoding="utf-8") as f:
-            f.write(json_str)
+        with instrumentation.stage("write"):
+            with open(json_path, "w", encoding="utf-8") as f:
+                f.write(json_str)
         print(f"  Written {len(final_rows)} rows to {json_path.name}.")
     else:
         print(f"  [Dry Run] Would write {len(final_rows)} rows to {json_path.name}.")
         
-    return True
+    # 6. Bundle
+    with instrumentation.stage("bundle"):
+        return sync_bundle(encode_bundle(final_rows), bundle_path_for(json_path), args)
+
+# --- Parallel ---
+
+_WORKER_VEHICLES: List[Dict[str, Any]] = []
+
+def _init_worker(vehicles: List[Dict[str, Any]]) -> None:
+    global _WORKER_VEHICLES
+    _WORKER_VEHICLES = vehicles
+
+def run_task(csv_path: Path, output_dir: Path, args: argparse.Namespace) -> Tuple[bool, int, str, float]:
+    """Process one CSV in a pool worker; returns (ok, exit_code, log, seconds)."""
+    log = io.StringIO()
+    started = time.perf_counter()
+    exit_code = 0
+    with redirect_stdout(log):
+        process = process_file_streaming if args.stream else process_file
+        try:
+            ok = process(csv_path, output_dir, _WORKER_VEHICLES, args)
+        except SystemExit as e:
+            # --strict aborts the file; the parent decides when to exit
+            ok = False
+            exit_code = e.code if isinstance(e.code, int) else 1
+    return ok, exit_code, log.getvalue(), time.perf_counter() - started
+
+def run_tasks(tasks: List[Path], output_dir: Path, vehicles: List[Dict[str, Any]], args: argparse.Namespace) -> List[Tuple[bool, int, str, float]]:
+    """Run every task, in a pool when --jobs > 1, returning results in task order."""
+    if args.jobs <= 1 or len(tasks) <= 1:
+        results = []
+        for csv_path in tasks:
+            started = time.perf_counter()
+            process = process_file_streaming if args.stream else process_file
+            with instrumentation.stage(f"sync:{csv_path.name}"):
+                ok = process(csv_path, output_dir, vehicles, args)
+            results.append((ok, 0, "", time.perf_counter() - started))
+        return results
+
+    workers = min(args.jobs, len(tasks))
+    with instrumentation.stage("pool"), ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(vehicles,)) as pool:
+        return list(pool.map(run_task, tasks, [output_dir] * len(tasks), [args] * len(tasks)))
 
 def main():
     parser = argparse.ArgumentParser(description="Sync Fitment CSV to Specs JSON")
@@ -302,8 +919,15 @@ def main():
     parser.add_argument("--dry-run", action="store_true", help="Do not write files")
     parser.add_argument("--check", action="store_true", help="Fail if changes needed")
     parser.add_argument("--strict", action="store_true", help="Fail on duplicates")
+    parser.add_argument("--stream", action="store_true", help="Bounded-memory mode: external sort and incremental JSON writes")
+    parser.add_argument("--spill-rows", type=int, default=DEFAULT_SPILL_ROWS, help="Rows per sorted chunk before spilling to disk (--stream)")
+    parser.add_argument("--jobs", type=int, default=1, help="Process CSV files in N worker processes")
+    parser.add_argument("--shard", choices=SHARD_MODES, help="Also split each JSON file into shards by model (or model and year) and list them in index.json")
+    parser.add_argument("--no-digest-cache", action="store_true", help="With --check, ignore sync_digests.json and verify every file")
+    instrumentation.add_argument(parser)
     
     args = parser.parse_args()
+    instrumentation.setup(__file__, args.profile)
     
     root = find_repo_root()
     input_dir = root / "assets/seed/specs/fitment"
@@ -312,19 +936,78 @@ def main():
     if not input_dir.exists():
         print(f"Error: Input directory {input_dir} not found.")
         sys.exit(1)
-        
-    vehicles = load_vehicles(root)
-    print(f"Loaded {len(vehicles)} vehicles for completion logic.")
+
+    instrumentation.begin("digests")
+    v_path = root / "assets/seed/vehicles.json"
+    vehicles_digest = file_digest(v_path) if v_path.exists() else ""
+    digests = load_digests()
+    files = digests.setdefault("files", {})
+    use_cache = args.check and not args.no_digest_cache
     
     success = True
+    exit_code = 0
+    timings = {}
+    tasks = []
+    synced = []
+    failed = set()
     
-    for csv_file in input_dir.glob("*.csv"):
+    for csv_file in sorted(input_dir.glob("*.csv")):
         if args.only and args.only not in csv_file.name:
             continue
-            
-        if not process_file(csv_file, output_dir, vehicles, args):
-            success = False
-            
+
+        started = time.perf_counter()
+        json_path = output_dir / csv_file.with_suffix(".json").name
+        synced.append(json_path.name)
+        expected = current_digests(csv_file, json_path, vehicles_digest)
+
+        if use_cache and files.get(csv_file.name) == expected:
+            instrumentation.count("digest_cache_hits")
+            print(f"Skipping {csv_file.name}: {json_path.name} unchanged since last sync (digest match).")
+            timings[csv_file.name] = time.perf_counter() - started
+        else:
+            tasks.append(csv_file)
+
+    instrumentation.end()
+
+    if tasks:
+        with instrumentation.stage("vehicles"):
+            vehicles = load_vehicles(root)
+            instrumentation.count("vehicles_in", len(vehicles))
+        print(f"Loaded {len(vehicles)} vehicles for completion logic.")
+        results = run_tasks(tasks, output_dir, vehicles, args)
+
+        for csv_file, (ok, code, log, elapsed) in zip(tasks, results):
+            print(log, end="")
+            json_path = output_dir / csv_file.with_suffix(".json").name
+            if ok and not args.dry_run:
+                # Output now matches the CSV; remember it for the next --check
+                files[csv_file.name] = current_digests(csv_file, json_path, vehicles_digest)
+            else:
+                files.pop(csv_file.name, None)
+            if not ok:
+                success = False
+                failed.add(json_path.name)
+            exit_code = max(exit_code, code)
+            timings[csv_file.name] = elapsed
+
+    instrumentation.begin("index")
+    ok, shards = sync_all_shards(output_dir, [n for n in synced if n not in failed], args)
+    success = success and ok
+
+    if synced and not sync_index(output_dir, synced, shards, args):
+        success = False
+
+    if not args.dry_run:
+        digests["vehicles"] = vehicles_digest
+        save_digests(digests)
+    instrumentation.end()
+
+    print("Timing:")
+    for name, elapsed in sorted(timings.items()):
+        print(f"  {name}: {elapsed * 1000:.1f} ms")
+
+    if exit_code:
+        sys.exit(exit_code)
     if args.check and not success:
         sys.exit(1)
 
@@ -0,0 +1,70 @@
+import unittest
+import sys
+import os
+import json
+import sqlite3
+import tempfile
+from pathlib import Path
+
+# Add current dir to path to import the script
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import build_fitment_sqlite as build_script
+
+class TestBuildFitmentSqlite(unittest.TestCase):
+
+    def test_enrich_tags_with_years(self):
+        # Same expectation as parseSpecs in test/data/seed/seed_parsing_test.dart
+        self.assertEqual(
+            build_script.enrich_tags_with_years("oil,capacity", "WRX 2022+ Oil Capacity"),
+            "oil,capacity,2022,2023,2024,2025,2026",
+        )
+        self.assertEqual(build_script.enrich_tags_with_years("", "STI 2015-2016"), "2015,2016")
+
+    def test_spec_ids_match_seed_runner(self):
+        # Same ids as 'fitment spec ids match the prebuilt DB' in
+        # test/data/seed/seed_parsing_test.dart
+        tall = {"year": 2024, "make": "Subaru", "model": "WRX", "trim": "Base", "body": "Sedan",
+                "market": "USDM", "function_key": "headlight_low", "bulb_code": "H11"}
+        self.assertEqual(next(build_script.fitment_specs(tall, 0))[0], "fit_abd6add16d003d86")
+        wide = {"year": 2015, "make": "Subaru", "model": "WRX", "trim": "Base", "market": "USDM",
+                "engine_oil_qty": "5.1 qt"}
+        self.assertEqual(next(build_script.fitment_specs(wide, 0))[0], "wide_fc5cfbbb01959731")
+
+    def test_build_database(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            fitment = root / "assets/seed/specs/fitment"
+            fitment.mkdir(parents=True)
+            (fitment / "fluids.csv").write_text(
+                "year,make,model,trim,body,market,engine_oil_qty,notes\n"
+                "2015,Subaru,WRX,Base,,USDM,5.1 qt,check dipstick\n"
+                "2014,Subaru,WRX,Base,,USDM,,\n",
+                encoding="utf-8",
+            )
+            (root / "assets/seed/specs/index.json").write_text(json.dumps({"files": ["fluids.json"]}), encoding="utf-8")
+            (root / "assets/seed/vehicles.json").write_text(json.dumps([
+                {"id": "v1", "year": 2015, "make": "Subaru", "model": "WRX", "trim": "Base",
+                 "engineCode": "FA20 Turbo", "updatedAt": "2024-01-01T00:00:00Z"},
+            ]), encoding="utf-8")
+            (root / "assets/seed/parts.json").write_text("[]", encoding="utf-8")
+
+            out = root / "fitment.db"
+            counts = build_script.build_database(root, out)
+            self.assertEqual(counts["fitment_fluids"], 2)
+            self.assertEqual(counts["vehicles"], 1)
+
+            conn = sqlite3.connect(out)
+            try:
+                rows = conn.execute("SELECT year, engine_oil_qty, body FROM fitment_fluids ORDER BY row_id").fetchall()
+                self.assertEqual(rows, [(2014, None, None), (2015, "5.1 qt", None)])
+                hits = conn.execute("SELECT category, row_id FROM fitment_notes_fts WHERE fitment_notes_fts MATCH 'dipstick'").fetchall()
+                self.assertEqual(hits, [("fluids", 2)])
+                specs = conn.execute("SELECT category, title, body, tags FROM specs").fetchall()
+                self.assertEqual(specs, [("Fluids", "ENGINE OIL QTY", "5.1 qt", "2015,subaru,wrx,base,usdm")])
+                self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], build_script.DRIFT_SCHEMA_VERSION)
+            finally:
+                conn.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2] / "scripts"))
+
+import find_vehicle_duplicates as finder
+
+class TestFindVehicleDuplicates(unittest.TestCase):
+
+    def vehicle(self, trim, vid):
+        return {"id": vid, "year": 2005, "make": "Subaru", "model": "Legacy", "trim": trim,
+                "engineCode": "EJ20X Turbo", "market": "JDM"}
+
+    def test_grade_suffix_is_not_a_duplicate(self):
+        vehicles = [
+            self.vehicle("Touring Wagon 2.0GT (JDM)", "a"),
+            self.vehicle("Touring Wagon 2.0GT Spec.B (JDM)", "b"),
+            self.vehicle("GT-B E-tune (JDM)", "c"),
+            self.vehicle("GT-B E-tune II (JDM)", "d"),
+        ]
+        _, found = finder.find_duplicates(vehicles)
+        self.assertEqual(found, [])
+
+    def test_reordered_trim_is_merged(self):
+        vehicles = [self.vehicle("22B STI (JDM)", "a"), self.vehicle("STI 22B (JDM)", "b")]
+        _, found = finder.find_duplicates(vehicles)
+        self.assertEqual([(s["action"], s["reason"]) for s in found], [("merge", "identical")])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,12 +1,18 @@
 import unittest
 import sys
 import os
+import io
+import json
+import argparse
+import pickle
+import tempfile
 from pathlib import Path
 
 # Add current dir to path to import the script
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 import sync_fitment_csv_to_specs_json as sync_script
+from ymmt_key import YMMTKey
 
 class TestSyncFitment(unittest.TestCase):
     
@@ -78,6 +84,32 @@ class TestSyncFitment(unittest.TestCase):
                 self.assertTrue(r["serviceable"])
                 self.assertEqual(r["location_hint"], "Front Overhead Console") # Default
 
+    def test_bulb_coverage_summary(self):
+        vehicles = [
+            {"year": 2024, "make": "Subaru", "model": "WRX", "trim": "Base"},
+            {"year": 2024, "make": "Subaru", "model": "WRX", "trim": "Premium"},
+            {"year": 2024, "make": "Subaru", "model": "BRZ", "trim": "Base"},
+        ]
+        coverage = sync_script.BulbCoverage(vehicles)
+        for trim, func in [("Base", "headlight_low"), ("Base", "dome"), ("Premium", "dome"), ("Base", "not_required")]:
+            coverage.add_row({"year": 2024, "make": "Subaru", "model": "WRX", "trim": trim, "function_key": func})
+
+        summary = coverage.summary()
+        required = len(sync_script.REQUIRED_BULBS_EXTERIOR) + len(sync_script.REQUIRED_BULBS_INTERIOR)
+        self.assertEqual(summary["vehicles"], 3)
+        self.assertEqual(summary["covered"], 3)
+        self.assertEqual(summary["required"], 3 * required)
+        self.assertEqual(summary["functions"]["dome"], 2)
+        self.assertEqual(summary["functions"]["headlight_low"], 1)
+        self.assertEqual(summary["models"]["WRX"], {"vehicles": 2, "covered": 3, "required": 2 * required})
+        self.assertEqual(summary["models"]["BRZ"]["covered"], 0)
+
+        # Gaps come out per vehicle in REQUIRED_BULBS_* order, once
+        placeholders = list(coverage.placeholders())
+        self.assertEqual(len(placeholders), 3 * required - 3)
+        self.assertEqual(placeholders[0]["function_key"], "headlight_high")
+        self.assertEqual(list(coverage.placeholders()), [])
+
     def test_sort_rows(self):
         rows = [
             {"year": 2022, "make": "B"},
@@ -91,5 +123,153 @@ class TestSyncFitment(unittest.TestCase):
         self.assertEqual(sorted_rows[2]["year"], 2022)
         self.assertEqual(sorted_rows[2]["make"], "B")
 
+    def test_ymmt_key(self):
+        # CSV strings, synced JSON values and blanks all land on one interned key
+        a = YMMTKey.from_record({"year": "2024", "make": " Subaru ", "model": "WRX", "trim": "Base", "body": ""})
+        b = YMMTKey(2024, "Subaru", "WRX", "Base", "n/a", None)
+        self.assertIs(a, b)
+        self.assertEqual(a.astuple(), (2024, "Subaru", "WRX", "Base", "n/a", "n/a"))
+        self.assertEqual(str(a.replace(market="USDM")), "2024|Subaru|WRX|Base|n/a|USDM")
+        self.assertEqual(YMMTKey("", "Subaru", "WRX", "Base").year, 0)
+        # Year orders numerically, then the text fields
+        keys = [YMMTKey(2010, "Subaru", "WRX", "Base"), YMMTKey(9, "Subaru", "WRX", "Base"), YMMTKey(2010, "Subaru", "BRZ", "Base")]
+        self.assertEqual([k.astuple()[:3] for k in sorted(keys)], [(9, "Subaru", "WRX"), (2010, "Subaru", "BRZ"), (2010, "Subaru", "WRX")])
+        self.assertIs(pickle.loads(pickle.dumps(a)), a)
+
+    def test_tool_digest_covers_ymmt_key(self):
+        # Row identity and order come from ymmt_key.py, so editing it must
+        # invalidate the digests --check compares against
+        self.assertIn(Path(sync_script.ymmt_key.__file__).resolve(), sync_script.TOOL_SOURCES)
+        sources = sync_script.TOOL_SOURCES
+        with tempfile.TemporaryDirectory() as tmp:
+            copies = []
+            for path in sources:
+                copy = Path(tmp) / path.name
+                copy.write_bytes(path.read_bytes())
+                copies.append(copy)
+            key_copy = copies[sources.index(Path(sync_script.ymmt_key.__file__).resolve())]
+            csv_path = Path(tmp) / "engines.csv"
+            csv_path.write_text("year,make\n2024,Subaru\n", encoding="utf-8")
+            try:
+                sync_script.TOOL_SOURCES = tuple(copies)
+                sync_script.tool_digest.cache_clear()
+                before = sync_script.current_digests(csv_path, Path(tmp) / "engines.json", "")
+                key_copy.write_text(key_copy.read_text(encoding="utf-8") + "\n# reordered\n", encoding="utf-8")
+                sync_script.tool_digest.cache_clear()
+                after = sync_script.current_digests(csv_path, Path(tmp) / "engines.json", "")
+            finally:
+                sync_script.TOOL_SOURCES = sources
+                sync_script.tool_digest.cache_clear()
+        self.assertEqual(before["csv"], after["csv"])
+        self.assertNotEqual(before["tool"], after["tool"])
+
+    def test_write_json_array_matches_dumps(self):
+        rows = [
+            {"year": 2024, "make": "Subaru", "notes": "caf\u00e9", "serviceable": True},
+            {"year": 2025, "make": "Subaru", "notes": "n/a", "serviceable": "n/a"},
+        ]
+        for data in (rows, rows[:1], []):
+            out = io.StringIO()
+            sync_script.write_json_array(iter(data), out)
+            self.assertEqual(out.getvalue(), json.dumps(data, indent=2, ensure_ascii=False) + "\n")
+
+    def test_streaming_matches_in_memory(self):
+        fixture = Path(__file__).resolve().parents[2] / "test/seed_fixtures/fitment/bulbs.small.csv"
+        vehicles = [
+            {"year": 2023, "make": "Subaru", "model": "Test", "trim": "Base", "body": "SUV", "market": "USDM"}
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            csv_path = tmp / "bulbs.csv"
+            lines = fixture.read_text(encoding="utf-8").splitlines(keepends=True)
+            # Duplicate a row so dedupe has work to do
+            csv_path.write_text("".join(lines + lines[1:2]), encoding="utf-8")
+            mem_dir, stream_dir = tmp / "mem", tmp / "stream"
+            mem_dir.mkdir()
+            stream_dir.mkdir()
+
+            args = argparse.Namespace(check=False, dry_run=False, strict=False, spill_rows=7)
+            self.assertTrue(sync_script.process_file(csv_path, mem_dir, vehicles, args))
+            self.assertTrue(sync_script.process_file_streaming(csv_path, stream_dir, vehicles, args))
+            self.assertEqual(
+                (stream_dir / "bulbs.json").read_text(encoding="utf-8"),
+                (mem_dir / "bulbs.json").read_text(encoding="utf-8"),
+            )
+
+            args.check = True
+            self.assertTrue(sync_script.process_file_streaming(csv_path, mem_dir, vehicles, args))
+            self.assertEqual(
+                (stream_dir / "bulbs.bin").read_bytes(),
+                (mem_dir / "bulbs.bin").read_bytes(),
+            )
+
+    def test_bundle_round_trip(self):
+        rows = [
+            {"year": 2024, "make": "Subaru", "qty": 2, "serviceable": True, "notes": "café"},
+            {"year": 2025, "make": "Subaru", "qty": "n/a", "serviceable": False, "notes": "n/a", "offset": -3},
+            {"year": 0, "make": "Subaru"},
+        ]
+        data = sync_script.encode_bundle(rows)
+        self.assertEqual(data[:4], sync_script.BUNDLE_MAGIC)
+        self.assertEqual(sync_script.decode_bundle(data), rows)
+        # "Subaru" is stored once in the string table
+        self.assertEqual(data.count(b"Subaru"), 1)
+
+    def test_build_shards(self):
+        rows = [
+            {"year": 2002, "make": "Subaru", "model": "WRX STI"},
+            {"year": 2004, "make": "Subaru", "model": "WRX-STI"},
+            {"year": 2005, "make": "Subaru", "model": "WRX STI"},
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            json_path = Path(tmp) / "engines.json"
+            json_path.write_text(json.dumps(rows, indent=2) + "\n", encoding="utf-8")
+
+            entries, contents = sync_script.build_shards(json_path, "model")
+            self.assertEqual([e["file"] for e in entries], ["shards/engines/wrx_sti.json", "shards/engines/wrx_sti_2.json"])
+            self.assertEqual(entries[0]["years"], [2002, 2005])
+            self.assertEqual(entries[0]["rows"], 2)
+            self.assertEqual(entries[0]["bytes"], len(contents[entries[0]["file"]].encode("utf-8")))
+
+            entries, _ = sync_script.build_shards(json_path, "model-year")
+            self.assertEqual(len(entries), 3)
+            self.assertEqual(entries[0]["file"], "shards/engines/wrx_sti_2002.json")
+
+    def test_recorded_shards_follow_later_syncs(self):
+        rows = [
+            {"year": 2022, "make": "Subaru", "model": "BRZ"},
+            {"year": 2022, "make": "Subaru", "model": "WRX"},
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            out = Path(tmp)
+            json_path = out / "engines.json"
+            json_path.write_text(json.dumps(rows, indent=2) + "\n", encoding="utf-8")
+            args = argparse.Namespace(check=False, dry_run=False, shard="model")
+            ok, shards = sync_script.sync_all_shards(out, ["engines.json"], args)
+            self.assertTrue(ok)
+            self.assertTrue(sync_script.sync_index(out, ["engines.json"], shards, args))
+            self.assertTrue((out / "shards/engines/brz.json").exists())
+
+            # BRZ rows removed; a plain --check must notice the recorded shards
+            json_path.write_text(json.dumps(rows[1:], indent=2) + "\n", encoding="utf-8")
+            args = argparse.Namespace(check=True, dry_run=False, shard=None)
+            ok, shards = sync_script.sync_all_shards(out, ["engines.json"], args)
+            self.assertFalse(ok)
+
+            # A plain sync re-shards with the recorded mode and drops the stale entry
+            args.check = False
+            ok, shards = sync_script.sync_all_shards(out, ["engines.json"], args)
+            self.assertTrue(ok)
+            self.assertTrue(sync_script.sync_index(out, ["engines.json"], shards, args))
+            self.assertFalse((out / "shards/engines/brz.json").exists())
+            index = sync_script.load_index(out)
+            self.assertEqual([e["model"] for e in index["shards"]["engines.json"]["shards"]], ["WRX"])
+            self.assertEqual(index["shards"]["engines.json"]["by"], "model")
+
+            args.check = True
+            ok, shards = sync_script.sync_all_shards(out, ["engines.json"], args)
+            self.assertTrue(ok)
+            self.assertTrue(sync_script.sync_index(out, ["engines.json"], shards, args))
+
 if __name__ == '__main__':
     unittest.main()